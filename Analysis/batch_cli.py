@@ -0,0 +1,309 @@
+"""
+Headless batch daily pipeline
+-----------------------------
+Command-line counterpart of batch_daily_pipeline.py for cron / servers
+without a display.  Produces exactly the same per-window outputs
+(YYYYMMDD_HHMMSS_YYYYMMDD_HHMMSS_ch1..6.csv and _activity.csv) and skips
+windows that are already complete, so it can be re-run to resume.
+
+Nothing here imports PyQt5 or matplotlib.
+
+Job spec (JSON or TOML; every key except output_dir and one source is optional):
+
+    bin_folder     = "/data/hive3/bin"       # local .bin folder, or
+    dropbox_folder = "/BeeSpy/hive3"         # Dropbox folder (saved tokens required)
+    output_dir     = "/data/hive3/daily"
+    start          = "2026-03-01T00:00:00"   # default: first .bin file's day
+    end            = "2026-03-31T23:59:59"   # default: last .bin file's day
+    chunk_hrs      = 0                       # 0 = one window per calendar day
+    samp_freq      = 5000
+    window         = 0.2
+    min_freq       = 0
+    max_freq       = 500
+    percentile     = 75
+    percentile_exact = true                  # false: histogram cutoff, ~1 s/day faster, ~1e-5 off
+    continue_batch = true
+    stream_to_disk = false                   # true: build each day's spectrograms as
+                                             # memory-mapped scratch files, not in RAM
+    save_specs     = true
+    workers        = 1
+    precision      = "float64"               # or "float32" (see utils/precision.py)
+    log_level      = "detail"                # "info" drops the per-file lines (see utils/log.py)
+
+Usage:
+    python batch_cli.py job.toml [--workers N] [--start ISO] [--end ISO] [--precision P] [--dry-run]
+    python batch_cli.py job.toml --approx-percentile     # percentile_exact = false
+    python batch_cli.py job.toml --stream-to-disk        # stream_to_disk = true (long days, little RAM)
+    python batch_cli.py job.toml --log-level info        # one line per window, no per-file detail
+    python batch_cli.py job.toml --validate-precision   # float32 vs float64 on the first window
+    python batch_cli.py job.toml --trace trace.jsonl [--trace-memory]   # timing spans + summary
+"""
+
+import os
+import sys
+import json
+import argparse
+import datetime
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils import utils
+from utils import dropbox_helper
+from utils import instrument
+from utils import log
+from utils import precision
+from utils.progress import Progress
+from utils.processing import work_bytes
+from utils.daily_pipeline import (
+    make_job, day_windows, _day_is_complete, _process_day, _process_days_rolling,
+)
+
+
+PROGRESS_INTERVAL = 30   # seconds between progress lines within a window
+
+DEFAULTS = {
+    'bin_folder':     None,
+    'dropbox_folder': None,
+    'start':          None,
+    'end':            None,
+    'chunk_hrs':      0,
+    'samp_freq':      5000,
+    'window':         0.2,
+    'min_freq':       0,
+    'max_freq':       500,
+    'percentile':     75,
+    'percentile_exact': True,
+    'continue_batch': True,
+    'stream_to_disk': False,
+    'save_specs':     True,
+    'workers':        1,
+    'precision':      'float64',
+    'log_level':      'detail',
+}
+
+
+def load_job_spec(path):
+    """Read a JSON or TOML job spec (chosen by extension) and fill in defaults."""
+    if path.lower().endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:   # Python < 3.11
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    else:
+        with open(path) as f:
+            spec = json.load(f)
+    unknown = set(spec) - set(DEFAULTS) - {'output_dir'}
+    if unknown:
+        raise ValueError(f"Unknown job spec key(s): {', '.join(sorted(unknown))}")
+    if 'output_dir' not in spec:
+        raise ValueError("Job spec needs output_dir")
+    if bool(spec.get('bin_folder')) == bool(spec.get('dropbox_folder')):
+        raise ValueError("Job spec needs exactly one of bin_folder / dropbox_folder")
+    return {**DEFAULTS, **spec}
+
+
+def _parse_dt(value):
+    """Naive local datetime from an ISO string or a TOML date/datetime.
+
+    File names and the windows are local wall-clock times (as in
+    processing._as_epoch), so a value with a UTC offset ("...+02:00") is
+    converted to this machine's local time rather than compared as aware.
+    """
+    if isinstance(value, datetime.datetime):   # TOML datetimes arrive parsed
+        dt = value
+    elif isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+    else:
+        dt = datetime.datetime.fromisoformat(str(value))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def _list_bin_files(spec):
+    """Return (bin_files, dbx, file_sizes).  dbx is None in local mode, and
+    file_sizes ({name: bytes} from the Dropbox listing) too."""
+    if spec['bin_folder']:
+        return sorted(f for f in os.listdir(spec['bin_folder']) if f.endswith('.bin')), None, None
+    dbx = dropbox_helper.get_saved_client()
+    if dbx is None:
+        raise RuntimeError("No saved Dropbox credentials — connect once from localApp first")
+    dbx = dropbox_helper.scope_to_root_namespace(dbx)
+    entries = [e for e in dropbox_helper.list_folder(dbx, spec['dropbox_folder'])
+               if e.name.endswith('.bin')]
+    return sorted(e.name for e in entries), dbx, {e.name: e.size for e in entries}
+
+
+def _file_range(bin_files):
+    times = []
+    for f in bin_files:
+        try:
+            times.append(utils.extract_start_datetime(f))
+        except ValueError:
+            continue
+    if not times:
+        return None, None
+    return (min(times).replace(hour=0, minute=0, second=0),
+            max(times).replace(hour=23, minute=59, second=59))
+
+
+def run(spec, dry_run=False):
+    """Run a loaded job spec.  Returns (processed, skipped, failed)."""
+    bin_files, dbx, file_sizes = _list_bin_files(spec)
+    if not bin_files:
+        print("No .bin files found.")
+        return 0, 0, 0
+
+    first, last = _file_range(bin_files)
+    start_dt = _parse_dt(spec['start']) if spec['start'] else first
+    end_dt   = _parse_dt(spec['end'])   if spec['end']   else last
+    if start_dt is None or end_dt is None or start_dt > end_dt:
+        raise ValueError(f"Bad date range: {start_dt} → {end_dt}")
+
+    windows = day_windows(start_dt, end_dt, int(spec['chunk_hrs']))
+    print(f"Starting batch: {len(windows)} window(s) | {len(bin_files)} .bin file(s) "
+          f"| output → {spec['output_dir']}")
+    print(f"Range: {start_dt:%d-%b-%Y %H:%M:%S} → {end_dt:%d-%b-%Y %H:%M:%S}")
+
+    jobs, skipped = [], 0
+    for day, w_start, w_end in windows:
+        if spec['continue_batch'] and _day_is_complete(
+                spec['output_dir'], w_start, w_end, spec['save_specs']):
+            print(f"[{day}] Already complete — skipping.")
+            skipped += 1
+            continue
+        jobs.append(make_job(day, w_start, w_end,
+                             spec['bin_folder'], bin_files, spec['output_dir'],
+                             spec['samp_freq'], spec['window'],
+                             spec['min_freq'], spec['max_freq'], spec['percentile'],
+                             use_dropbox=dbx is not None,
+                             dbx_folder=spec['dropbox_folder'],
+                             save_specs=spec['save_specs'],
+                             percentile_exact=spec['percentile_exact'],
+                             stream_to_disk=spec['stream_to_disk']))
+    if dry_run:
+        for job in jobs:
+            print(f"[{job['day']}] would process {job['window_start']} → {job['window_end']}")
+        return 0, skipped, 0
+
+    processed = failed = 0
+    n_workers = max(1, min(int(spec['workers']), len(jobs)))
+    # byte-based progress over every window still to do; also printed every
+    # PROGRESS_INTERVAL seconds while a long window is running
+    prog = Progress(callback=lambda p: print(f"Progress: {p.format()}"), interval=PROGRESS_INTERVAL)
+
+    def _tally(status):
+        nonlocal processed, skipped, failed
+        processed += status == 'done'
+        skipped   += status == 'no-data'
+        failed    += status == 'error'
+
+    if n_workers == 1:
+        # sequential backfill: each .bin file is read once across adjacent windows
+        # (except with stream_to_disk, which goes window by window)
+        prog.expect(*work_bytes(spec['bin_folder'], bin_files,
+                                [(j['window_start'], j['window_end']) for j in jobs],
+                                spec['samp_freq'], dbx, file_sizes,
+                                once=not spec['stream_to_disk']))
+        rolling = _process_days_rolling(jobs, dbx=dbx, progress=prog, file_sizes=file_sizes)
+        for i, (_, status, _) in enumerate(rolling, start=1):
+            _tally(status)
+            print(f"Windows: {i}/{len(jobs)} | {prog.format()}")
+    else:
+        print(f"Processing {len(jobs)} window(s) with {n_workers} worker processes…")
+        # workers report nothing back until their window is done, so progress
+        # moves one window's bytes at a time (one line per window, no timer)
+        prog.callback = None
+        work = {id(job): work_bytes(spec['bin_folder'], bin_files,
+                                    [(job['window_start'], job['window_end'])],
+                                    spec['samp_freq'], dbx, file_sizes) for job in jobs}
+        for n_bytes, n_files in work.values():
+            prog.expect(n_bytes, n_files)
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            futures = {ex.submit(_process_day, job, None, True): job for job in jobs}
+            for i, fut in enumerate(as_completed(futures), start=1):
+                try:
+                    _, status, _, day_log = fut.result()
+                    print(day_log.rstrip())
+                except Exception:
+                    print(f"Worker failed:\n{traceback.format_exc()}")
+                    status = 'error'
+                _tally(status)
+                n_bytes, n_files = work[id(futures[fut])]
+                prog.done(n_bytes, files=n_files)
+                print(f"Windows: {i}/{len(jobs)} | {prog.format()}")
+
+    print(f"\nAll done.  Processed: {processed}  Skipped/no-data: {skipped}  Failed: {failed}")
+    return processed, skipped, failed
+
+
+def validate_precision(spec):
+    """Print the float32-vs-float64 report (processing.precision_report) for
+    the job's first window, with the job's own spectrogram settings."""
+    from utils.processing import precision_report
+    bin_files, dbx, _ = _list_bin_files(spec)
+    first, last = _file_range(bin_files)
+    start_dt = _parse_dt(spec['start']) if spec['start'] else first
+    end_dt   = _parse_dt(spec['end'])   if spec['end']   else last
+    if start_dt is None or end_dt is None or start_dt > end_dt:
+        raise ValueError(f"Bad date range: {start_dt} → {end_dt}")
+    _, w_start, w_end = day_windows(start_dt, end_dt, int(spec['chunk_hrs']))[0]
+    return precision_report(spec['bin_folder'], bin_files, w_start, w_end,
+                            spec['samp_freq'], spec['window'], spec['window'],
+                            spec['min_freq'], spec['max_freq'],
+                            dbx=dbx, dbx_folder=spec['dropbox_folder'])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless batch daily spectrogram + activity pipeline")
+    ap.add_argument('job', help="job spec (.json or .toml)")
+    ap.add_argument('--workers', type=int, help="override the number of worker processes")
+    ap.add_argument('--start', help="override the start time (ISO format)")
+    ap.add_argument('--end', help="override the end time (ISO format)")
+    ap.add_argument('--precision', choices=['float64', 'float32'], help="override the working precision")
+    ap.add_argument('--log-level', choices=list(log.LEVELS), help="override the log level")
+    ap.add_argument('--approx-percentile', action='store_true',
+                    help="take the activity cutoff from a histogram (percentile_exact = false)")
+    ap.add_argument('--stream-to-disk', action='store_true',
+                    help="build spectrograms as memory-mapped scratch files (stream_to_disk = true)")
+    ap.add_argument('--dry-run', action='store_true', help="list the windows that would run")
+    ap.add_argument('--validate-precision', action='store_true',
+                    help="compare float32 with float64 on the first window and exit")
+    ap.add_argument('--trace', metavar='PATH', help="write timing spans to PATH (JSON lines) and print a summary")
+    ap.add_argument('--trace-memory', action='store_true', help="also record peak memory per span (slower)")
+    args = ap.parse_args(argv)
+
+    spec = load_job_spec(args.job)
+    for key in ('workers', 'start', 'end', 'precision', 'log_level'):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+    if args.approx_percentile:
+        spec['percentile_exact'] = False
+    if args.stream_to_disk:
+        spec['stream_to_disk'] = True
+    # exported to the environment, so worker processes inherit them
+    precision.set_precision(spec['precision'])
+    log.set_level(spec['log_level'])
+
+    if args.trace or args.trace_memory:
+        instrument.enable(trace_path=args.trace, memory=args.trace_memory)
+        if args.trace:
+            # worker processes record into the same file
+            os.environ[instrument.ENV_VAR] = os.path.abspath(args.trace)
+
+    if args.validate_precision:
+        validate_precision(spec)
+        return 0
+    try:
+        _, _, failed = run(spec, dry_run=args.dry_run)
+    finally:
+        if instrument.enabled():
+            instrument.print_summary()
+            instrument.disable()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,264 +15,51 @@ The activity pipeline for each day:
   4. Sum across frequency axis → 1-D time series
 
 Days whose output files already exist are skipped automatically (resume safe).
+With more than one worker, days are processed in parallel by separate
+processes; each writes its own outputs atomically, so an interrupted run
+resumes the same way.  The workers do not import this script or PyQt5
+(utils/worker_pool.py), only the Qt-free utils.daily_pipeline.
 
 Usage:
     python claudeHelper_20260402_batch_daily_pipeline.py
+
+For headless runs (cron, servers without a display) use batch_cli.py with a
+JSON/TOML job spec; it shares the same processing code and outputs.
 """
 
 import os
 import sys
-import inspect
 import datetime
 import traceback
+from concurrent.futures import as_completed
 
-import numpy as np
-import pandas as pd
-
-from PyQt5.QtCore import Qt, QThread, QObject, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFileDialog, QPlainTextEdit, QSpinBox, QDoubleSpinBox,
+    QFileDialog, QSpinBox, QDoubleSpinBox,
     QGroupBox, QGridLayout, QProgressBar, QMessageBox, QDateTimeEdit,
     QSplitter, QCheckBox,
 )
 
-# Import batch-processing machinery from the existing localApp
-# (safe to import — the Qt app only starts inside its __main__ block)
-from localApp import (
-    process_bin_files,
-    DropboxAuthDialog,
-    DropboxFolderBrowser,
-)
+# The processing is Qt-free and shared with the headless batch_cli.py; the
+# Dropbox dialogs (utils.dropbox_dialogs) are imported when a Dropbox folder
+# is picked, and nothing here imports localApp or matplotlib.
 from utils import utils
+from utils import log
+from utils import QThelpers
 from utils import dropbox_helper
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# stdout → log widget (same pattern as localApp)
-# ══════════════════════════════════════════════════════════════════════════════
-
-class _LogEmitter(QObject):
-    """Emits log messages as a Qt signal so background threads can update the UI safely."""
-    message = pyqtSignal(str)
-
-
-class _StdoutRedirector:
-    """Replaces sys.stdout so every print() appears in the footer log widget."""
-    def __init__(self, emitter: _LogEmitter):
-        self._emitter = emitter
-
-    def write(self, msg):
-        if msg.strip():
-            self._emitter.message.emit(msg.rstrip())
-
-    def flush(self):
-        pass
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# Spec array helpers (mirrors claudeHelper_20260315_circadian_prototype.py)
-# ══════════════════════════════════════════════════════════════════════════════
-
-def spec_freqs(spec):  return spec[1:, 0]
-def spec_times(spec):  return spec[0, 1:]
-def spec_power(spec):  return spec[1:, 1:]
-
-
-def rebuild_spec(freqs, times, power):
-    """Reconstruct the packed spec array from components."""
-    dt = power.dtype
-    out = np.empty((len(freqs) + 1, len(times) + 1), dtype=dt)
-    out[0, 0] = 0
-    out[0, 1:] = times
-    out[1:, 0] = freqs
-    out[1:, 1:] = power
-    return out
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# Activity pipeline functions
-# ══════════════════════════════════════════════════════════════════════════════
-
-# Frequency bands reported in the output CSV
-FREQ_BANDS = [(0, 40), (40, 80), (80, 120), (120, 160), (160, 200), (200, 300)]
-
-
-def _znorm_spec(spec):
-    """Global Z-normalise a single spectrogram."""
-    power  = spec_power(spec).astype(np.float32)
-    mu     = np.nanmean(power)
-    sigma  = np.nanstd(power)
-    normed = (power - mu) / (sigma + np.float32(1e-7))
-    return rebuild_spec(spec_freqs(spec), spec_times(spec), normed)
-
-
-def _combine_znorm_sum(specs):
-    """Z-normalise each channel then sum into one combined spectrogram."""
-    znormed  = [_znorm_spec(s) for s in specs]
-    min_t    = min(spec_power(s).shape[1] for s in znormed)
-    acc      = spec_power(znormed[0])[:, :min_t].copy()
-    nan_mask = np.isnan(acc)
-    acc      = np.where(nan_mask, np.float32(0), acc)
-    for s in znormed[1:]:
-        p     = spec_power(s)[:, :min_t]
-        valid = ~np.isnan(p)
-        acc  += np.where(valid, p, np.float32(0))
-        nan_mask &= ~valid
-    acc[nan_mask] = np.nan
-    return rebuild_spec(spec_freqs(znormed[0]), spec_times(znormed[0])[:min_t], acc)
-
-
-def _percentile_cutoff(spec, percentile=75):
-    """Set cells below the Nth percentile to NaN."""
-    power     = spec_power(spec).copy()
-    threshold = np.nanpercentile(power, percentile)
-    power[power < threshold] = np.nan
-    return rebuild_spec(spec_freqs(spec), spec_times(spec), power)
-
-
-def _sum_to_timeseries(spec):
-    """Sum across frequency axis per time column (NaN-safe; all-NaN columns → NaN)."""
-    power   = spec_power(spec)
-    values  = np.nansum(power, axis=0)
-    all_nan = np.all(np.isnan(power), axis=0)
-    values[all_nan] = np.nan
-    return spec_times(spec), values
-
-
-def _apply_freq_filter(spec, lo, hi):
-    """Return a spectrogram slice restricted to [lo, hi] Hz, or None if no rows match."""
-    freqs = spec_freqs(spec)
-    mask  = (freqs >= lo) & (freqs <= hi)
-    if not mask.any():
-        return None
-    return rebuild_spec(freqs[mask], spec_times(spec), spec_power(spec)[mask, :])
-
-
-def _bin_timeseries(timestamps, values, bin_size_min=10, bin_step_min=10):
-    """Average a time series into non-overlapping bins (bin_size == bin_step → no overlap).
-
-    Returns (bin_centre_timestamps, bin_mean_values).
-    """
-    if len(timestamps) < 2:
-        return timestamps, values
-
-    bin_size_s = bin_size_min * 60.0
-    bin_step_s = bin_step_min * 60.0
-
-    t_start = timestamps[0]
-    t_end   = timestamps[-1]
-
-    centres = np.arange(t_start + bin_size_s / 2.0,
-                        t_end   - bin_size_s / 2.0 + bin_step_s,
-                        bin_step_s)
-
-    bin_vals = []
-    for c in centres:
-        mask   = (timestamps >= c - bin_size_s / 2.0) & (timestamps < c + bin_size_s / 2.0)
-        finite = values[mask]
-        finite = finite[np.isfinite(finite)]
-        bin_vals.append(np.mean(finite) if len(finite) > 0 else np.nan)
-
-    return centres, np.array(bin_vals)
-
-
-def run_activity_pipeline(spectrograms, percentile=75):
-    """Full activity pipeline for one day's spectrograms.
-
-    Pipeline:
-      1. Z-normalise each channel
-      2. Sum channels into a combined spectrogram
-      3. Apply Nth-percentile cutoff (cells below → NaN)
-      4. Sum across frequency axis → all-data time series
-      5. Sum across each frequency band → per-band time series
-      6. Bin everything into 10-min intervals
-
-    Returns (bin_timestamps, bin_activity, band_dict) where band_dict maps
-    "lo-hi" → binned values array, or (None, None, None) if no usable data.
-    """
-    valid = [s for s in spectrograms
-             if s is not None and not np.all(np.isnan(spec_power(s)))]
-    if not valid:
-        return None, None, None
-
-    combined = _combine_znorm_sum(valid)
-    filtered = _percentile_cutoff(combined, percentile)
-
-    # All-data time series
-    times, activity = _sum_to_timeseries(filtered)
-
-    # Per-frequency-band time series
-    raw_bands = {}
-    for lo, hi in FREQ_BANDS:
-        band_spec = _apply_freq_filter(filtered, lo, hi)
-        if band_spec is not None:
-            _, bvals = _sum_to_timeseries(band_spec)
-        else:
-            bvals = np.full(len(activity), np.nan)
-        raw_bands[f"{lo}-{hi}"] = bvals
-
-    # Bin to 10-min intervals
-    bin_times, bin_activity = _bin_timeseries(times, activity)
-    bin_bands = {}
-    for key, bvals in raw_bands.items():
-        _, binned = _bin_timeseries(times, bvals)
-        bin_bands[key] = binned
-
-    return bin_times, bin_activity, bin_bands
-
-
-# ══════════════════════════════════════════════════════════════════════════════
-# Output file helpers
-# ══════════════════════════════════════════════════════════════════════════════
-
-def _spec_path(output_dir, window_start, window_end, channel):
-    s = window_start.strftime('%Y%m%d_%H%M%S')
-    e = window_end.strftime('%Y%m%d_%H%M%S')
-    return os.path.join(output_dir, f"{s}_{e}_ch{channel}.csv")
-
-
-def _activity_path(output_dir, window_start, window_end):
-    s = window_start.strftime('%Y%m%d_%H%M%S')
-    e = window_end.strftime('%Y%m%d_%H%M%S')
-    return os.path.join(output_dir, f"{s}_{e}_activity.csv")
-
-
-def _day_is_complete(output_dir, window_start, window_end, save_specs=True):
-    """True if the expected output files already exist.
-
-    When save_specs is False only the activity CSV is checked (spectrogram
-    files are never written in that mode so their absence is expected).
-    """
-    if not os.path.isfile(_activity_path(output_dir, window_start, window_end)):
-        return False
-    if save_specs:
-        return all(os.path.isfile(_spec_path(output_dir, window_start, window_end, c))
-                   for c in range(1, 7))
-    return True
-
-
-def _save_day(output_dir, window_start, window_end, spectrograms, timestamps, activity, band_dict,
-              save_specs=True):
-    """Write spectrogram CSVs and activity CSV for one window atomically."""
-    os.makedirs(output_dir, exist_ok=True)
-    if save_specs:
-        for c, spec in enumerate(spectrograms, start=1):
-            path = _spec_path(output_dir, window_start, window_end, c)
-            tmp  = path + '.tmp'
-            np.savetxt(tmp, spec, delimiter=',')
-            os.replace(tmp, path)
-    act_path = _activity_path(output_dir, window_start, window_end)
-    dts = pd.to_datetime(timestamps, unit='s', utc=True)
-    df  = pd.DataFrame({'timestamp_unix': timestamps,
-                        'datetime_utc':   dts.strftime('%Y-%m-%d %H:%M:%S'),
-                        'all_data':       activity})
-    for key, vals in band_dict.items():
-        lo, hi = key.split('-')
-        df[f"band_{lo}_{hi}Hz"] = vals
-    tmp = act_path + '.tmp'
-    df.to_csv(tmp, index=False)
-    os.replace(tmp, act_path)
+# re-exported so scripts that import these from here keep working
+from utils.processing import process_bin_files          # noqa: F401
+from utils.processing import work_bytes
+from utils.progress import Progress
+from utils.worker_pool import SpawnPool
+from utils.daily_pipeline import (                      # noqa: F401
+    FREQ_BANDS,
+    spec_freqs, spec_times, spec_power, rebuild_spec,
+    run_activity_pipeline,
+    _day_is_complete, _save_day,
+    make_job, day_windows, _process_day, _process_days_rolling,
+)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -295,7 +82,7 @@ def _qdt_to_dt(qdt):
 # ══════════════════════════════════════════════════════════════════════════════
 
 class _BatchWorker(QThread):
-    progress = pyqtSignal(int, int)   # (current, total)
+    progress = pyqtSignal(float, str) # (fraction of .bin bytes done, "windows | Progress.format()")
     done     = pyqtSignal(int, int)   # (days_processed, days_skipped)
     error    = pyqtSignal(str)
 
@@ -303,7 +90,8 @@ class _BatchWorker(QThread):
                  sampFreq, window, minFreq, maxFreq,
                  percentile,
                  dbx, dbx_folder,
-                 continue_batch=True, save_specs=True,
+                 continue_batch=True, save_specs=True, stream_to_disk=False,
+                 n_workers=1, file_sizes=None,
                  parent=None):
         super().__init__(parent)
         self._days            = days
@@ -319,68 +107,98 @@ class _BatchWorker(QThread):
         self._dbx_folder      = dbx_folder
         self._continue_batch  = continue_batch
         self._save_specs      = save_specs
+        self._stream_to_disk  = stream_to_disk
+        self._n_workers       = max(1, int(n_workers))
+        self._file_sizes      = file_sizes
+        self._finished        = 0
+        self._executor        = None
+        self._stopping        = False
+
+    def _job(self, day, window_start, window_end):
+        return make_job(day, window_start, window_end,
+                        self._bin_folder, self._bin_files, self._output_dir,
+                        self._sampFreq, self._window, self._minFreq, self._maxFreq,
+                        self._percentile,
+                        use_dropbox=self._dbx is not None, dbx_folder=self._dbx_folder,
+                        save_specs=self._save_specs, stream_to_disk=self._stream_to_disk)
+
+    def request_stop(self):
+        """Cancel days not yet started; in-flight days finish and are saved."""
+        self._stopping = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _work(self, jobs):
+        """(bytes, files) of .bin data the windows of jobs will read."""
+        return work_bytes(self._bin_folder, self._bin_files,
+                          [(j['window_start'], j['window_end']) for j in jobs],
+                          self._sampFreq, self._dbx, self._file_sizes,
+                          once=not self._stream_to_disk)
+
+    def _report(self, prog):
+        self.progress.emit(prog.fraction(), f"{self._finished}/{len(self._days)} windows | {prog.format()}")
 
     def run(self):
         try:
-            total     = len(self._days)
             processed = 0
             skipped   = 0
+            prog      = Progress(self._report, interval=0.5)
 
-            for i, (day, window_start, window_end) in enumerate(self._days, start=1):
-                self.progress.emit(i, total)
-
+            # Resume check stays in this thread so workers only get real work
+            jobs = []
+            for day, window_start, window_end in self._days:
                 if self._continue_batch and _day_is_complete(
                         self._output_dir, window_start, window_end, self._save_specs):
                     print(f"[{day}] Already complete — skipping.")
                     skipped += 1
                     continue
-
-                print(f"\n[{day}] Processing bin files…")
-
-                try:
-                    _pbf_kwargs = dict(
-                        dbx=self._dbx,
-                        dbx_folder=self._dbx_folder,
-                    )
-                    # local_bin_folder was added in a later version of localApp;
-                    # omit it gracefully on older installs
-                    if 'local_bin_folder' in inspect.signature(process_bin_files).parameters:
-                        _pbf_kwargs['local_bin_folder'] = self._bin_folder
-                    specs = process_bin_files(
-                        self._bin_folder or self._output_dir,
-                        self._bin_files,
-                        _to_qdt(window_start),
-                        _to_qdt(window_end),
-                        self._sampFreq,
-                        self._window,
-                        self._window,
-                        self._minFreq,
-                        self._maxFreq,
-                        **_pbf_kwargs,
-                    )
-                except Exception as e:
-                    print(f"[{day}] ERROR in process_bin_files: {e}")
-                    traceback.print_exc()
-                    continue
-
-                print(f"[{day}] Running activity pipeline…")
-                try:
-                    times, activity, band_dict = run_activity_pipeline(
-                        specs, self._percentile)
-                except Exception as e:
-                    print(f"[{day}] ERROR in pipeline: {e}")
-                    traceback.print_exc()
-                    continue
-
-                if times is None:
-                    print(f"[{day}] No valid data — skipping output.")
-                    skipped += 1
-                    continue
-
-                _save_day(self._output_dir, window_start, window_end, specs, times, activity, band_dict,
-                          save_specs=self._save_specs)
-                print(f"[{day}] Done — saved {len(times)} time points.")
-                processed += 1
+                jobs.append(self._job(day, window_start, window_end))
+            self._finished = skipped
+            self._report(prog)
+
+            if self._n_workers == 1 or len(jobs) <= 1:
+                # sequential: roll from window to window so files that cross a
+                # boundary are read once
+                prog.expect(*self._work(jobs))
+                for _, status, _ in _process_days_rolling(jobs, dbx=self._dbx, progress=prog,
+                                                          file_sizes=self._file_sizes):
+                    processed += status == 'done'
+                    skipped   += status == 'no-data'
+                    self._finished += 1
+                    self._report(prog)
+                    if self._stopping:
+                        break
+            else:
+                n = min(self._n_workers, len(jobs))
+                print(f"Processing {len(jobs)} window(s) with {n} worker processes…")
+                # workers report back only when a window is done, so the bar
+                # moves one window's bytes at a time
+                work = {id(job): self._work([job]) for job in jobs}
+                for n_bytes, n_files in work.values():
+                    prog.expect(n_bytes, n_files)
+                # spawn, not fork: the parent has Qt and worker threads running.
+                # SpawnPool keeps the workers from re-importing this script
+                # (and PyQt5) — they only load utils.daily_pipeline.
+                with SpawnPool(max_workers=n) as ex:
+                    self._executor = ex
+                    futures = {ex.submit(_process_day, job, None, True): job for job in jobs}
+                    for fut in as_completed(futures):
+                        if fut.cancelled():
+                            continue
+                        try:
+                            day, status, _, day_log = fut.result()
+                        except Exception as e:
+                            print(f"Worker failed: {e}")
+                            status = 'error'
+                        else:
+                            print(day_log.rstrip())
+                        processed += status == 'done'
+                        skipped   += status == 'no-data'
+                        self._finished += 1
+                        n_bytes, n_files = work[id(futures[fut])]
+                        prog.done(n_bytes, files=n_files)
+                        self._report(prog)
+                self._executor = None
 
             self.done.emit(processed, skipped)
         except Exception as e:
@@ -399,6 +217,7 @@ class BatchDailyApp(QWidget):
 
         self._bin_folder = None
         self._bin_files  = []
+        self._file_sizes = None       # {name: bytes} from the Dropbox listing
         self._output_dir = None
         self._dbx        = None
         self._dbx_folder = None
@@ -408,9 +227,7 @@ class BatchDailyApp(QWidget):
 
         # Redirect stdout so every print() (including from process_bin_files)
         # appears in the log widget — same as localApp
-        self._log_emitter = _LogEmitter()
-        self._log_emitter.message.connect(self._append_log)
-        sys.stdout = _StdoutRedirector(self._log_emitter)
+        self._log.install()
 
     # ── UI ────────────────────────────────────────────────────────────────────
 
@@ -486,6 +303,9 @@ class BatchDailyApp(QWidget):
         self._max_freq   = _ispin(0, 20000, 500)
         self._chunk_hrs  = _ispin(0, 240, 0)   # 0 = whole day as one chunk (localApp default)
         self._percentile = _ispin(1, 99, 75)
+        self._n_workers  = _ispin(1, max(1, os.cpu_count() or 1), 1)
+        self._n_workers.setToolTip("Days processed in parallel, one process each. "
+                                   "Each worker holds one day of spectrograms in memory.")
 
         rows = [
             ("Sampling freq (Hz):",       self._samp_freq),
@@ -494,6 +314,7 @@ class BatchDailyApp(QWidget):
             ("Max freq (Hz):",            self._max_freq),
             ("Chunk size (hrs, 0=day):",  self._chunk_hrs),
             ("Percentile cutoff (%):",    self._percentile),
+            ("Parallel workers:",         self._n_workers),
         ]
         for r, (lbl, w) in enumerate(rows):
             set_grid.addWidget(QLabel(lbl), r, 0)
@@ -508,6 +329,15 @@ class BatchDailyApp(QWidget):
         self._skip_specs_cb.setChecked(False)
         set_grid.addWidget(self._skip_specs_cb, n + 1, 0, 1, 2)
 
+        self._log_detail_cb = QCheckBox("Per-file detail in progress log (File n of N, data shape, checkpoints)")
+        self._log_detail_cb.setChecked(log.enabled_for('detail'))
+        self._log_detail_cb.toggled.connect(lambda on: log.set_level('detail' if on else 'info'))
+        set_grid.addWidget(self._log_detail_cb, n + 2, 0, 1, 2)
+
+        self._stream_cb = QCheckBox("Build spectrograms on disk (low memory; for very long windows)")
+        self._stream_cb.setChecked(False)
+        set_grid.addWidget(self._stream_cb, n + 3, 0, 1, 2)
+
         main.addWidget(set_box)
 
         # ── Run / Stop ────────────────────────────────────────────────────────
@@ -529,9 +359,7 @@ class BatchDailyApp(QWidget):
         main.addWidget(self._progress)
 
         # ── Log (bottom pane of splitter) ─────────────────────────────────────
-        self._log = QPlainTextEdit()
-        self._log.setReadOnly(True)
-        self._log.setMaximumBlockCount(5000)
+        self._log = QThelpers.BufferedLogView()
         self._log.setStyleSheet("font-family: monospace; font-size: 11px;")
         self._log.setPlaceholderText("Progress log…")
 
@@ -547,11 +375,6 @@ class BatchDailyApp(QWidget):
         outer.setContentsMargins(0, 0, 0, 0)
         outer.addWidget(splitter)
 
-    def _append_log(self, msg: str):
-        self._log.appendPlainText(msg)
-        sb = self._log.verticalScrollBar()
-        sb.setValue(sb.maximum())
-
     # ── Folder pickers ────────────────────────────────────────────────────────
 
     def _pick_local_folder(self):
@@ -564,6 +387,7 @@ class BatchDailyApp(QWidget):
             return
         self._bin_folder = folder
         self._bin_files  = files
+        self._file_sizes = None
         self._dbx        = None
         self._dbx_folder = None
         self._src_label.setText(f"{len(files)} .bin files in:\n{folder}")
@@ -580,6 +404,7 @@ class BatchDailyApp(QWidget):
             return
 
         from PyQt5.QtWidgets import QDialog
+        from utils.dropbox_dialogs import DropboxAuthDialog, DropboxFolderBrowser
         dbx = dropbox_helper.get_saved_client()
         if dbx is None:
             auth_dlg = DropboxAuthDialog(self)
@@ -600,6 +425,7 @@ class BatchDailyApp(QWidget):
             return
         self._bin_folder = None
         self._bin_files  = [e.name for e in bin_entries]
+        self._file_sizes = {e.name: e.size for e in bin_entries}
         self._dbx        = dbx
         self._dbx_folder = browser.selected_path
         self._src_label.setText(
@@ -625,7 +451,7 @@ class BatchDailyApp(QWidget):
         times = []
         for f in self._bin_files:
             try:
-                times.append(utils.extract_start_time(f))
+                times.append(utils.extract_start_datetime(f))
             except ValueError:
                 continue
         if not times:
@@ -675,34 +501,15 @@ class BatchDailyApp(QWidget):
         # Build list of processing windows.
         # chunk_hrs == 0: one window per calendar day in the selected range.
         # chunk_hrs >  0: fixed-hour windows spanning the selected range.
-        if chunk_hrs == 0:
-            # One entry per calendar day
-            windows = []
-            current = start_dt.date()
-            while current <= end_dt.date():
-                day_start = datetime.datetime(current.year, current.month, current.day, 0, 0, 0)
-                day_end   = datetime.datetime(current.year, current.month, current.day, 23, 59, 59)
-                # Clip to user-selected range
-                day_start = max(day_start, start_dt)
-                day_end   = min(day_end,   end_dt)
-                windows.append((current, day_start, day_end))
-                current  += datetime.timedelta(days=1)
-        else:
-            # Sub-day or multi-hour chunks; label each by the start date
-            windows = []
-            cur = start_dt
-            delta = datetime.timedelta(hours=chunk_hrs)
-            while cur < end_dt:
-                chunk_end = min(cur + delta, end_dt)
-                windows.append((cur.date(), cur, chunk_end))
-                cur = chunk_end
+        windows = day_windows(start_dt, end_dt, chunk_hrs)
 
         if not windows:
             QMessageBox.warning(self, "Empty range", "No days to process in the selected range.")
             return
 
-        self._progress.setRange(0, len(windows))
+        self._progress.setRange(0, 1000)
         self._progress.setValue(0)
+        self._progress.setFormat(f"0/{len(windows)} windows")
         self._log.clear()
         print(f"Starting batch: {len(windows)} window(s) | output → {self._output_dir}")
         print(f"Range: {start_dt.strftime('%d-%b-%Y %H:%M:%S')} → {end_dt.strftime('%d-%b-%Y %H:%M:%S')}")
@@ -721,9 +528,12 @@ class BatchDailyApp(QWidget):
             dbx_folder      = self._dbx_folder,
             continue_batch  = self._continue_cb.isChecked(),
             save_specs      = not self._skip_specs_cb.isChecked(),
+            stream_to_disk  = self._stream_cb.isChecked(),
+            n_workers       = self._n_workers.value(),
+            file_sizes      = self._file_sizes,
             parent          = self,
         )
-        self._worker.progress.connect(lambda cur, tot: self._progress.setValue(cur))
+        self._worker.progress.connect(self._on_progress)
         self._worker.done.connect(self._on_done)
         self._worker.error.connect(self._on_error)
 
@@ -733,11 +543,22 @@ class BatchDailyApp(QWidget):
 
     def _stop(self):
         if self._worker and self._worker.isRunning():
-            self._worker.terminate()
-            print("--- Stopped by user ---")
+            if self._worker._n_workers > 1:
+                # terminating the thread would orphan the worker processes
+                self._worker.request_stop()
+                print("--- Stopping: windows in progress will finish ---")
+                self._stop_btn.setEnabled(False)
+                return   # _on_done re-enables Run once the workers exit
+            else:
+                self._worker.terminate()
+                print("--- Stopped by user ---")
         self._run_btn.setEnabled(True)
         self._stop_btn.setEnabled(False)
 
+    def _on_progress(self, fraction, text):
+        self._progress.setValue(int(round(1000 * fraction)))
+        self._progress.setFormat(text)
+
     def _on_done(self, processed, skipped):
         print(f"\nAll done.  Processed: {processed}  Skipped/no-data: {skipped}")
         self._run_btn.setEnabled(True)
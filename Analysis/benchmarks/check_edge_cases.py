@@ -0,0 +1,67 @@
+"""Regression checks for edge cases the benchmarks do not exercise.
+
+Each check_* function raises AssertionError on failure; running the file
+calls them all and exits with 1 if any failed.
+
+    python benchmarks/check_edge_cases.py
+"""
+import os
+import sys
+import traceback
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from utils import quantiles
+from utils import denoiseSignal as denoise
+
+
+def check_quantiles_constant_input():
+    """All-equal input: zero histogram width must not break fraction_below."""
+    values = np.full((300, 40), 3.5, dtype=np.float32)
+    for exact in (True, False):
+        engine = quantiles.QuantileEngine(values, exact=exact)
+        assert engine.percentile(75) == 3.5, (exact, engine.percentile(75))
+        assert engine.fraction_below(3.0) == 0.0, exact
+        assert engine.fraction_below(3.5) == 0.0, exact      # strictly below, as np.searchsorted 'left'
+        assert engine.fraction_below(4.0) == 1.0, exact
+
+
+def check_streaming_denoiser_empty_blocks():
+    """Empty blocks (first, in between, last) add nothing and change nothing."""
+    rng = np.random.default_rng(0)
+    x = np.round(rng.normal(0, 50, (20000, 6))).astype(np.int16)
+    x[::997] += 3000
+    for data in (x, x[:, 0]):
+        trailing = data.shape[1:]
+        ref = denoise.StreamingDenoiser()
+        expected = np.concatenate([ref.process(data[:12000]), ref.process(data[12000:]), ref.flush()])
+
+        sd = denoise.StreamingDenoiser()
+        out = [sd.process(data[:0])]
+        assert out[0].shape == (0,) + trailing and out[0].dtype == data.dtype, out[0]
+        out += [sd.process(data[:12000]), sd.process(data[12000:12000]),
+                sd.process(data[12000:]), sd.process(data[:0]), sd.flush()]
+        np.testing.assert_array_equal(np.concatenate(out), expected)
+
+
+def main():
+    failed = 0
+    for name, fn in sorted(globals().items()):
+        if not name.startswith('check_') or not callable(fn):
+            continue
+        try:
+            fn()
+        except Exception:
+            failed += 1
+            print(f"{name:<40} FAIL")
+            traceback.print_exc()
+        else:
+            print(f"{name:<40} ok")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Check the fast denoise kernels against the pure-Python originals.
+
+utils.denoiseSignal replaced the loop implementations that BeeSpy's
+plotBinary used (now benchmarks/reference_denoise.py).  This compares the
+two on a synthetic channel with injected spikes and times them:
+
+    rmean           equal away from the edges (the originals pad the first
+                    and last windows differently), for odd and even n
+    rmedian         equal away from the edges for odd n; for even n the
+                    original averages the two middle values, the fast one
+                    takes the upper one (as scipy's median_filter does)
+    umw_denoise     every injected spike removed by both, and both replace
+                    the same neighbourhoods (within rad samples of each
+                    other); the replacement values differ where the even
+                    window median does.  The original's detrend step is off:
+                    it evaluated the fit at the signal values, not the times
+
+Exits with 1 if any check fails.
+
+    python benchmarks/check_reference.py
+    python benchmarks/check_reference.py --samples 1000000 --spikes 500
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+sys.path.insert(0, HERE)
+
+from utils import denoiseSignal as denoise
+import reference_denoise as reference
+
+MEAN_WINDOWS = (5, 6, 10, 61)
+MEDIAN_WINDOWS = (3, 5, 7, 11, 31)
+
+
+def _signal(n, n_spikes, seed=0):
+    """int16 channel: noise plus a slow tone, with n_spikes ±2000 impulses."""
+    rng = np.random.default_rng(seed)
+    clean = rng.normal(0, 50, n) + 10 * np.sin(np.arange(n) / 50)
+    spikes = rng.choice(n, n_spikes, replace=False)
+    x = clean.copy()
+    x[spikes] += rng.choice([-1, 1], n_spikes) * 2000
+    return np.round(x).astype(np.int16), clean, spikes
+
+
+def _near(mask, rad):
+    """mask widened by rad samples either side."""
+    out = mask.copy()
+    for k in range(1, rad + 1):
+        out[k:] |= mask[:-k]
+        out[:-k] |= mask[k:]
+    return out
+
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def run(samples, n_spikes, sens=5, rad=3):
+    x, clean, spikes = _signal(samples, n_spikes)
+    denoise.rmean(x[:100], 5)           # load scipy.ndimage outside the timings
+    results = []
+
+    def check(name, ok, t_ref, t_fast, note=''):
+        speedup = t_ref / t_fast if t_fast > 0 else float('inf')
+        results.append(ok)
+        print(f"{name:<16} {'ok' if ok else 'FAIL':<5} reference {t_ref:7.3f}s  "
+              f"fast {t_fast:7.4f}s  x{speedup:,.0f}  {note}")
+
+    for n in MEAN_WINDOWS:
+        ref, t_ref = _timed(reference.rmean, x, n)
+        fast, t_fast = _timed(denoise.rmean, x, n)
+        err = np.abs(ref - fast)[n:-n].max()
+        check(f"rmean n={n}", err < 1e-9, t_ref, t_fast, f"max diff {err:.1e}")
+
+    for n in MEDIAN_WINDOWS:
+        ref, t_ref = _timed(reference.rmedian, x, n)
+        fast, t_fast = _timed(denoise.rmedian, x, n)
+        err = np.abs(ref - fast)[n:-n].max()
+        check(f"rmedian n={n}", err == 0, t_ref, t_fast, f"max diff {err:.1e}")
+
+    ref, t_ref = _timed(reference.umw_denoise, x.copy(), sens, rad, detrend=False)
+    fast, t_fast = _timed(denoise.umw_denoise, x, sens, rad)
+    limit = 6 * clean.std()
+    res_ref = np.abs(ref[spikes] - clean[spikes]).max()
+    res_fast = np.abs(fast[spikes] - clean[spikes]).max()
+    # the original round-trips through float and truncates, so ±1 is not a change
+    changed_ref = np.abs(ref.astype(np.float64) - x) > 1
+    changed_fast = fast != x
+    stray = (np.count_nonzero(changed_fast & ~_near(changed_ref, rad))
+             + np.count_nonzero(changed_ref & ~_near(changed_fast, rad)))
+    check("umw_denoise", res_ref < limit and res_fast < limit and stray == 0, t_ref, t_fast,
+          f"spike residual {res_ref:.0f} / {res_fast:.0f} (limit {limit:.0f}), "
+          f"{stray} samples replaced by only one")
+    return all(results)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare utils.denoiseSignal with the reference loops")
+    ap.add_argument('--samples', type=int, default=200_000)
+    ap.add_argument('--spikes', type=int, default=200)
+    args = ap.parse_args(argv)
+    return 0 if run(args.samples, args.spikes) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Start-up cost of the Analysis modules, from python -X importtime.
+
+Each module is imported in a fresh interpreter (best of --repeat runs) and
+the report lists its total import time, the heaviest packages it pulled
+in, and any it must not load at import time:
+
+    core modules (utils.processing, batch_cli, ...)  no PyQt5, matplotlib,
+        pandas or the Dropbox SDK — they run headless and in worker
+        processes, and pandas / scipy.signal load on first use
+    GUI apps  no pandas, scipy.signal or Dropbox SDK at start-up, and
+        batch_daily_pipeline must not import localApp or matplotlib
+
+The GUI apps are skipped when PyQt5 is not installed.  Exits with 1 if any
+module loads something it must not (so it can run in CI), after printing
+the table; --json writes the measurements too.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 --json benchmarks/results/imports.json
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ANALYSIS = os.path.dirname(HERE)
+
+_CORE_FORBIDDEN = ('PyQt5', 'matplotlib', 'pandas', 'dropbox')
+_GUI_FORBIDDEN = ('pandas', 'scipy.signal', 'dropbox')
+
+CORE = {name: _CORE_FORBIDDEN for name in (
+    'utils.processing', 'utils.daily_pipeline', 'utils.spect', 'utils.denoiseSignal',
+    'utils.binaryConvert', 'utils.utils', 'utils.precision', 'utils.instrument',
+    'utils.log', 'utils.progress', 'utils.quantiles', 'utils.periodogram',
+    'utils.rhythms', 'utils.worker_pool', 'batch_cli',
+)}
+GUI = {
+    'localApp':              _GUI_FORBIDDEN,
+    'batch_daily_pipeline':  _GUI_FORBIDDEN + ('localApp', 'matplotlib'),
+    'circadian_prototyping': _GUI_FORBIDDEN,
+}
+
+
+def _importtime(module):
+    """{name: (self_us, cumulative_us, depth)} for one fresh import of module."""
+    env = dict(os.environ)
+    env.pop('BEESPY_TRACE', None)
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                         cwd=ANALYSIS, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{out.stderr.strip().splitlines()[-1]}")
+    rows = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.setdefault(name.strip(), (int(self_us), int(cum_us), depth))
+    return rows
+
+
+def measure(module, forbidden, repeat):
+    best = None
+    for _ in range(repeat):
+        rows = _importtime(module)
+        if best is None or rows[module][1] < best[module][1]:
+            best = rows
+    total_ms = best[module][1] / 1000
+    # heaviest top-level packages loaded on the way
+    packages = {}
+    for name, (_, cum, _) in best.items():
+        top = name.split('.')[0]
+        if name == top and top != module.split('.')[0]:
+            packages[top] = cum / 1000
+    heaviest = sorted(packages.items(), key=lambda kv: -kv[1])[:4]
+    bad = sorted(f for f in forbidden
+                 if f in best or any(n.startswith(f + '.') for n in best))
+    return {'module': module, 'total_ms': total_ms, 'heaviest': heaviest, 'forbidden': bad}
+
+
+def _has_qt():
+    try:
+        import PyQt5.QtCore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure module import (start-up) time")
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--json', help="also write the measurements here")
+    args = ap.parse_args(argv)
+
+    targets = dict(CORE)
+    if _has_qt():
+        targets.update(GUI)
+    else:
+        print(f"PyQt5 not installed — skipping {', '.join(GUI)}")
+
+    results, failed = [], False
+    print(f"{'module':<24} {'import ms':>9}  heaviest packages (cumulative ms)")
+    for module, forbidden in targets.items():
+        try:
+            r = measure(module, forbidden, args.repeat)
+        except RuntimeError as e:
+            print(f"{module:<24} {'':>9}  ERROR: {e}")
+            failed = True
+            continue
+        results.append(r)
+        heavy = ', '.join(f"{name} {ms:.0f}" for name, ms in r['heaviest'])
+        print(f"{module:<24} {r['total_ms']:>9.1f}  {heavy}")
+        if r['forbidden']:
+            print(f"{'':<24} {'':>9}  FAIL: loads {', '.join(r['forbidden'])} at import time")
+            failed = True
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,10 @@
+"""Reference (pure-Python) running mean / median and umw_denoise.
+
+The original implementations from BeeSpy/utils/denoiseSignal.py, kept only
+as oracles for check_reference.py: utils.denoiseSignal replaces them with
+scipy / sorting-network kernels that are orders of magnitude faster.  Do
+not import these from the pipeline.
+"""
 from math import fabs
 import numpy as np
 
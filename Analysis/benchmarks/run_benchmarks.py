@@ -0,0 +1,252 @@
+"""Benchmark harness for the .bin → spectrogram → activity pipeline.
+
+Generates synthetic recordings (synth_bin.py) of several sizes and times
+each stage on them:
+
+    read            binaryConvert.beespy_arduino_reader, every file
+    denoise         denoiseSignal.umw_denoise, every channel of every file
+    spectrogram     spect.dospectrogram on the denoised channels
+    process[<agg>]  processing.process_bin_files, one run per agg mode
+    activity        daily_pipeline.run_activity_pipeline on the Average output
+    write_chunked   processing.write_chunked_spectrograms (6 CSVs)
+    write_day       daily_pipeline._save_day (6 CSVs + activity CSV)
+    load_loadtxt    np.loadtxt, as localApp's spectrogram loaders read them
+    load_float32    circadian_prototyping._csv_to_float32 (needs PyQt5)
+
+Each stage reports the best and median of --repeat runs and MB of .bin
+data per second.  The percentile agg modes are much slower than the rest;
+restrict --agg when timing large sizes.  Results go to a JSON file (default
+benchmarks/results/bench_<timestamp>.json) together with the git commit,
+library versions and working precision, so runs can be compared over
+time; --baseline prints the ratio to an earlier file and exits with 1 when
+a stage got slower than --tolerance allows.
+
+    python benchmarks/run_benchmarks.py --sizes 1 5 20 --repeat 3
+    python benchmarks/run_benchmarks.py --quick --baseline benchmarks/results/old.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+import subprocess
+import contextlib
+
+import numpy as np
+import scipy
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+sys.path.insert(0, HERE)
+
+from utils import binaryConvert as bc
+from utils import denoiseSignal as denoise
+from utils import spect
+from utils import precision
+from utils import processing
+from utils import daily_pipeline
+import synth_bin
+
+AGG_MODES = ["Average", "Maximum", "75th percentile", "90th percentile", "95th percentile"]
+START = datetime.datetime(2026, 3, 1, 10, 0, 0)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _time(fn, repeat):
+    """(best, median) wall time of fn() over repeat runs; fn's output is discarded."""
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+
+def _make_data(folder, size_min, file_min, args):
+    """Synthetic recordings totalling size_min minutes; returns (filenames, bytes)."""
+    n_files = max(1, int(np.ceil(size_min / file_min)))
+    duration = min(size_min, file_min) * 60.0
+    names = synth_bin.write_bin_series(folder, START, n_files=n_files, duration_s=duration,
+                                       rate=args.rate, spikes=args.spikes,
+                                       overruns=args.overruns, seed=args.seed)
+    size = sum(os.path.getsize(os.path.join(folder, n)) for n in names)
+    return names, size
+
+
+def _time_dsp(paths, window, args, record):
+    """read, denoise and spectrogram stages.  The decoded and denoised
+    channels go out of scope on return, before the processing stages run."""
+    raw = [bc.beespy_arduino_reader(p) for p in paths]
+    record('read', *_time(lambda: [bc.beespy_arduino_reader(p) for p in paths], args.repeat))
+
+    dtype = precision.get_dtype()
+    def _denoise():
+        return [denoise.umw_denoise(x[:, c], 5, 5, dtype=dtype)
+                for x in raw for c in range(x.shape[1])]
+    denoised = _denoise()
+    record('denoise', *_time(_denoise, args.repeat))
+
+    fft_dtype = None if dtype is np.float64 else dtype
+    def _spectrogram():
+        return [spect.dospectrogram(d, args.rate, window, 0, dtype=fft_dtype) for d in denoised]
+    spect.dospectrogram(denoised[0][:args.rate], args.rate, window, 0)   # load scipy.signal untimed
+    record('spectrogram', *_time(_spectrogram, args.repeat))
+
+
+def run_size(size_min, args):
+    """Time every stage on size_min minutes of data; returns the result entries."""
+    results = []
+
+    def record(stage, best=None, median=None, skipped=None):
+        entry = {'stage': stage, 'size_min': size_min, 'bytes': n_bytes}
+        if skipped is not None:
+            entry['skipped'] = skipped
+            print(f"  {stage:<26} skipped: {skipped}")
+        else:
+            entry.update(repeat=args.repeat, best_s=best, median_s=median,
+                         mb_per_s=n_bytes / 1e6 / best if best > 0 else None)
+            print(f"  {stage:<26} best {best:9.3f} s  median {median:9.3f} s  "
+                  f"{entry['mb_per_s']:8.1f} MB/s")
+        results.append(entry)
+
+    with tempfile.TemporaryDirectory(prefix='beespy_bench_') as tmp:
+        bin_dir = os.path.join(tmp, 'bin')
+        names, n_bytes = _make_data(bin_dir, size_min, args.file_minutes, args)
+        print(f"\n{size_min:g} min of recording ({len(names)} file(s), {n_bytes / 1e6:.1f} MB):")
+        paths = [os.path.join(bin_dir, n) for n in names]
+        end = START + datetime.timedelta(minutes=size_min)
+        window = args.window
+
+        _time_dsp(paths, window, args, record)
+
+        specs = None
+        for agg in args.agg:
+            def _process(agg=agg):
+                return processing.process_bin_files(bin_dir, names, START, end, args.rate, window, window,
+                                                    args.min_freq, args.max_freq, agg=agg,
+                                                    local_bin_folder=bin_dir)
+            record(f'process[{agg}]', *_time(_process, args.repeat))
+            if agg == "Average":
+                with contextlib.redirect_stdout(io.StringIO()):
+                    specs = _process()
+        if specs is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                specs = processing.process_bin_files(bin_dir, names, START, end, args.rate, window, window,
+                                                     args.min_freq, args.max_freq,
+                                                     local_bin_folder=bin_dir)
+
+        record('activity', *_time(lambda: daily_pipeline.run_activity_pipeline(specs, args.percentile),
+                                  args.repeat))
+        timestamps, activity, bands = daily_pipeline.run_activity_pipeline(specs, args.percentile)
+
+        out_dir = os.path.join(tmp, 'out')
+        os.makedirs(out_dir)
+        record('write_chunked', *_time(lambda: processing.write_chunked_spectrograms(out_dir, specs, START, end),
+                                       args.repeat))
+        if timestamps is None:
+            record('write_day', skipped="no activity output")
+        else:
+            record('write_day', *_time(lambda: daily_pipeline._save_day(out_dir, START, end, specs, timestamps,
+                                                                        activity, bands), args.repeat))
+
+        csvs = [processing._chunk_csv_path(out_dir, START, end, c) for c in range(1, 7)]
+        record('load_loadtxt', *_time(lambda: [np.loadtxt(p, delimiter=',') for p in csvs], args.repeat))
+        try:
+            from circadian_prototyping import _csv_to_float32
+        except ImportError as e:
+            record('load_float32', skipped=f"circadian_prototyping not importable ({e})")
+        else:
+            record('load_float32', *_time(lambda: [_csv_to_float32(p) for p in csvs], args.repeat))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print best-time ratios against a baseline result file; True if nothing regressed."""
+    old = {(r['stage'], r['size_min']): r for r in baseline['results'] if 'best_s' in r}
+    ok = True
+    print(f"\nvs baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('date')}):")
+    for r in results:
+        ref = old.get((r['stage'], r['size_min']))
+        if ref is None or 'best_s' not in r:
+            continue
+        ratio = r['best_s'] / ref['best_s'] if ref['best_s'] > 0 else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag, ok = '  SLOWER', False
+        print(f"  {r['stage']:<26} {r['size_min']:>6g} min  {ref['best_s']:>9.3f} s → "
+              f"{r['best_s']:>9.3f} s  x{ratio:.2f}{flag}")
+    return ok
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Time the BeeSpy pipeline on synthetic recordings")
+    ap.add_argument('--sizes', type=float, nargs='+', default=[1, 5, 20],
+                    help="minutes of recording per benchmark size")
+    ap.add_argument('--quick', action='store_true', help="one 1-minute size, one repeat")
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--agg', nargs='+', default=AGG_MODES, choices=AGG_MODES)
+    ap.add_argument('--file-minutes', type=float, default=10.0, help="length of each synthetic file")
+    ap.add_argument('--rate', type=int, default=5000)
+    ap.add_argument('--window', type=float, default=0.2)
+    ap.add_argument('--min-freq', type=float, default=0)
+    ap.add_argument('--max-freq', type=float, default=500)
+    ap.add_argument('--percentile', type=float, default=75)
+    ap.add_argument('--spikes', type=int, default=50, help="spikes per channel per file")
+    ap.add_argument('--overruns', type=int, default=2, help="overrun gaps per file")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--precision', choices=['float64', 'float32'])
+    ap.add_argument('--out', help="result JSON path (default benchmarks/results/bench_<timestamp>.json)")
+    ap.add_argument('--baseline', help="earlier result JSON to compare against")
+    ap.add_argument('--tolerance', type=float, default=0.2,
+                    help="allowed slowdown vs the baseline (0.2 = 20%%)")
+    args = ap.parse_args(argv)
+    if args.quick:
+        args.sizes, args.repeat = [1], 1
+    if args.precision:
+        precision.set_precision(args.precision)
+
+    now = datetime.datetime.now()
+    meta = {
+        'date':      now.strftime('%Y-%m-%d %H:%M:%S'),
+        'commit':    _git_commit(),
+        'python':    platform.python_version(),
+        'numpy':     np.__version__,
+        'scipy':     scipy.__version__,
+        'platform':  platform.platform(),
+        'cpus':      os.cpu_count(),
+        'precision': precision.get_precision(),
+        'settings':  {k: v for k, v in vars(args).items() if k not in ('out', 'baseline', 'quick')},
+    }
+    results = []
+    for size_min in args.sizes:
+        results += run_size(size_min, args)
+
+    out = args.out or os.path.join(HERE, 'results', f"bench_{now:%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return 0 if compare(results, baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Synthetic BeeSpy .bin recordings for benchmarks and tests.
+
+Files use the logger's on-card layout (AvrAdcLogger.h): one 64-byte
+metadata_t block followed by 64-byte block16_t blocks
+
+    uint16 count, uint16 overrun, uint16 data[30]
+
+with the channels interleaved sample by sample and count = channels *
+(30 // channels) values per block, so beespy_arduino_reader (6 channels)
+and beespy_arduino_reader16 read them like real recordings.  Filenames are
+the recording start, YYYY_MM_DD_HH_MM_SS.bin, as utils.extract_start_time
+expects.
+
+The signal is a 10-bit ADC trace: a mid-scale baseline plus Gaussian noise,
+optional sine tones, single-sample impulse spikes (what umw_denoise removes)
+and overruns, where the logger drops samples and records how many in the
+next block's overrun field.  Everything is seeded, so a given call always
+writes the same bytes.
+
+    python benchmarks/synth_bin.py out_dir --start 2026-03-01T10:00:00 \\
+        --files 6 --minutes 10 --tone 120:40 --spikes 50 --overruns 3
+"""
+import os
+import sys
+import struct
+import argparse
+import datetime
+import numpy as np
+
+BLOCK_SIZE = 64
+DATA_DIM16 = (BLOCK_SIZE - 4) // 2           # uint16 values per data block
+PIN_NUM_DIM = BLOCK_SIZE - 3 * 4 - 2         # metadata_t.pinNumber length
+CPU_FREQUENCY = 16_000_000
+ADC_FREQUENCY = CPU_FREQUENCY // 128
+ADC_MAX = 1023
+_CHUNK_BLOCKS = 1 << 16                      # blocks generated per write
+
+
+def bin_filename(start):
+    """Recording filename for a start datetime."""
+    return start.strftime('%Y_%m_%d_%H_%M_%S') + '.bin'
+
+
+def _metadata_block(rate, channels):
+    pins = bytes(range(channels)).ljust(PIN_NUM_DIM, b'\0')
+    interval = int(round(CPU_FREQUENCY / rate))
+    return struct.pack('<IIIBB', ADC_FREQUENCY, CPU_FREQUENCY, interval, 0, channels) + pins
+
+
+def write_bin(path, duration_s=60.0, rate=5000, channels=6, tones=((120.0, 40.0),),
+              noise=20.0, spikes=0, spike_height=400, overruns=0, max_overrun=20, seed=0):
+    """Write one synthetic recording of duration_s seconds of wall time.
+
+    tones: (frequency Hz, amplitude in ADC counts) pairs added to every
+    channel (with a per-channel phase); spikes: impulses per channel at
+    random samples; overruns: number of blocks preceded by a gap of
+    1..max_overrun dropped samples.  Returns a summary dict (samples
+    written, dropped samples, spike sample indices per channel).
+    """
+    if not 1 <= channels <= DATA_DIM16:
+        raise ValueError(f"channels must be 1..{DATA_DIM16}")
+    rng = np.random.default_rng(seed)
+    per_block = DATA_DIM16 // channels          # samples per block
+    n_true = int(round(duration_s * rate))
+
+    # Overruns: block b starts after drops[b] samples were lost in front of it
+    n_blocks = -(-n_true // per_block)
+    drops = np.zeros(n_blocks + 1, dtype=np.int64)
+    if overruns and n_blocks > 1:
+        at = rng.choice(np.arange(1, n_blocks), size=min(overruns, n_blocks - 1), replace=False)
+        drops[at] = rng.integers(1, max_overrun + 1, size=at.size)
+    lost = np.cumsum(drops)
+    # blocks needed once the dropped samples are taken out
+    n_blocks = int(np.searchsorted(np.arange(n_blocks + 1) * per_block + lost, n_true))
+    n_blocks = max(n_blocks, 1)
+    n_rec = min(n_blocks * per_block, n_true - int(lost[n_blocks - 1]))
+
+    phases = rng.uniform(0, 2 * np.pi, size=(len(tones), channels))
+    spike_at = [np.sort(rng.choice(n_rec, size=min(spikes, n_rec), replace=False))
+                for _ in range(channels)]
+    spike_sign = [rng.choice([-1, 1], size=s.size) for s in spike_at]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(_metadata_block(rate, channels))
+        for b0 in range(0, n_blocks, _CHUNK_BLOCKS):
+            b1 = min(n_blocks, b0 + _CHUNK_BLOCKS)
+            j = np.arange(b0 * per_block, b1 * per_block)       # recorded sample index
+            valid = j < n_rec
+            t = (j + lost[j // per_block]) / rate              # true sample time
+            x = ADC_MAX / 2 + noise * rng.standard_normal((j.size, channels))
+            for (freq, amp), ph in zip(tones, phases):
+                x += amp * np.sin(2 * np.pi * freq * t[:, None] + ph)
+            for c in range(channels):
+                sel = (spike_at[c] >= j[0]) & (spike_at[c] <= j[-1])
+                x[spike_at[c][sel] - j[0], c] += spike_sign[c][sel] * spike_height
+            x = np.clip(np.rint(x), 0, ADC_MAX).astype('<u2')
+            x[~valid] = 0
+
+            blocks = np.zeros((b1 - b0, BLOCK_SIZE // 2), dtype='<u2')
+            blocks[:, 0] = valid.reshape(-1, per_block).sum(axis=1) * channels
+            blocks[:, 1] = np.minimum(drops[b0:b1], 0xFFFF)
+            blocks[:, 2:2 + per_block * channels] = x.reshape(b1 - b0, -1)
+            f.write(blocks.tobytes())
+    return {'path': path, 'samples': n_rec, 'dropped': int(lost[n_blocks - 1]),
+            'blocks': n_blocks, 'spikes': spike_at}
+
+
+def write_bin_series(folder, start, n_files=1, duration_s=600.0, gap_s=0.0, seed=0, **kwargs):
+    """Write n_files consecutive recordings starting at start (a datetime).
+
+    Each file starts duration_s + gap_s after the previous one and gets its
+    own seed; other keyword arguments go to write_bin.  Returns the
+    filenames in time order.
+    """
+    names = []
+    for i in range(n_files):
+        t0 = start + datetime.timedelta(seconds=i * (duration_s + gap_s))
+        name = bin_filename(t0)
+        write_bin(os.path.join(folder, name), duration_s, seed=seed + i, **kwargs)
+        names.append(name)
+    return names
+
+
+def _tone(text):
+    freq, _, amp = text.partition(':')
+    return float(freq), float(amp or 40.0)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write synthetic BeeSpy .bin recordings")
+    ap.add_argument('folder')
+    ap.add_argument('--start', default='2026-03-01T10:00:00', help="first file's start (ISO format)")
+    ap.add_argument('--files', type=int, default=1)
+    ap.add_argument('--minutes', type=float, default=10.0, help="duration of each file")
+    ap.add_argument('--gap', type=float, default=0.0, help="seconds between files")
+    ap.add_argument('--rate', type=int, default=5000)
+    ap.add_argument('--channels', type=int, default=6)
+    ap.add_argument('--tone', type=_tone, action='append', metavar='HZ:AMP',
+                    help="add a tone (repeatable; default 120:40)")
+    ap.add_argument('--noise', type=float, default=20.0)
+    ap.add_argument('--spikes', type=int, default=0, help="spikes per channel per file")
+    ap.add_argument('--overruns', type=int, default=0, help="overrun gaps per file")
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args(argv)
+
+    names = write_bin_series(args.folder, datetime.datetime.fromisoformat(args.start),
+                             n_files=args.files, duration_s=args.minutes * 60, gap_s=args.gap,
+                             seed=args.seed, rate=args.rate, channels=args.channels,
+                             tones=args.tone or [(120.0, 40.0)], noise=args.noise,
+                             spikes=args.spikes, overruns=args.overruns)
+    for name in names:
+        print(os.path.join(args.folder, name))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,8 +21,8 @@ import re
 import datetime
 import traceback
 import numpy as np
-import pandas as pd
-from scipy.signal import lombscargle
+# pandas is imported inside the functions that use it (CSV loading, smoothing,
+# date axes), so the window opens without loading it
 
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPalette, QColor
@@ -36,6 +36,10 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.dates as mdates
 
+from utils import instrument, quantiles
+from utils.rhythms import (batch_actograms, batch_lomb_scargle, day_index,
+                          rolling_time_mean, subtract_group_means)
+
 # Max time columns / frequency rows to display (downsampled for speed); does not affect computation
 MAX_DISPLAY_COLS = 1500
 MAX_DISPLAY_ROWS = 512
@@ -54,47 +58,38 @@ def _csv_to_float32(path):
     Reads as float64 with the C engine (pandas is faster that way) then casts.
     Falls back to a pure read_csv if something goes wrong.
     """
-    mb = os.path.getsize(path) / 1_048_576
-    print(f"    reading {os.path.basename(path)}  ({mb:.1f} MB) …", flush=True)
-    t0 = _now()
-    try:
-        arr = pd.read_csv(path, header=None, dtype=np.float64,
-                          engine='c', low_memory=False).values.astype(np.float32)
-    except Exception:
-        arr = pd.read_csv(path, header=None).values.astype(np.float32)
-    print(f"    → {arr.shape}  loaded in {_now()-t0:.1f}s", flush=True)
+    import pandas as pd
+    size = os.path.getsize(path)
+    print(f"    reading {os.path.basename(path)}  ({size / 1_048_576:.1f} MB) …", flush=True)
+    with instrument.span('load', file=os.path.basename(path), bytes=size) as span:
+        try:
+            arr = pd.read_csv(path, header=None, dtype=np.float64,
+                              engine='c', low_memory=False).values.astype(np.float32)
+        except Exception:
+            arr = pd.read_csv(path, header=None).values.astype(np.float32)
+        span['shape'] = arr.shape
     return arr
 
 
-def _now():
-    import time
-    return time.perf_counter()
-
-
+@instrument.timed('load_standard')
 def load_standard_spectrograms(folder):
-    import time
     print(f"\n[load_standard] folder: {folder}", flush=True)
-    t_total = time.perf_counter()
     specs = []
     for c in range(1, 7):
         path = os.path.join(folder, f"Spectrogram_{c}.csv")
         if os.path.exists(path):
             print(f"  ch{c}: loading …", flush=True)
-            t0 = time.perf_counter()
             arr = _csv_to_float32(path)
-            print(f"  ch{c}: done ({time.perf_counter()-t0:.1f}s)", flush=True)
             specs.append((c, arr))
         else:
             print(f"  ch{c}: not found, skipping", flush=True)
             specs.append((c, None))
-    print(f"[load_standard] total: {time.perf_counter()-t_total:.1f}s\n", flush=True)
     return specs
 
 
+@instrument.timed('load_chunked')
 def load_chunked_spectrograms(folder):
-    import time
     print(f"\n[load_chunked] folder: {folder}", flush=True)
-    t_total = time.perf_counter()
 
     chunks = {}
     for fname in sorted(os.listdir(folder)):
@@ -120,7 +115,6 @@ def load_chunked_spectrograms(folder):
             continue
         pieces = sorted(chunks[ch], key=lambda x: x[0])
         print(f"  ch{ch}: {len(pieces)} chunk(s)", flush=True)
-        t0 = time.perf_counter()
 
         # Collect all piece arrays then concatenate once (avoids O(n²) copies)
         arrays = []
@@ -142,10 +136,8 @@ def load_chunked_spectrograms(folder):
 
         print(f"  ch{ch}: concatenating {len(arrays)} array(s) …", flush=True)
         combined = np.concatenate(arrays, axis=1)
-        print(f"  ch{ch}: shape {combined.shape}  ({time.perf_counter()-t0:.1f}s)", flush=True)
+        print(f"  ch{ch}: shape {combined.shape}", flush=True)
         results.append((ch, combined))
-
-    print(f"[load_chunked] total: {time.perf_counter()-t_total:.1f}s\n", flush=True)
     return results
 
 
@@ -186,7 +178,7 @@ def detect_noise_bands(spec, high_power_pct=95, low_cv_threshold=0.05):
     row_means = np.nanmean(power, axis=1)
     row_stds  = np.nanstd(power,  axis=1)
     cv        = row_stds / (np.abs(row_means) + 1e-7)
-    high_power_mask = row_means > np.nanpercentile(row_means, high_power_pct)
+    high_power_mask = row_means > quantiles.nanpercentile(row_means, high_power_pct)
     low_cv_mask     = cv < low_cv_threshold
     return high_power_mask | low_cv_mask, row_means, cv
 
@@ -247,9 +239,11 @@ def apply_normalisation(spec, method):
     return rebuild_spec(spec_freqs(spec), spec_times(spec), power)
 
 
-def apply_percentile_filter(spec, percentile):
+def apply_percentile_filter(spec, percentile, exact=True):
+    # exact=False (or None above quantiles.EXACT_MAX cells) takes the threshold
+    # from a histogram, within one bin width of the exact percentile
     power = spec_power(spec).copy()
-    threshold = np.nanpercentile(power, percentile)
+    threshold = quantiles.nanpercentile(power, percentile, exact=exact)
     power[power < threshold] = np.nan
     return rebuild_spec(spec_freqs(spec), spec_times(spec), power)
 
@@ -364,6 +358,7 @@ def apply_smoothing(timestamps, values, window, method='Rolling mean',
     sg_polyorder  : polynomial order for Savitzky-Golay
     loess_frac    : fraction of data used for each LOESS fit
     """
+    import pandas as pd
     n = len(values)
     if n < 2 or window < 2:
         return timestamps[::max(1, step)], values[::max(1, step)]
@@ -409,17 +404,15 @@ def apply_smoothing(timestamps, values, window, method='Rolling mean',
 
 
 def apply_detrending(timestamps, values, method, window=48):
+    import pandas as pd
     v = values.copy()
     if method == 'Subtract rolling mean':
         trend = pd.Series(v).rolling(window, center=True, min_periods=1).mean().values
         return timestamps, v - trend
     elif method == 'Subtract daily mean':
-        dts  = pd.to_datetime(timestamps, unit='s', utc=True)
-        days = dts.normalize()
-        for day in days.unique():
-            mask = (days == day).values
-            v[mask] -= np.nanmean(v[mask])
-        return timestamps, v
+        return timestamps, subtract_group_means(v, day_index(timestamps))
+    elif method == 'Subtract rolling daily mean':
+        return timestamps, v - rolling_time_mean(timestamps, v, 86400.0)
     elif method == 'Linear detrend':
         x      = np.arange(len(v))
         finite = np.isfinite(v)
@@ -436,80 +429,30 @@ def build_actogram(timestamps, values, period_hours=24.0):
       grid        — (n_days, 2*n_bins) float array, double-plotted (day repeated in cols)
       day_labels  — list of date strings for the y-axis
       period_hours — the period used (passed through for the x-axis)
-    """
-    dts      = pd.to_datetime(timestamps, unit='s', utc=True)
-    day_zero = dts.normalize().min()
-
-    # number of time steps per period
-    diffs   = np.diff(timestamps)
-    dt_step = float(np.median(diffs[diffs > 0])) if len(diffs) > 0 else 3600.0
-    n_bins  = max(1, round(period_hours * 3600.0 / dt_step))
-
-    # which period-length window each sample falls in (0-based day index)
-    elapsed_h = (timestamps - float(timestamps[0])) / 3600.0
-    day_idx   = np.floor(elapsed_h / period_hours).astype(int)
-    n_days    = int(day_idx.max()) + 1 if len(day_idx) else 1
 
-    # bin within the period
-    frac_in_period = (elapsed_h % period_hours) / period_hours
-    bin_idx = np.floor(frac_in_period * n_bins).astype(int).clip(0, n_bins - 1)
-
-    counts   = np.zeros((n_days, n_bins))
-    grid_sum = np.zeros((n_days, n_bins))
-    finite_mask = np.isfinite(values)
-    np.add.at(grid_sum, (day_idx[finite_mask], bin_idx[finite_mask]), values[finite_mask])
-    np.add.at(counts,   (day_idx[finite_mask], bin_idx[finite_mask]), 1)
-
-    with np.errstate(invalid='ignore'):
-        single = np.where(counts > 0, grid_sum / counts, np.nan)
-
-    # Double-plot: repeat each row side by side
-    grid = np.concatenate([single, single], axis=1)
-
-    # Day labels from the start timestamp of each row
-    day_starts = [
-        pd.to_datetime(float(timestamps[0]) + r * period_hours * 3600, unit='s', utc=True)
-        for r in range(n_days)
-    ]
-    day_labels = [d.strftime('%d %b') for d in day_starts]
-
-    return grid, day_labels, period_hours
+    For many series at once use utils.rhythms.batch_actograms.
+    """
+    grids, day_labels, period_hours = batch_actograms(timestamps, values[None, :], period_hours)
+    return grids[0], day_labels, period_hours
 
 
-def compute_lomb_scargle(timestamps, values, n_freqs=3000):
+def compute_lomb_scargle(timestamps, values, n_freqs=3000, method='auto'):
     """Compute a Lomb-Scargle periodogram over the 15–30 h period range.
 
     Returns (periods_hours, power, peak_period_hours, peak_power).
     Uses a slightly wider internal range (10–36 h) to avoid edge artefacts,
-    but only the 15–30 h slice is returned.
+    but only the 15–30 h slice is returned.  method picks the backend in
+    utils.periodogram ('auto', 'direct', 'fast' or 'grid').
+
+    For many series at once use utils.rhythms.batch_lomb_scargle.
     """
-    finite = np.isfinite(values)
-    if finite.sum() < 4:
+    if np.isfinite(values).sum() < 4:
         return None, None, None, None
-
-    t = (timestamps[finite].astype(float) - timestamps[finite][0]) / 3600.0  # hours
-    y = values[finite].astype(float)
-    y -= np.mean(y)
-
-    # Angular frequencies: slightly wider than display range
-    freq_lo  = 1.0 / 36.0
-    freq_hi  = 1.0 / 10.0
-    freqs    = np.linspace(freq_lo, freq_hi, n_freqs)   # cycles / hour
-    ang_freq = 2.0 * np.pi * freqs
-
-    power   = lombscargle(t, y, ang_freq, normalize=True)
-    periods = 1.0 / freqs
-
-    # Clip to display range 15–30 h
-    mask    = (periods >= 15.0) & (periods <= 30.0)
-    periods = periods[mask]
-    power   = power[mask]
-
-    if len(power) == 0:
+    periods, power, peak_p, peak_pw = batch_lomb_scargle(timestamps, values[None, :],
+                                                         n_freqs, method)
+    if len(periods) == 0:
         return None, None, None, None
-
-    peak_idx = int(np.argmax(power))
-    return periods, power, periods[peak_idx], float(power[peak_idx])
+    return periods, power[0], float(peak_p[0]), float(peak_pw[0])
 
 
 def compute_band_stats(spec, bands):
@@ -574,7 +517,7 @@ class NoiseBandPreviewDialog(QDialog):
         ax1 = fig.add_subplot(2, 1, 1)
         ax1.set_facecolor('#2a2a3e')
         ax1.plot(freqs, row_means, color='#88aaff', lw=0.8)
-        thresh_power = np.nanpercentile(row_means, high_power_pct)
+        thresh_power = quantiles.nanpercentile(row_means, high_power_pct)
         ax1.axhline(thresh_power, color='#ff6666', lw=1, linestyle='--',
                     label=f'{high_power_pct}th pct threshold')
         ax1.fill_between(freqs, row_means.min(), row_means.max(),
@@ -932,7 +875,8 @@ class CircadianPipelineApp(QWidget):
         dl.addWidget(QLabel("Method:"), 0, 0)
         self.detrend_combo = QComboBox()
         self.detrend_combo.addItems([
-            'Subtract rolling mean', 'Subtract daily mean', 'Linear detrend'])
+            'Subtract rolling mean', 'Subtract daily mean',
+            'Subtract rolling daily mean', 'Linear detrend'])
         self.detrend_combo.currentIndexChanged.connect(lambda *_, g=s7: self._on_step_param_changed(g))
         dl.addWidget(self.detrend_combo, 0, 1)
         dl.addWidget(QLabel("Rolling window (pts):"), 1, 0)
@@ -1339,6 +1283,7 @@ class CircadianPipelineApp(QWidget):
         return ts
 
     def _export_timeseries(self):
+        import pandas as pd
         try:
             if self._last_ts is None:
                 QMessageBox.information(self, "Nothing to export",
@@ -1441,9 +1386,8 @@ class CircadianPipelineApp(QWidget):
                     color='#ff6666', fontsize=10, wrap=True)
             self.canvas.draw()
 
+    @instrument.timed('replot')
     def _replot_inner(self):
-        import time
-        t_plot = time.perf_counter()
         print("\n[replot] starting …", flush=True)
 
         selected = self._selected_specs()
@@ -1479,9 +1423,8 @@ class CircadianPipelineApp(QWidget):
             group = self._spec_groups[sid]
             if not self._step_enabled(group):
                 continue
-            t0 = time.perf_counter()
-            per_ch = [(c, self._apply_spec_step(sid, s)) for c, s in per_ch]
-            print(f"  [spec pre-combine] {self._step_label(sid)}: {time.perf_counter()-t0:.2f}s", flush=True)
+            with instrument.span('spec pre-combine', step=self._step_label(sid)):
+                per_ch = [(c, self._apply_spec_step(sid, s)) for c, s in per_ch]
             if group._show_plot_cb.isChecked():
                 display_specs = [s for _, s in per_ch]
                 disp = (combine_spectrograms(display_specs, combine_method, znorm=znorm)
@@ -1495,13 +1438,13 @@ class CircadianPipelineApp(QWidget):
                     disp, 'heatmap'))
 
         # 2. Combine (s0)
-        t0 = time.perf_counter()
-        specs_to_combine = [s for _, s in per_ch]
-        if len(specs_to_combine) == 1:
-            combined = znorm_spec(specs_to_combine[0]) if znorm else specs_to_combine[0]
-        else:
-            combined = combine_spectrograms(specs_to_combine, combine_method, znorm=znorm)
-        print(f"  [combine s0] {combine_method}: {time.perf_counter()-t0:.2f}s  shape={spec_power(combined).shape}", flush=True)
+        with instrument.span('combine s0', method=combine_method) as span:
+            specs_to_combine = [s for _, s in per_ch]
+            if len(specs_to_combine) == 1:
+                combined = znorm_spec(specs_to_combine[0]) if znorm else specs_to_combine[0]
+            else:
+                combined = combine_spectrograms(specs_to_combine, combine_method, znorm=znorm)
+            span['shape'] = spec_power(combined).shape
 
         s0_group = self._spec_groups['s0']
         if s0_group._show_plot_cb.isChecked():
@@ -1520,9 +1463,8 @@ class CircadianPipelineApp(QWidget):
             group = self._spec_groups[sid]
             if not self._step_enabled(group):
                 continue
-            t0 = time.perf_counter()
-            current = self._apply_spec_step(sid, current)
-            print(f"  [spec post-combine] {self._step_label(sid)}: {time.perf_counter()-t0:.2f}s", flush=True)
+            with instrument.span('spec post-combine', step=self._step_label(sid)):
+                current = self._apply_spec_step(sid, current)
             if group._show_plot_cb.isChecked():
                 stages.append((self._step_label(sid), current, 'heatmap'))
 
@@ -1531,10 +1473,9 @@ class CircadianPipelineApp(QWidget):
 
         s5 = self._ts_groups['s5']
         if self._step_enabled(s5):
-            t0 = time.perf_counter()
             method = self.agg_combo.currentText()
-            ts = aggregate_to_timeseries(current, method)
-            print(f"  [s5 time-agg] {method}: {time.perf_counter()-t0:.2f}s", flush=True)
+            with instrument.span('s5 time-agg', method=method):
+                ts = aggregate_to_timeseries(current, method)
             if s5._show_plot_cb.isChecked():
                 ts_series = [('All freqs', ts[0], ts[1])]
                 bands = parse_manual_bands(self.stats_bands_edit.text().strip())
@@ -1547,15 +1488,13 @@ class CircadianPipelineApp(QWidget):
         if ts is not None:
             s5b = self._ts_groups['s5b']
             if self._step_enabled(s5b):
-                t0 = time.perf_counter()
-                ts = apply_binning(ts[0], ts[1],
-                                   self.bin_size_spin.value(),
-                                   self.bin_step_spin.value(),
-                                   self.bin_func_combo.currentText())
-                print(f"  [s5b binning] size={self.bin_size_spin.value()}min "
-                      f"step={self.bin_step_spin.value()}min "
-                      f"func={self.bin_func_combo.currentText()}: "
-                      f"{time.perf_counter()-t0:.2f}s", flush=True)
+                with instrument.span('s5b binning', size_min=self.bin_size_spin.value(),
+                                     step_min=self.bin_step_spin.value(),
+                                     func=self.bin_func_combo.currentText()):
+                    ts = apply_binning(ts[0], ts[1],
+                                       self.bin_size_spin.value(),
+                                       self.bin_step_spin.value(),
+                                       self.bin_func_combo.currentText())
                 if s5b._show_plot_cb.isChecked():
                     ts_series = [('All freqs', ts[0], ts[1])]
                     bands = parse_manual_bands(self.stats_bands_edit.text().strip())
@@ -1575,15 +1514,14 @@ class CircadianPipelineApp(QWidget):
 
             s6 = self._ts_groups['s6']
             if self._step_enabled(s6):
-                t0     = time.perf_counter()
                 w      = self.smooth_spin.value()
                 sm     = self.smooth_method.currentText()
                 step   = self.smooth_step.value()
-                ts = apply_smoothing(ts[0], ts[1], w,
-                                     method=sm, step=step,
-                                     sg_polyorder=self.smooth_sg_poly.value(),
-                                     loess_frac=self.smooth_loess_frac.value())
-                print(f"  [s6 smooth] {sm} window={w} step={step}: {time.perf_counter()-t0:.2f}s", flush=True)
+                with instrument.span('s6 smooth', method=sm, window=w, step=step):
+                    ts = apply_smoothing(ts[0], ts[1], w,
+                                         method=sm, step=step,
+                                         sg_polyorder=self.smooth_sg_poly.value(),
+                                         loess_frac=self.smooth_loess_frac.value())
                 if s6._show_plot_cb.isChecked():
                     ts_series = [('All freqs', ts[0], ts[1])]
                     bands = parse_manual_bands(self.stats_bands_edit.text().strip())
@@ -1596,11 +1534,10 @@ class CircadianPipelineApp(QWidget):
 
             s7 = self._ts_groups['s7']
             if self._step_enabled(s7):
-                t0 = time.perf_counter()
                 method = self.detrend_combo.currentText()
                 dw     = self.detrend_window.value()
-                ts     = apply_detrending(ts[0], ts[1], method, dw)
-                print(f"  [s7 detrend] {method}: {time.perf_counter()-t0:.2f}s", flush=True)
+                with instrument.span('s7 detrend', method=method):
+                    ts = apply_detrending(ts[0], ts[1], method, dw)
                 if s7._show_plot_cb.isChecked():
                     ts_series = [('All freqs', ts[0], ts[1])]
                     bands = parse_manual_bands(self.stats_bands_edit.text().strip())
@@ -1613,11 +1550,10 @@ class CircadianPipelineApp(QWidget):
 
             s8 = self._ts_groups['s8']
             if self._step_enabled(s8):
-                t0 = time.perf_counter()
                 period = self.circ_period.value()
                 try:
-                    acto = build_actogram(ts[0], ts[1], period)
-                    print(f"  [s8 actogram] {period}h: {time.perf_counter()-t0:.2f}s", flush=True)
+                    with instrument.span('s8 actogram', period_h=period):
+                        acto = build_actogram(ts[0], ts[1], period)
                     if s8._show_plot_cb.isChecked():
                         stages.append((f"Actogram ({period}h period)", acto, 'actogram'))
                 except Exception as e:
@@ -1626,15 +1562,15 @@ class CircadianPipelineApp(QWidget):
         # ── Periodogram stage (s9) ────────────────────────────────────────────
         s9 = self._ts_groups['s9']
         if ts is not None and self._step_enabled(s9):
-            t0 = time.perf_counter()
-            pgram_series = [('All freqs', ts[0], ts[1])]
-            bands = parse_manual_bands(self.stats_bands_edit.text().strip())
-            for lo, hi in bands:
-                band_spec = apply_freq_filter(current, lo, hi)
-                band_ts   = self._run_ts_pipeline(band_spec)
-                if band_ts is not None:
-                    pgram_series.append((f'{lo:.0f}–{hi:.0f} Hz', band_ts[0], band_ts[1]))
-            print(f"  [periodogram] {len(pgram_series)} series built: {time.perf_counter()-t0:.2f}s", flush=True)
+            with instrument.span('periodogram') as span:
+                pgram_series = [('All freqs', ts[0], ts[1])]
+                bands = parse_manual_bands(self.stats_bands_edit.text().strip())
+                for lo, hi in bands:
+                    band_spec = apply_freq_filter(current, lo, hi)
+                    band_ts   = self._run_ts_pipeline(band_spec)
+                    if band_ts is not None:
+                        pgram_series.append((f'{lo:.0f}–{hi:.0f} Hz', band_ts[0], band_ts[1]))
+                span['series'] = len(pgram_series)
             if s9._show_plot_cb.isChecked():
                 stages.append(('Lomb-Scargle Periodogram (15–30 h)', pgram_series, 'periodogram'))
 
@@ -1685,9 +1621,8 @@ class CircadianPipelineApp(QWidget):
             row, col = divmod(i, 3)
             ax = self.fig.add_subplot(gs[row, col])
             _style_ax(ax)
-            t0 = time.perf_counter()
-            self._draw_heatmap(ax, spec, cmap, clip)
-            print(f"  [draw raw] Ch{ch}: {time.perf_counter()-t0:.2f}s", flush=True)
+            with instrument.span('draw raw', channel=ch):
+                self._draw_heatmap(ax, spec, cmap, clip)
             ax.set_title(f"Ch {ch}  (raw)", color='#e0e0f0', fontsize=9, pad=3)
 
         # Pipeline stages — full width
@@ -1696,31 +1631,29 @@ class CircadianPipelineApp(QWidget):
             ax  = self.fig.add_subplot(gs[row, :])
             _style_ax(ax)
 
-            t0 = time.perf_counter()
-            if ptype == 'heatmap':
-                self._draw_heatmap(ax, data, cmap, clip)
-            elif ptype == 'timeseries':
-                self._draw_timeseries(ax, data)
-            elif ptype == 'actogram':
-                self._draw_actogram(ax, data, cmap)
-            elif ptype == 'periodogram':
-                self._draw_periodogram(ax, data)
-            elif ptype == 'error':
+            if ptype == 'error':
                 ax.text(0.5, 0.5, title, ha='center', va='center',
                         transform=ax.transAxes, color='red', fontsize=9)
                 continue
-            print(f"  [draw] '{title[:50]}' ({ptype}): {time.perf_counter()-t0:.2f}s", flush=True)
+            with instrument.span('draw', title=title[:50], type=ptype):
+                if ptype == 'heatmap':
+                    self._draw_heatmap(ax, data, cmap, clip)
+                elif ptype == 'timeseries':
+                    self._draw_timeseries(ax, data)
+                elif ptype == 'actogram':
+                    self._draw_actogram(ax, data, cmap)
+                elif ptype == 'periodogram':
+                    self._draw_periodogram(ax, data)
             ax.set_title(title, color='#e0e0f0', fontsize=9, pad=3)
 
-        t0 = time.perf_counter()
-        self.fig.set_facecolor('#1e1e2e')
-        self.canvas.draw()
-        print(f"  [draw] canvas.draw(): {time.perf_counter()-t0:.2f}s", flush=True)
-        print(f"[replot] total: {time.perf_counter()-t_plot:.2f}s\n", flush=True)
+        with instrument.span('canvas.draw'):
+            self.fig.set_facecolor('#1e1e2e')
+            self.canvas.draw()
 
     # ── Drawing helpers ───────────────────────────────────────────────────────
 
     def _draw_heatmap(self, ax, spec, cmap, clip):
+        import pandas as pd
         power = spec_power(spec)
         times = spec_times(spec)
         freqs = spec_freqs(spec)
@@ -1767,6 +1700,7 @@ class CircadianPipelineApp(QWidget):
 
     def _draw_timeseries(self, ax, ts_data):
         """ts_data may be (timestamps, values) or [(label, timestamps, values), ...]."""
+        import pandas as pd
         _COLOURS = ['#88aaff', '#ff8877', '#77ee99', '#ffbb44',
                     '#cc88ff', '#44eedd', '#ffff66', '#ff88cc']
 
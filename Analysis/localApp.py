@@ -1,408 +1,80 @@
 import os
 import re
 import json
-import pickle
 import shutil
 import datetime
 import numpy as np
-import pandas as pd
 import sys
 import math
-import time
 import threading
+# pandas, scipy.signal and the Dropbox dialogs are imported where they are
+# used, so the window opens without loading them (benchmarks/import_time.py)
 from utils import utils
-from utils import binaryConvert as bc
-from utils import denoiseSignal as denoise
-from utils import spect
 from utils import QThelpers as QThelpers
 from utils import dropbox_helper
-from PyQt5.QtCore import QObject, pyqtSignal, Qt, QThread, QDateTime
+from utils import instrument
+from utils import log
+from utils.progress import Progress
+# Processing core is Qt-free so it can also run headless (see batch_cli.py);
+# re-exported here so existing `from localApp import process_bin_files` keeps working
+from utils.processing import (
+    _as_epoch,
+    _safe_to_delete,
+    _CHK_SUBDIR,
+    _CHUNKED_META_FILE,
+    _CHUNK_FILENAME_RE,
+    _chunk_csv_path,
+    _chunk_is_complete,
+    write_chunked_spectrograms,
+    process_all_chunks,
+    _checkpoint_settings_key,
+    _checkpoint_meta_matches,
+    _write_checkpoint,
+    _load_checkpoint,
+    _read_checkpoint_meta,
+    process_bin_files,
+    check_overlap,
+)
+from PyQt5.QtCore import pyqtSignal, Qt, QThread, QDateTime
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFileDialog, QDateTimeEdit, QMessageBox, QLineEdit, QPlainTextEdit,
-    QDialog, QListWidget, QListWidgetItem, QComboBox, QSplitter, QCheckBox,
+    QFileDialog, QDateTimeEdit, QMessageBox, QLineEdit,
+    QDialog, QComboBox, QSplitter, QCheckBox,
+    QProgressBar,
 )
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
-
-class _LogEmitter(QObject):
-    """Emits log messages as a Qt signal so background threads can update the UI safely."""
-    message = pyqtSignal(str)
-
-
-class _StdoutRedirector:
-    """Replaces sys.stdout so every print() appears in the footer log widget."""
-    def __init__(self, emitter: _LogEmitter):
-        self._emitter = emitter
-
-    def write(self, msg):
-        if msg.strip():
-            self._emitter.message.emit(msg.rstrip())
-
-    def flush(self):
-        pass
-
-
-class DropboxAuthDialog(QDialog):
-    """Two-step PKCE OAuth2 dialog for connecting a Dropbox app.
-
-    The user supplies their App key (from dropbox.com/developers/apps) and the
-    dialog walks them through the browser-based authorization code flow.
-    The resulting tokens are persisted to ~/.beespy_dropbox.json so subsequent
-    launches connect automatically.
-    """
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Connect to Dropbox")
-        self.setMinimumWidth(500)
-        self.dbx = None        # populated on success
-        self._flow = None
-        self._app_key = ""
-
-        layout = QVBoxLayout(self)
-
-        # ── Step 1: App key ──────────────────────────────────────────────────
-        step1 = QLabel(
-            "<b>Step 1.</b>  Create a Dropbox app at "
-            "<a href='https://www.dropbox.com/developers/apps'>"
-            "dropbox.com/developers/apps</a> "
-            "(Scoped access → Full Dropbox → <i>files.content.read</i> permission), "
-            "then paste your <b>App key</b> below.", self)
-        step1.setWordWrap(True)
-        step1.setOpenExternalLinks(True)
-        layout.addWidget(step1)
-
-        self._app_key_input = QLineEdit(self)
-        self._app_key_input.setPlaceholderText("App key  (e.g. abc123xyz456)")
-        saved_key = dropbox_helper.load_config().get("app_key", "")
-        if saved_key:
-            self._app_key_input.setText(saved_key)
-        layout.addWidget(self._app_key_input)
-
-        self._open_btn = QPushButton("Open Dropbox in browser →", self)
-        self._open_btn.clicked.connect(self._open_browser)
-        layout.addWidget(self._open_btn)
-
-        # ── Step 2: Auth code ────────────────────────────────────────────────
-        self._step2_label = QLabel(
-            "<b>Step 2.</b>  After authorizing in the browser, paste the code here:", self)
-        self._step2_label.setWordWrap(True)
-        self._step2_label.hide()
-        layout.addWidget(self._step2_label)
-
-        self._code_input = QLineEdit(self)
-        self._code_input.setPlaceholderText("Authorization code")
-        self._code_input.hide()
-        layout.addWidget(self._code_input)
-
-        btn_row = QHBoxLayout()
-        self._connect_btn = QPushButton("Connect", self)
-        self._connect_btn.clicked.connect(self._finish)
-        self._connect_btn.hide()
-        btn_row.addWidget(self._connect_btn)
-        cancel_btn = QPushButton("Cancel", self)
-        cancel_btn.clicked.connect(self.reject)
-        btn_row.addWidget(cancel_btn)
-        layout.addLayout(btn_row)
-
-        self._status = QLabel("", self)
-        self._status.setWordWrap(True)
-        layout.addWidget(self._status)
-
-    def _open_browser(self):
-        import webbrowser
-        self._app_key = self._app_key_input.text().strip()
-        if not self._app_key:
-            self._status.setText("Please enter your App key first.")
-            return
-        try:
-            self._flow, url = dropbox_helper.start_oauth(self._app_key)
-            webbrowser.open(url)
-            self._step2_label.show()
-            self._code_input.show()
-            self._connect_btn.show()
-            self._status.setText("Browser opened. Authorize, then paste the code above and click Connect.")
-        except Exception as e:
-            self._status.setText(f"Error starting auth: {e}")
-
-    def _finish(self):
-        code = self._code_input.text().strip()
-        if not code:
-            self._status.setText("Please paste the authorization code.")
-            return
-        try:
-            self.dbx = dropbox_helper.finish_oauth(self._flow, code, self._app_key)
-            self.accept()
-        except Exception as e:
-            self._status.setText(f"Connection failed: {e}")
-
-
-class DropboxFolderBrowser(QDialog):
-    """Navigate a Dropbox account tree and select the folder containing .bin files."""
-
-    def __init__(self, dbx, parent=None):
-        super().__init__(parent)
-        self.dbx = dbx
-        self.setWindowTitle("Select Dropbox folder")
-        self.setMinimumSize(540, 480)
-        self.selected_path = None        # Dropbox folder path on accept
-        self.selected_bin_files = []     # list of FileMetadata for .bin files
-        self._current_path = ""
-
-        layout = QVBoxLayout(self)
-
-        # Manual path entry bar
-        path_row = QHBoxLayout()
-        path_row.addWidget(QLabel("Path:", self))
-        self._path_edit = QLineEdit("/", self)
-        self._path_edit.returnPressed.connect(self._go_to_path)
-        path_row.addWidget(self._path_edit)
-        go_btn = QPushButton("Go", self)
-        go_btn.clicked.connect(self._go_to_path)
-        path_row.addWidget(go_btn)
-        layout.addLayout(path_row)
-
-        self._list = QListWidget(self)
-        self._list.itemDoubleClicked.connect(self._on_double_click)
-        layout.addWidget(self._list)
-
-        btn_row = QHBoxLayout()
-        up_btn = QPushButton("↑  Up", self)
-        up_btn.clicked.connect(self._go_up)
-        btn_row.addWidget(up_btn)
-        btn_row.addStretch()
-        self._select_btn = QPushButton("Select this folder", self)
-        self._select_btn.clicked.connect(self._select)
-        btn_row.addWidget(self._select_btn)
-        cancel_btn = QPushButton("Cancel", self)
-        cancel_btn.clicked.connect(self.reject)
-        btn_row.addWidget(cancel_btn)
-        layout.addLayout(btn_row)
-
-        self._status = QLabel("Loading…", self)
-        layout.addWidget(self._status)
-
-        self._load("")
-
-    def _go_to_path(self):
-        text = self._path_edit.text().strip()
-        path = "" if text in ("/", "") else text
-        self._load(path)
-
-    def _load(self, path):
-        self._list.clear()
-        self._status.setText("Loading…")
-        QApplication.processEvents()
-        try:
-            import dropbox as _dbx_mod
-            entries = dropbox_helper.list_folder(self.dbx, path)
-        except Exception as e:
-            self._status.setText(f"Error: {e}")
-            return
-
-        self._current_path = path
-        self._path_edit.setText(path or "/")
-
-        folders = sorted(
-            [e for e in entries if isinstance(e, _dbx_mod.files.FolderMetadata)],
-            key=lambda e: e.name.lower())
-        files = sorted(
-            [e for e in entries if isinstance(e, _dbx_mod.files.FileMetadata)],
-            key=lambda e: e.name.lower())
-
-        # At root, also show shared folders not already in the listing
-        if not path:
-            existing_names = {e.name.lower() for e in folders}
-            shared = dropbox_helper.list_shared_folders(self.dbx)
-            extra = sorted(
-                [s for s in shared if s.name.lower() not in existing_names],
-                key=lambda s: s.name.lower())
-            for s in extra:
-                item = QListWidgetItem(f"📁  {s.name}  (shared)")
-                item.setData(Qt.UserRole, ("folder", s.path_lower))
-                self._list.addItem(item)
-
-        for entry in folders:
-            item = QListWidgetItem(f"📁  {entry.name}")
-            item.setData(Qt.UserRole, ("folder", entry.path_display))
-            self._list.addItem(item)
-        for entry in files:
-            icon = "🔵" if entry.name.endswith(".bin") else "📄"
-            item = QListWidgetItem(f"{icon}  {entry.name}")
-            item.setData(Qt.UserRole, ("file", entry.path_display, entry.size))
-            self._list.addItem(item)
-
-        bin_count = sum(1 for f in files if f.name.endswith(".bin"))
-        self._status.setText(f"{len(folders)} subfolder(s), {bin_count} .bin file(s) in this folder")
-
-    def _on_double_click(self, item):
-        data = item.data(Qt.UserRole)
-        if data[0] == "folder":
-            self._load(data[1])
-
-    def _go_up(self):
-        if self._current_path:
-            parent = self._current_path.rsplit("/", 1)[0]
-            self._load(parent)
-
-    def _select(self):
-        import dropbox as _dbx_mod
-        try:
-            entries = dropbox_helper.list_folder(self.dbx, self._current_path)
-        except Exception as e:
-            self._status.setText(f"Error: {e}")
-            return
-        bin_files = sorted(
-            [e for e in entries
-             if isinstance(e, _dbx_mod.files.FileMetadata) and e.name.endswith(".bin")],
-            key=lambda e: e.name)
-        if not bin_files:
-            self._status.setText("No .bin files found here — please choose another folder.")
-            return
-        self.selected_path = self._current_path
-        self.selected_bin_files = bin_files
-        self.accept()
-
-
-_CHUNKED_META_FILE = '_beespy_chunked_meta.json'
-
-
-def _safe_to_delete(path, local_bin_folder):
-    """Return True only if it is safe to delete `path`.
-
-    Never returns True for a .bin file that lives inside the user's locally-
-    selected source folder.  Dropbox-downloaded files have local_bin_folder=None
-    (they are in-memory BytesIO objects anyway, so nothing to delete on disk).
-    """
-    if local_bin_folder is None:
-        return True   # Dropbox mode — no local source to protect
-    real_path   = os.path.realpath(path)
-    real_source = os.path.realpath(local_bin_folder)
-    if real_path.startswith(real_source + os.sep) and real_path.lower().endswith('.bin'):
-        print(f"  [SAFETY] Skipping deletion of local bin file: {path}")
-        return False
-    return True
-
-
-def process_all_chunks(folder, bin_files, start_time_qdt, end_time_qdt,
-                       chunk_hours, sampFreq, defaultWindows, calcWindows,
-                       minFreq, maxFreq, dbx, dbx_folder, agg,
-                       local_bin_folder=None):
-    """Process a date range in fixed-size chunks, saving date-stamped CSVs.
-
-    Each completed chunk is written as 6 CSV files named:
-        YYYYMMDD_HHMMSS_YYYYMMDD_HHMMSS_ch1.csv … ch6.csv
-
-    If all 6 CSVs already exist for a chunk, that chunk is skipped (acts as
-    the chunk-level checkpoint).  Within each chunk, the existing per-file
-    checkpoint system is used.
-
-    Returns a list of (chunk_start_dt, chunk_end_dt) covering the full range.
-    """
-    # Convert QDateTime boundaries to Python datetime (UTC)
-    start_epoch = start_time_qdt.toSecsSinceEpoch() + start_time_qdt.offsetFromUtc()
-    end_epoch   = end_time_qdt.toSecsSinceEpoch()   + end_time_qdt.offsetFromUtc()
-    start_dt = datetime.datetime.utcfromtimestamp(start_epoch)
-    end_dt   = datetime.datetime.utcfromtimestamp(end_epoch)
-
-    delta = datetime.timedelta(hours=chunk_hours)
-    chunk_list = []
-    current = start_dt
-    while current < end_dt:
-        chunk_end = min(current + delta, end_dt)
-        chunk_list.append((current, chunk_end))
-        current = chunk_end
-
-    n_chunks = len(chunk_list)
-    print(f"Chunked mode: {n_chunks} chunk(s) of {chunk_hours}h each")
-
-    # Write a meta file so _continue_session can detect an in-progress chunked run
-    chunked_meta_path = os.path.join(folder, _CHUNKED_META_FILE)
-    chunked_meta = {
-        'chunk_hours':    chunk_hours,
-        'start_epoch':    start_epoch,
-        'end_epoch':      end_epoch,
-        'sampFreq':       sampFreq,
-        'defaultWindows': defaultWindows,
-        'calcWindows':    calcWindows,
-        'minFreq':        minFreq,
-        'maxFreq':        maxFreq,
-        'agg':            agg,
-        'source':         str(dbx_folder or folder),
-    }
-    with open(chunked_meta_path, 'w') as _f:
-        json.dump(chunked_meta, _f, indent=2)
-
-    for i, (chunk_start, chunk_end) in enumerate(chunk_list, start=1):
-        if _chunk_is_complete(folder, chunk_start, chunk_end):
-            print(f"  Chunk {i}/{n_chunks} [{chunk_start} → {chunk_end}]: already complete — skipping")
-            continue
-
-        print(f"  Chunk {i}/{n_chunks} [{chunk_start} → {chunk_end}]: processing…")
-
-        # Build QDateTime equivalents for this chunk
-        from PyQt5.QtCore import QDateTime as _QDT
-        def _dt_to_qdt(dt):
-            return _QDT(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
-
-        chunk_start_qdt = _dt_to_qdt(chunk_start)
-        chunk_end_qdt   = _dt_to_qdt(chunk_end)
-
-        chk_dir = os.path.join(
-            folder,
-            _CHK_SUBDIR,
-            f'chunk_{chunk_start.strftime("%Y%m%d_%H%M%S")}')
-        chk_key = _checkpoint_settings_key(
-            chunk_start_qdt, chunk_end_qdt,
-            sampFreq, defaultWindows, calcWindows, minFreq, maxFreq, agg,
-            dbx_folder or folder)
-
-        # Check for a within-chunk checkpoint to resume
-        resume_files = None
-        chk_meta_path = os.path.join(chk_dir, 'meta.json')
-        if os.path.isfile(chk_meta_path):
-            try:
-                with open(chk_meta_path) as _f:
-                    _meta = json.load(_f)
-                if _checkpoint_meta_matches(_meta, chk_key):
-                    resume_files = set(_meta.get('processed_files', []))
-                    print(f"    [checkpoint] Resuming chunk ({len(resume_files)} file(s) already done)")
-                else:
-                    shutil.rmtree(chk_dir, ignore_errors=True)
-            except Exception:
-                shutil.rmtree(chk_dir, ignore_errors=True)
-
-        specs = process_bin_files(
-            folder, bin_files,
-            chunk_start_qdt, chunk_end_qdt,
-            sampFreq, defaultWindows, calcWindows, minFreq, maxFreq,
-            dbx=dbx, dbx_folder=dbx_folder, agg=agg,
-            checkpoint_dir=chk_dir, checkpoint_key=chk_key,
-            resume_files=resume_files,
-            local_bin_folder=local_bin_folder)
-
-        write_chunked_spectrograms(folder, specs, chunk_start, chunk_end)
-        print(f"  Chunk {i}/{n_chunks}: written.")
-
-    # All chunks complete — remove the meta file
-    if os.path.isfile(chunked_meta_path):
-        os.remove(chunked_meta_path)
-        print("  [chunked checkpoint] All chunks complete — meta file removed")
-
-    return chunk_list
+# The processing names are listed so the compatibility re-exports above count
+# as used; DropboxAuthDialog / DropboxFolderBrowser come from __getattr__.
+__all__ = [
+    'SpectrogramApp', 'PlotCanvas',
+    'write_spectrograms_to_disk', 'convert_size', 'parse_freq_bands', 'export_band_summary',
+    '_as_epoch', '_safe_to_delete', '_CHK_SUBDIR', '_CHUNKED_META_FILE', '_CHUNK_FILENAME_RE',
+    '_chunk_csv_path', '_chunk_is_complete', 'write_chunked_spectrograms', 'process_all_chunks',
+    '_checkpoint_settings_key', '_checkpoint_meta_matches', '_write_checkpoint',
+    '_load_checkpoint', '_read_checkpoint_meta', 'process_bin_files', 'check_overlap',
+]
+
+def __getattr__(name):
+    # The Dropbox dialogs moved to utils.dropbox_dialogs; `from localApp import
+    # DropboxAuthDialog` keeps working and loads them on first use.
+    if name in ('DropboxAuthDialog', 'DropboxFolderBrowser'):
+        from utils import dropbox_dialogs
+        return getattr(dropbox_dialogs, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class _ChunkedProcessingThread(QThread):
     """Runs process_all_chunks on a background thread."""
     finished = pyqtSignal(object)   # emits list of (start_dt, end_dt) tuples
     error    = pyqtSignal(str)
+    progress = pyqtSignal(float, str)   # (fraction done, Progress.format() text)
 
     def __init__(self, folder, bin_files, start_time, end_time,
                  chunk_hours, sampFreq, defaultWindows, calcWindows,
                  minFreq, maxFreq, dbx, dbx_folder, agg,
-                 local_bin_folder=None, parent=None):
+                 local_bin_folder=None, file_sizes=None, parent=None):
         super().__init__(parent)
         self._folder          = folder
         self._bin_files       = bin_files
@@ -418,6 +90,7 @@ class _ChunkedProcessingThread(QThread):
         self._dbx_folder      = dbx_folder
         self._agg             = agg
         self._local_bin_folder = local_bin_folder
+        self._file_sizes      = file_sizes
 
     def run(self):
         try:
@@ -428,7 +101,11 @@ class _ChunkedProcessingThread(QThread):
                 self._sampFreq, self._defaultWindows, self._calcWindows,
                 self._minFreq, self._maxFreq,
                 self._dbx, self._dbx_folder, self._agg,
-                local_bin_folder=self._local_bin_folder)
+                local_bin_folder=self._local_bin_folder,
+                file_sizes=self._file_sizes,
+                progress=Progress(lambda p: self.progress.emit(p.fraction(), p.format()), interval=0.5))
+            if instrument.enabled():
+                instrument.print_summary()
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
@@ -548,12 +225,13 @@ class _ProcessingThread(QThread):
     (and therefore the log widget) stays responsive throughout."""
     finished = pyqtSignal(object)   # emits the spectrograms list on success
     error    = pyqtSignal(str)      # emits an error message on failure
+    progress = pyqtSignal(float, str)   # (fraction done, Progress.format() text)
 
     def __init__(self, folder, bin_files, start_time, end_time,
                  sampFreq, defaultWindows, calcWindows, minFreq, maxFreq,
                  dbx, dbx_folder, agg="Average",
                  checkpoint_dir=None, checkpoint_key=None, resume_files=None,
-                 local_bin_folder=None, parent=None):
+                 local_bin_folder=None, file_sizes=None, parent=None):
         super().__init__(parent)
         self._args   = (folder, bin_files, start_time, end_time,
                         sampFreq, defaultWindows, calcWindows, minFreq, maxFreq)
@@ -561,11 +239,15 @@ class _ProcessingThread(QThread):
                             checkpoint_dir=checkpoint_dir,
                             checkpoint_key=checkpoint_key,
                             resume_files=resume_files,
-                            local_bin_folder=local_bin_folder)
+                            local_bin_folder=local_bin_folder,
+                            file_sizes=file_sizes)
 
     def run(self):
         try:
-            result = process_bin_files(*self._args, **self._kwargs)
+            prog = Progress(lambda p: self.progress.emit(p.fraction(), p.format()), interval=0.5)
+            result = process_bin_files(*self._args, progress=prog, **self._kwargs)
+            if instrument.enabled():
+                instrument.print_summary()
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
@@ -720,6 +402,13 @@ class SpectrogramApp(QWidget):
         self.layout.addWidget(self._agg_row)
         self._agg_row.hide()
 
+        # Per-file progress lines in the log (File n of N, data shape, checkpoint saves)
+        self.logDetail = QCheckBox("Per-file detail in progress log", self)
+        self.logDetail.setChecked(log.enabled_for('detail'))
+        self.logDetail.toggled.connect(lambda on: log.set_level('detail' if on else 'info'))
+        self.layout.addWidget(self.logDetail)
+        self.logDetail.hide()
+
         self.detail_settings_button = QPushButton("Edit settings", self)
         self.detail_settings_button.clicked.connect(self.detail_settings)
         self.layout.addWidget(self.detail_settings_button)
@@ -737,6 +426,13 @@ class SpectrogramApp(QWidget):
         self.make_graphs_button.hide()
         self.layout.addWidget(self.make_graphs_button)
 
+        # Byte-based progress, throughput and ETA while processing runs
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(True)
+        self.layout.addWidget(self.progress_bar)
+        self.progress_bar.hide()
+
         ############################
         # Spectrogram plot area (canvas)
         self.plot_canvas = PlotCanvas(self)
@@ -862,15 +558,13 @@ class SpectrogramApp(QWidget):
         self.toggle_buttons_visibility(False)
 
         # Footer log widget — shows progress messages instead of printing to terminal
-        self.log_widget = QPlainTextEdit(self)
-        self.log_widget.setReadOnly(True)
+        self.log_widget = QThelpers.BufferedLogView(self)
         self.log_widget.setMinimumHeight(30)
         self.log_widget.setPlaceholderText("Progress log…")
 
-        # Redirect stdout so every print() goes to the footer
-        self._log_emitter = _LogEmitter()
-        self._log_emitter.message.connect(self._append_log)
-        sys.stdout = _StdoutRedirector(self._log_emitter)
+        # Redirect stdout so every print() goes to the footer; worker threads
+        # only queue the line, the widget picks them up ten times a second
+        self.log_widget.install()
 
         # Wrap the main content in a container widget so it can go into a splitter
         _top_container = QWidget()
@@ -889,11 +583,6 @@ class SpectrogramApp(QWidget):
         outer_layout.addWidget(self._splitter)
         self.setLayout(outer_layout)
 
-    def _append_log(self, msg: str):
-        self.log_widget.appendPlainText(msg)
-        sb = self.log_widget.verticalScrollBar()
-        sb.setValue(sb.maximum())
-
     def detail_settings(self):
         if(self.detail_settings_button.text() == "Edit settings"):
             # Show the settings and change the button text
@@ -904,6 +593,7 @@ class SpectrogramApp(QWidget):
             self.minFreq.show()
             self.maxFreq.show()
             self._agg_row.show()
+            self.logDetail.show()
             # TODO: ADD IN BUTTONS TO SELECT CHANNELS FOR ANALYSIS (default to 'all')
         else:
             # Hide the settings and change the button text
@@ -914,6 +604,7 @@ class SpectrogramApp(QWidget):
             self.minFreq.hide()
             self.maxFreq.hide()
             self._agg_row.hide()
+            self.logDetail.hide()
 
 
 
@@ -1003,7 +694,7 @@ class SpectrogramApp(QWidget):
                 self.outputSummaryLabel.show()
 
             else:
-                self.summary_label.setText(f"No bin files found in the selected folder. Please try another folder")
+                self.summary_label.setText("No bin files found in the selected folder. Please try another folder")
 
     # ── Continue session entry-point ─────────────────────────────────────────
 
@@ -1119,8 +810,7 @@ class SpectrogramApp(QWidget):
             return
 
         try:
-            with open(chk_meta_path) as f:
-                meta = json.load(f)
+            meta = _read_checkpoint_meta(os.path.join(folder, _CHK_SUBDIR))
         except Exception as e:
             QMessageBox.critical(self, "Error reading checkpoint", str(e))
             return
@@ -1226,13 +916,14 @@ class SpectrogramApp(QWidget):
 
     def _connect_dropbox(self):
         """Authenticate with Dropbox (reusing saved tokens when available), then browse."""
-        try:
-            import dropbox  # noqa – just to confirm the package is present
-        except ImportError:
+        import importlib.util
+        if importlib.util.find_spec('dropbox') is None:
             QMessageBox.critical(self, "Dropbox not installed",
                                  "Please install the Dropbox SDK:\n\n    pip install dropbox")
             return
 
+        from utils.dropbox_dialogs import DropboxAuthDialog
+
         # Re-use saved tokens if they still work
         dbx = dropbox_helper.get_saved_client()
         if dbx is None:
@@ -1246,6 +937,7 @@ class SpectrogramApp(QWidget):
 
     def _select_dropbox_folder(self):
         """Open the folder browser, then set up the UI exactly like select_folder() does."""
+        from utils.dropbox_dialogs import DropboxFolderBrowser
         browser = DropboxFolderBrowser(self.dbx, self)
         if browser.exec_() != QDialog.Accepted:
             return
@@ -1370,7 +1062,7 @@ class SpectrogramApp(QWidget):
     
         startTimes = []
         for file in self.bin_files:
-            startTimes.append(utils.extract_start_time(file))
+            startTimes.append(utils.extract_start_datetime(file))
 
         # Set min and max dates in the QDateTimeEdit widgets
         minTime = min(startTimes).replace(hour=0, minute=0, second=0)
@@ -1383,7 +1075,7 @@ class SpectrogramApp(QWidget):
         self.end_date_edit.setMaximumDateTime(maxTime)
         
         last_size = self.file_size_map.get(self.bin_files[-1], 0)
-        endTime = max(startTimes) + pd.to_timedelta(round(last_size / (sampFreq * 6 * 2.1333), 0), unit='s')
+        endTime = max(startTimes) + datetime.timedelta(seconds=round(last_size / (sampFreq * 6 * 2.1333), 0))
         self.summary_label.setText(f"{self.summary_label.text()}\nTime range: {min(startTimes).strftime("%d-%b-%Y %H:%M:%S")} to {endTime.strftime("%d-%b-%Y %H:%M:%S")}")
 
     # Generate graphs (show progress)
@@ -1401,6 +1093,9 @@ class SpectrogramApp(QWidget):
         agg = self.aggMethod.currentText()
         start_time = self.start_date_edit.dateTime()
         end_time = self.end_date_edit.dateTime()
+        # the processing core works in local epoch seconds
+        start_epoch = _as_epoch(start_time)
+        end_epoch   = _as_epoch(end_time)
 
         try:
             chunk_hours = self.chunkSizeHours.getValue()
@@ -1419,6 +1114,7 @@ class SpectrogramApp(QWidget):
         self.minFreq.hide()
         self.maxFreq.hide()
         self._agg_row.hide()
+        self.logDetail.hide()
 
         ## update the info with the start and end dates (do this now, before
         ## the thread starts, so the QDateTime widgets are still visible)
@@ -1442,26 +1138,28 @@ class SpectrogramApp(QWidget):
         if chunk_hours > 0:
             # ── Chunked mode ──────────────────────────────────────────────────
             self._proc_thread = _ChunkedProcessingThread(
-                self.folder, self.bin_files, start_time, end_time,
+                self.folder, self.bin_files, start_epoch, end_epoch,
                 chunk_hours, sampFreq, defaultWindows, calcWindows,
                 minFreq, maxFreq,
                 dbx=self.dbx, dbx_folder=self.dbx_folder, agg=agg,
-                local_bin_folder=self._local_bin_folder)
+                local_bin_folder=self._local_bin_folder,
+                file_sizes=self.file_size_map)
             self._proc_thread.finished.connect(self._on_chunked_done)
             self._proc_thread.error.connect(self._on_processing_error)
+            self._proc_thread.progress.connect(self._on_progress)
+            self._show_progress()
             self._proc_thread.start()
         else:
             # ── Single-file mode (original behaviour) ─────────────────────────
             chk_dir = os.path.join(self.folder, _CHK_SUBDIR)
-            chk_key = _checkpoint_settings_key(start_time, end_time, sampFreq, defaultWindows,
+            chk_key = _checkpoint_settings_key(start_epoch, end_epoch, sampFreq, defaultWindows,
                                                calcWindows, minFreq, maxFreq, agg,
                                                self.dbx_folder or self.folder)
             resume_files = None
             chk_meta_path = os.path.join(chk_dir, 'meta.json')
             if os.path.isfile(chk_meta_path):
                 try:
-                    with open(chk_meta_path) as _f:
-                        _meta = json.load(_f)
+                    _meta = _read_checkpoint_meta(chk_dir)
                     if _checkpoint_meta_matches(_meta, chk_key):
                         n_done = len(_meta.get('processed_files', []))
                         n_total = len(self.bin_files)
@@ -1496,17 +1194,30 @@ class SpectrogramApp(QWidget):
                     shutil.rmtree(chk_dir, ignore_errors=True)
 
             self._proc_thread = _ProcessingThread(
-                self.folder, self.bin_files, start_time, end_time,
+                self.folder, self.bin_files, start_epoch, end_epoch,
                 sampFreq, defaultWindows, calcWindows, minFreq, maxFreq,
                 dbx=self.dbx, dbx_folder=self.dbx_folder, agg=agg,
                 checkpoint_dir=chk_dir, checkpoint_key=chk_key,
                 resume_files=resume_files,
-                local_bin_folder=self._local_bin_folder)
+                local_bin_folder=self._local_bin_folder,
+                file_sizes=self.file_size_map)
             self._proc_thread.finished.connect(self._on_processing_done)
             self._proc_thread.error.connect(self._on_processing_error)
+            self._proc_thread.progress.connect(self._on_progress)
+            self._show_progress()
             self._proc_thread.start()
 
+    def _show_progress(self):
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Starting…")
+        self.progress_bar.show()
+
+    def _on_progress(self, fraction, text):
+        self.progress_bar.setValue(int(round(1000 * fraction)))
+        self.progress_bar.setFormat(text)
+
     def _on_processing_done(self, spectrograms):
+        self.progress_bar.hide()
         self.spectrograms = spectrograms
 
         self.summary_label.setText(self.summary_label.text() + self._pending_summary_suffix)
@@ -1528,6 +1239,7 @@ class SpectrogramApp(QWidget):
 
     def _on_chunked_done(self, chunk_list):
         """Called when chunked processing completes. Load and display the stitched result."""
+        self.progress_bar.hide()
         self.summary_label.setText(self.summary_label.text() + self._pending_summary_suffix)
 
         spectrograms = _load_and_concat_chunks(self.folder, chunk_list)
@@ -1549,6 +1261,7 @@ class SpectrogramApp(QWidget):
         self.setGeometry(100, 100, 800, 600)
 
     def _on_processing_error(self, msg):
+        self.progress_bar.hide()
         QMessageBox.critical(self, "Processing error", msg)
         self.make_graphs_button.show()
         self.startTimeLabel.show(); self.start_date_edit.show()
@@ -1753,7 +1466,8 @@ class SpectrogramApp(QWidget):
         for c in range(1, 7):
             path = os.path.join(folder, f"Spectrogram_{c}.csv")
             if os.path.exists(path):
-                spectrograms.append(np.loadtxt(path, delimiter=','))
+                with instrument.span('load', file=os.path.basename(path)):
+                    spectrograms.append(np.loadtxt(path, delimiter=','))
             else:
                 spectrograms.append(None)
 
@@ -1988,6 +1702,7 @@ class PlotCanvas(FigureCanvas):
         return rgb  # (freq, time, 3) uint8
 
     def _apply_ticks(self, axis, spectrogram, n_x=5, n_y=5):
+        import pandas as pd
         time_stamps = pd.to_datetime(spectrogram[0, 1:], unit='s')
         tick_indices_x = np.linspace(0, len(time_stamps) - 1, num=n_x, dtype=int)
         axis.set_xticks(tick_indices_x)
@@ -2038,294 +1753,7 @@ class PlotCanvas(FigureCanvas):
         self.axes = self.fig.add_subplot(111)
 
 
-# ── Checkpoint helpers ────────────────────────────────────────────────────────
-
-_CHK_SUBDIR = '_beespy_checkpoint'
-
-
-def _checkpoint_settings_key(start_time, end_time, sampFreq, defaultWindows,
-                              calcWindows, minFreq, maxFreq, agg, source):
-    """Return a dict of settings that uniquely identify a processing run."""
-    return {
-        'start_epoch':    round(start_time.toSecsSinceEpoch() + start_time.offsetFromUtc(), 1),
-        'end_epoch':      round(end_time.toSecsSinceEpoch()   + end_time.offsetFromUtc(),   1),
-        'sampFreq':       sampFreq,
-        'defaultWindows': round(defaultWindows, 6),
-        'calcWindows':    round(calcWindows, 6),
-        'minFreq':        round(minFreq, 6),
-        'maxFreq':        round(maxFreq, 6),
-        'agg':            agg,
-        'source':         str(source),
-    }
-
-
-def _checkpoint_meta_matches(meta, key):
-    """Return True when the stored meta matches all fields in key."""
-    return all(meta.get(k) == v for k, v in key.items())
-
-
-def _write_checkpoint(chk_dir, key, processed_files, accumulators, mode):
-    """Atomically write checkpoint data.  meta.json is written last so it
-    serves as the 'committed' marker — an incomplete write leaves the previous
-    meta.json intact."""
-    os.makedirs(chk_dir, exist_ok=True)
-    for c in range(6):
-        if mode == 'avg':
-            np.save(os.path.join(chk_dir, f'ch{c}_sum.npy'),   accumulators[0][c])
-            np.save(os.path.join(chk_dir, f'ch{c}_count.npy'), accumulators[1][c])
-        elif mode == 'max':
-            np.save(os.path.join(chk_dir, f'ch{c}_max.npy'), accumulators[c])
-        else:  # pct — defaultdict(list) serialised with pickle
-            with open(os.path.join(chk_dir, f'ch{c}_bins.pkl'), 'wb') as f:
-                pickle.dump(dict(accumulators[c]), f)
-    meta = dict(key)
-    meta['processed_files'] = list(processed_files)
-    meta['saved_at'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    tmp = os.path.join(chk_dir, '_meta_tmp.json')
-    with open(tmp, 'w') as f:
-        json.dump(meta, f, indent=2)
-    os.replace(tmp, os.path.join(chk_dir, 'meta.json'))
-    print(f"  [checkpoint] Saved ({len(processed_files)} files processed)")
-
-
-def _load_checkpoint(chk_dir, mode, n_freq, n_time):
-    """Load accumulators from a checkpoint.
-
-    Returns (accumulators, processed_files_set) or (None, None) on failure.
-    """
-    try:
-        if mode == 'avg':
-            accum_sum, accum_count = [], []
-            for c in range(6):
-                accum_sum.append(np.load(os.path.join(chk_dir, f'ch{c}_sum.npy')))
-                accum_count.append(np.load(os.path.join(chk_dir, f'ch{c}_count.npy')))
-            accumulators = (accum_sum, accum_count)
-        elif mode == 'max':
-            accumulators = [np.load(os.path.join(chk_dir, f'ch{c}_max.npy')) for c in range(6)]
-        else:  # pct
-            from collections import defaultdict
-            accumulators = []
-            for c in range(6):
-                with open(os.path.join(chk_dir, f'ch{c}_bins.pkl'), 'rb') as f:
-                    d = pickle.load(f)
-                accumulators.append(defaultdict(list, {int(k): v for k, v in d.items()}))
-        with open(os.path.join(chk_dir, 'meta.json')) as f:
-            meta = json.load(f)
-        return accumulators, set(meta.get('processed_files', []))
-    except Exception as _e:
-        print(f"  WARNING: could not load checkpoint ({_e}) — starting fresh")
-        return None, None
-
-
-# Do the hard work here
-def process_bin_files(folder, bin_files, start_time, end_time, sampFreq, defaultWindows, calcWindows, minFreq, maxFreq,
-                      dbx=None, dbx_folder=None, agg="Average",
-                      checkpoint_dir=None, checkpoint_key=None,
-                      resume_files=None, checkpoint_every=10,
-                      local_bin_folder=None):
-    """Process .bin files into spectrograms, aggregated per output time bin.
-
-    agg: "Average", "Maximum", "75th percentile", "90th percentile", "95th percentile"
-    Pass dbx + dbx_folder to read files from Dropbox on-demand (one at a time,
-    no bulk download).  Leave both as None to read from the local filesystem.
-
-    checkpoint_dir / checkpoint_key: when set, the function saves progress to disk
-    every checkpoint_every files so it can be resumed after a crash or lost connection.
-    resume_files: set of filenames already processed on a previous run (skip them).
-
-    local_bin_folder: when set (local mode), _safe_to_delete() will refuse to delete
-    any .bin file inside this folder, protecting the user's raw data.
-    """
-    # Safety check: confirm we will not accidentally delete files from the local source
-    if local_bin_folder is not None:
-        print(f"  [SAFETY] Local bin folder protected from deletion: {local_bin_folder}")
-    elif dbx is None:
-        # Local mode but no protection path set — warn so this is auditable
-        print("  [WARNING] Local mode but local_bin_folder not set — bin files unprotected")
-    # Determine percentile level if needed
-    _pct_map = {"75th percentile": 75, "90th percentile": 90, "95th percentile": 95}
-    pct_level = _pct_map.get(agg, None)
-    use_max = (agg == "Maximum")
-    use_pct = pct_level is not None
-
-    # Calculate the frequency axis using the exact scipy bins (same as dospectrogram produces)
-    nps_out = max(2, int(round(defaultWindows * sampFreq)))
-    fq_full = np.fft.rfftfreq(nps_out, 1.0 / sampFreq)
-    freq_mask = (fq_full >= minFreq) & (fq_full <= maxFreq)
-    freqs = fq_full[freq_mask]
-    _first_freq_idx = int(np.where(freq_mask)[0][0]) if freq_mask.any() else 0
-    times = np.arange(start_time.toSecsSinceEpoch()+ start_time.offsetFromUtc(), end_time.toSecsSinceEpoch()+ end_time.offsetFromUtc()+calcWindows, calcWindows)
-
-    ## set up the output - 6 channels with the above dimensions
-    if use_max:
-        spectrogram_max = [np.full((freqs.shape[0], times.shape[0]), -np.inf) for _ in range(6)]
-    elif use_pct:
-        from collections import defaultdict
-        spectrogram_bins = [defaultdict(list) for _ in range(6)]
-    else:  # average
-        spectrogram_sum = [np.zeros((freqs.shape[0], times.shape[0])) for _ in range(6)]
-        spectrogram_count = [np.zeros((freqs.shape[0], times.shape[0])) for _ in range(6)]
-
-    # ── Checkpoint resume: load accumulators from previous run if applicable ──
-    _chk_mode = 'max' if use_max else ('pct' if use_pct else 'avg')
-    _files_already_done = set(resume_files) if resume_files else set()
-    if checkpoint_dir and resume_files:
-        _chk_accum, _chk_done = _load_checkpoint(checkpoint_dir, _chk_mode,
-                                                   freqs.shape[0], times.shape[0])
-        if _chk_accum is not None:
-            _files_already_done = _chk_done
-            if use_max:
-                spectrogram_max = _chk_accum
-            elif use_pct:
-                spectrogram_bins = _chk_accum
-            else:
-                spectrogram_sum, spectrogram_count = _chk_accum
-            print(f"  [checkpoint] Resumed — {len(_files_already_done)} file(s) already processed")
-
-    ## now slot in the data
-    _DBX_MAX_RETRIES = 3
-    _DBX_RETRY_DELAYS = [10, 30, 60]   # seconds to wait before each retry
-    files_failed = []                  # files skipped due to download/processing errors
-
-    N = len(bin_files)
-    start_ts_dbg = pd.Timestamp(start_time.toSecsSinceEpoch() + start_time.offsetFromUtc(), unit='s')
-    end_ts_dbg   = pd.Timestamp(end_time.toSecsSinceEpoch()   + end_time.offsetFromUtc(),   unit='s')
-    print(f"MODE: {'Dropbox' if dbx is not None else 'local'} | {N} file(s) | range {start_ts_dbg} → {end_ts_dbg}")
-    n = 0
-    for file in bin_files:
-        n = n+1
-        # Skip files already processed in a previous run
-        if file in _files_already_done:
-            continue
-        ## get the start time and estimated end time of each bin file
-        fstart = utils.extract_start_time(file)
-
-        if dbx is not None:
-            # Dropbox mode: get file size from the API metadata already fetched
-            # (we don't have it here, so use a rough fixed estimate; overlap check
-            # is conservative — worst case we download a file and skip it quickly)
-            fend = fstart + pd.to_timedelta(3600, unit='s')   # 1-hour upper bound
-        else:
-            filepath = os.path.join(folder, file)
-            fend = fstart + pd.to_timedelta(
-                round(os.path.getsize(filepath) / (sampFreq * 6 * 2.1333), 0), unit='s')
-
-        overlaps = check_overlap(start_time, end_time, fstart, fend)
-
-        ##if the time is in the requested range then make the spectrogram from the data
-        if overlaps:
-            if dbx is not None:
-                dbx_path = f"{dbx_folder.rstrip('/')}/{file}"
-                print(f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | File {n} of {N} | {file} | Downloading from Dropbox…")
-                file_obj = None
-                for _attempt in range(_DBX_MAX_RETRIES):
-                    try:
-                        file_obj = dropbox_helper.download_to_bytes(dbx, dbx_path)
-                        _sz = file_obj.seek(0, 2); file_obj.seek(0)
-                        print(f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Downloaded {_sz} bytes from {dbx_path}")
-                        break
-                    except Exception as _dl_err:
-                        if _attempt < _DBX_MAX_RETRIES - 1:
-                            _wait = _DBX_RETRY_DELAYS[_attempt]
-                            print(f"  WARNING: download failed ({_dl_err}). "
-                                  f"Retrying in {_wait}s… (attempt {_attempt + 1}/{_DBX_MAX_RETRIES})")
-                            time.sleep(_wait)
-                        else:
-                            print(f"  ERROR: download failed after {_DBX_MAX_RETRIES} attempts — skipping {file}")
-                            files_failed.append(file)
-                if file_obj is None:
-                    continue
-            else:
-                filepath = os.path.join(folder, file)
-                _fsz = os.path.getsize(filepath)
-                print(f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | File {n} of {N} | {file} | {_fsz} bytes | Calculating spectrograms, etc.")
-                file_obj = filepath
-
-            # ── Process the file (guard against corrupt/partial data) ──────────
-            try:
-                fileStart = utils.timestamp_to_secs_since_epoch(fstart)
-                x = bc.beespy_arduino_reader(file_obj)  # accepts both path str and BytesIO
-                print(f"  Data shape: {x.shape}")
-                if x.shape[0] == 0:
-                    print(f"  WARNING: no data in {file} (file may be an online-only Dropbox placeholder) — skipping")
-                    continue
-                for c in range(x.shape[1]): #for each channel
-                    # Denoise
-                    denoised = denoise.umw_denoise(x[:, c], 5, 5) # denoise the signal
-                    # Get the spectrogram
-                    fq, ts, tempSpec = spect.dospectrogram(denoised, sampFreq, window_duration=defaultWindows, window_overlap=0)
-                    ts = fileStart + ts
-                    # Map spectrogram time steps and frequency bins to output grid indices
-                    tsIndicies = np.digitize(ts, np.array(np.append(times, end_time.toSecsSinceEpoch() + end_time.offsetFromUtc()+calcWindows+calcWindows)) - (calcWindows/2)) - 1
-                    freqIndicies = np.arange(len(fq), dtype=int) - _first_freq_idx
-                    # Vectorised scatter-add: replaces the nested Python loop with np.bincount.
-                    # Build valid-index masks, then accumulate via flat linear indices so the
-                    # entire inner loop runs in a single C-level pass.
-                    n_freq_out, n_time_out = freqs.shape[0], times.shape[0]
-                    t_valid = (tsIndicies >= 0) & (tsIndicies < n_time_out)    # (n_time_in,)
-                    f_valid = (freqIndicies >= 0) & (freqIndicies < n_freq_out) # (n_freq_in,)
-                    t_idx = np.where(t_valid)[0]
-                    f_idx = np.where(f_valid)[0]
-                    if t_idx.size and f_idx.size:
-                        tOut = tsIndicies[t_idx]
-                        fOut = freqIndicies[f_idx]
-                        lin_idx  = (fOut[:, np.newaxis] * n_time_out + tOut[np.newaxis, :]).ravel()
-                        vals     = tempSpec[np.ix_(f_idx, t_idx)].ravel()
-                        flat_size = n_freq_out * n_time_out
-                        if use_max:
-                            np.maximum.at(spectrogram_max[c].ravel(), lin_idx, vals)
-                        elif use_pct:
-                            for idx, v in zip(lin_idx, vals):
-                                spectrogram_bins[c][idx].append(v)
-                        else:
-                            spectrogram_sum[c]   += np.bincount(lin_idx, weights=vals,                minlength=flat_size).reshape(n_freq_out, n_time_out)
-                            spectrogram_count[c] += np.bincount(lin_idx, weights=np.ones_like(vals), minlength=flat_size).reshape(n_freq_out, n_time_out)
-            except Exception as _proc_err:
-                print(f"  ERROR: failed to process {file} ({_proc_err}) — skipping, accumulated data preserved")
-                files_failed.append(file)
-            # Track and checkpoint only for overlapping files (non-overlapping files
-            # are trivially cheap to re-check on resume, so no need to record them)
-            _files_already_done.add(file)
-            if checkpoint_dir and checkpoint_key and len(_files_already_done) % checkpoint_every == 0:
-                _accum_to_save = (spectrogram_sum, spectrogram_count) if not (use_max or use_pct) else (spectrogram_max if use_max else spectrogram_bins)
-                _write_checkpoint(checkpoint_dir, checkpoint_key, _files_already_done, _accum_to_save, _chk_mode)
-            print(f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Done.")
-
-    if files_failed:
-        print(f"\nWARNING: {len(files_failed)} file(s) could not be processed and were skipped:")
-        for _f in files_failed:
-            print(f"  - {_f}")
-        print("Results shown are based on the remaining files only.\n")
-
-    # ── Delete checkpoint on successful completion ─────────────────────────────
-    if checkpoint_dir and os.path.isdir(checkpoint_dir):
-        shutil.rmtree(checkpoint_dir, ignore_errors=True)
-        print("  [checkpoint] Deleted after successful completion")
-
-    # Build the final output arrays (with header row/column for freqs and times)
-    n_freq_out = freqs.shape[0]
-    n_time_out = times.shape[0]
-    spectrogram_average_out = [np.zeros((n_freq_out + 1, n_time_out + 1)) for _ in range(6)]
-    for c in range(6):
-        spectrogram_average_out[c][0, 0] = f"{99}{sampFreq}99{int(1000*defaultWindows)}{99}"
-        spectrogram_average_out[c][0, 1:] = times
-        spectrogram_average_out[c][1:, 0] = freqs
-        if use_max:
-            data = spectrogram_max[c]
-            spectrogram_average_out[c][1:, 1:] = np.where(np.isfinite(data), data, np.nan)
-        elif use_pct:
-            data = np.full(n_freq_out * n_time_out, np.nan)
-            for idx, vals in spectrogram_bins[c].items():
-                data[idx] = np.percentile(vals, pct_level)
-            spectrogram_average_out[c][1:, 1:] = data.reshape(n_freq_out, n_time_out)
-        else:
-            cnt = spectrogram_count[c]
-            avg = np.where(cnt > 0, spectrogram_sum[c] / np.where(cnt > 0, cnt, 1.0), np.nan)
-            spectrogram_average_out[c][1:, 1:] = avg
-
-    return spectrogram_average_out
-
-
+@instrument.timed('write')
 def write_spectrograms_to_disk(folder, spectrograms):
     """Write spectrogram CSVs in a background thread so the UI isn't blocked."""
     print("Writing output to file.")
@@ -2334,40 +1762,6 @@ def write_spectrograms_to_disk(folder, spectrograms):
     print("Writing complete.")
 
 
-# ── Chunked spectrogram helpers ───────────────────────────────────────────────
-
-_CHUNK_FILENAME_RE = re.compile(
-    r'^(\d{8}_\d{6})_(\d{8}_\d{6})_ch(\d+)\.csv$'
-)
-
-
-def _chunk_csv_path(folder, chunk_start_dt, chunk_end_dt, channel):
-    """Return the path for a single channel's chunked CSV.
-
-    e.g. /out/20260101_000000_20260101_235959_ch1.csv
-    """
-    s = chunk_start_dt.strftime('%Y%m%d_%H%M%S')
-    e = chunk_end_dt.strftime('%Y%m%d_%H%M%S')
-    return os.path.join(folder, f'{s}_{e}_ch{channel}.csv')
-
-
-def _chunk_is_complete(folder, chunk_start_dt, chunk_end_dt):
-    """Return True if all 6 channel CSV files exist for this chunk."""
-    return all(
-        os.path.isfile(_chunk_csv_path(folder, chunk_start_dt, chunk_end_dt, c))
-        for c in range(1, 7)
-    )
-
-
-def write_chunked_spectrograms(folder, spectrograms, chunk_start_dt, chunk_end_dt):
-    """Atomically write 6 channel CSVs for a single time chunk."""
-    for c, spec in enumerate(spectrograms, start=1):
-        path = _chunk_csv_path(folder, chunk_start_dt, chunk_end_dt, c)
-        tmp = path + '.tmp'
-        np.savetxt(tmp, spec, delimiter=',')
-        os.replace(tmp, path)
-
-
 def _load_and_concat_chunks(folder, chunk_list):
     """Load and concatenate chunked spectrogram CSVs along the time axis.
 
@@ -2385,7 +1779,8 @@ def _load_and_concat_chunks(folder, chunk_list):
             if not os.path.isfile(path):
                 continue
             try:
-                arr = np.loadtxt(path, delimiter=',')
+                with instrument.span('load', file=os.path.basename(path)):
+                    arr = np.loadtxt(path, delimiter=',')
             except Exception as e:
                 print(f"  WARNING: could not load {path} ({e}) — skipping")
                 continue
@@ -2432,7 +1827,8 @@ def _load_and_concat_batch_days(folder, dates):
             if not os.path.isfile(path):
                 continue
             try:
-                arr = np.loadtxt(path, delimiter=',')
+                with instrument.span('load', file=os.path.basename(path)):
+                    arr = np.loadtxt(path, delimiter=',')
             except Exception as e:
                 print(f"  WARNING: could not load {path} ({e}) — skipping")
                 continue
@@ -2462,17 +1858,6 @@ def convert_size(size_bytes):
    s = round(size_bytes / p, 2)
    return "%s %s" % (s, size_name[i])
 
-def check_overlap(start, end, fstart, fend):
-    # Convert QDateTime to pd.Timestamp
-    start_ts = pd.Timestamp(start.toSecsSinceEpoch()+ start.offsetFromUtc(), unit='s')
-    end_ts = pd.Timestamp(end.toSecsSinceEpoch()+ end.offsetFromUtc(), unit='s')
-    # Check if there's an overlap
-    if start_ts <= fend and fstart <= end_ts:
-        return True  # Overlap exists
-    else:
-        return False  # No overlap
-
-
 def parse_freq_bands(text):
     """Parse '10-50 100-200' or '10-50,100-200' into [(10.0,50.0),(100.0,200.0)]."""
     bands = []
@@ -2489,6 +1874,7 @@ def export_band_summary(spectrograms, freq_bands, folder):
 
     CSV columns: time, channel, band_<lo>_<hi>_Hz, ..., average_power
     """
+    import pandas as pd
     ref = next((s for s in spectrograms if s is not None), None)
     if ref is None:
         return None
@@ -4,6 +4,9 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
+import sys
+from utils import log
+
 class LabelledIntField(QWidget):
     def __init__(self, title, initial_value=None):
         QWidget.__init__(self)
@@ -63,4 +66,35 @@ class LabelledDoubleField(QWidget):
         self.lineEdit.textChanged.connect(function)
         
     def getValue(self):
-        return float(self.lineEdit.text())
\ No newline at end of file
+        return float(self.lineEdit.text())
+
+class BufferedLogView(QPlainTextEdit):
+    """Read-only log pane fed from a log.LogBuffer at a fixed frame rate.
+
+    install() points sys.stdout at the buffer, so print() from any thread
+    only queues the line; a QTimer in the GUI thread appends whatever has
+    accumulated as one block, at most max_per_frame lines per tick.
+    """
+    def __init__(self, parent=None, fps=10, max_per_frame=500, max_blocks=5000):
+        QPlainTextEdit.__init__(self, parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_blocks)
+        self.buffer = log.LogBuffer()
+        self._max_per_frame = max_per_frame
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(1000 / fps))
+        self._timer.timeout.connect(self.flush_buffer)
+        self._timer.start()
+
+    def install(self):
+        sys.stdout = self.buffer
+
+    def flush_buffer(self):
+        if not len(self.buffer):
+            return
+        lines, dropped = self.buffer.drain(self._max_per_frame)
+        if dropped:
+            lines.insert(0, f"… {dropped} log line(s) dropped")
+        self.appendPlainText('\n'.join(lines))
+        sb = self.verticalScrollBar()
+        sb.setValue(sb.maximum())
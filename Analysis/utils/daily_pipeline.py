@@ -0,0 +1,583 @@
+"""Qt-free daily activity pipeline shared by the batch GUI and batch_cli.py.
+
+Turns one time window of .bin files into six per-channel spectrograms and
+an activity time series (z-normalise → sum channels → percentile cutoff →
+sum over frequency, overall and per band → 10-min bins) and writes them
+atomically to the output folder.
+"""
+import io
+import os
+import sys
+import shutil
+import datetime
+import traceback
+import contextlib
+
+import numpy as np
+
+from utils import dropbox_helper, instrument, quantiles
+from utils.processing import process_bin_files, process_bin_windows
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Spec array helpers (mirrors claudeHelper_20260315_circadian_prototype.py)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def spec_freqs(spec):  return spec[1:, 0]
+def spec_times(spec):  return spec[0, 1:]
+def spec_power(spec):  return spec[1:, 1:]
+
+
+def rebuild_spec(freqs, times, power):
+    """Reconstruct the packed spec array from components."""
+    dt = power.dtype
+    out = np.empty((len(freqs) + 1, len(times) + 1), dtype=dt)
+    out[0, 0] = 0
+    out[0, 1:] = times
+    out[1:, 0] = freqs
+    out[1:, 1:] = power
+    return out
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Activity pipeline functions
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Frequency bands reported in the output CSV
+FREQ_BANDS = [(0, 40), (40, 80), (80, 120), (120, 160), (160, 200), (200, 300)]
+
+
+def _znorm_spec(spec):
+    """Global Z-normalise a single spectrogram."""
+    power  = spec_power(spec).astype(np.float32)
+    mu     = np.nanmean(power)
+    sigma  = np.nanstd(power)
+    normed = (power - mu) / (sigma + np.float32(1e-7))
+    return rebuild_spec(spec_freqs(spec), spec_times(spec), normed)
+
+
+def _combine_znorm_sum(specs):
+    """Z-normalise each channel then sum into one combined spectrogram."""
+    znormed  = [_znorm_spec(s) for s in specs]
+    min_t    = min(spec_power(s).shape[1] for s in znormed)
+    acc      = spec_power(znormed[0])[:, :min_t].copy()
+    nan_mask = np.isnan(acc)
+    acc      = np.where(nan_mask, np.float32(0), acc)
+    for s in znormed[1:]:
+        p     = spec_power(s)[:, :min_t]
+        valid = ~np.isnan(p)
+        acc  += np.where(valid, p, np.float32(0))
+        nan_mask &= ~valid
+    acc[nan_mask] = np.nan
+    return rebuild_spec(spec_freqs(znormed[0]), spec_times(znormed[0])[:min_t], acc)
+
+
+def _percentile_cutoff(spec, percentile=75, exact=None):
+    """Set cells below the Nth percentile to NaN (exact: see quantiles.nanpercentile)."""
+    power     = spec_power(spec).copy()
+    threshold = quantiles.nanpercentile(power, percentile, exact=exact)
+    power[power < threshold] = np.nan
+    return rebuild_spec(spec_freqs(spec), spec_times(spec), power)
+
+
+def _sum_to_timeseries(spec):
+    """Sum across frequency axis per time column (NaN-safe; all-NaN columns → NaN)."""
+    power   = spec_power(spec)
+    values  = np.nansum(power, axis=0)
+    all_nan = np.all(np.isnan(power), axis=0)
+    values[all_nan] = np.nan
+    return spec_times(spec), values
+
+
+def _apply_freq_filter(spec, lo, hi):
+    """Return a spectrogram slice restricted to [lo, hi] Hz, or None if no rows match."""
+    freqs = spec_freqs(spec)
+    mask  = (freqs >= lo) & (freqs <= hi)
+    if not mask.any():
+        return None
+    return rebuild_spec(freqs[mask], spec_times(spec), spec_power(spec)[mask, :])
+
+
+def _bin_timeseries(timestamps, values, bin_size_min=10, bin_step_min=10):
+    """Average a time series into non-overlapping bins (bin_size == bin_step → no overlap).
+
+    Returns (bin_centre_timestamps, bin_mean_values).
+    """
+    if len(timestamps) < 2:
+        return timestamps, values
+
+    bin_size_s = bin_size_min * 60.0
+    bin_step_s = bin_step_min * 60.0
+
+    t_start = timestamps[0]
+    t_end   = timestamps[-1]
+
+    centres = np.arange(t_start + bin_size_s / 2.0,
+                        t_end   - bin_size_s / 2.0 + bin_step_s,
+                        bin_step_s)
+
+    bin_vals = []
+    for c in centres:
+        mask   = (timestamps >= c - bin_size_s / 2.0) & (timestamps < c + bin_size_s / 2.0)
+        finite = values[mask]
+        finite = finite[np.isfinite(finite)]
+        bin_vals.append(np.mean(finite) if len(finite) > 0 else np.nan)
+
+    return centres, np.array(bin_vals)
+
+
+@instrument.timed('activity')
+def run_activity_pipeline(spectrograms, percentile=75, fused=True, exact=None):
+    """Full activity pipeline for one day's spectrograms.
+
+    Pipeline:
+      1. Z-normalise each channel
+      2. Sum channels into a combined spectrogram
+      3. Apply Nth-percentile cutoff (cells below → NaN)
+      4. Sum across frequency axis → all-data time series
+      5. Sum across each frequency band → per-band time series
+      6. Bin everything into 10-min intervals
+
+    fused=True runs the single-pass implementation (_activity_fused), which
+    needs about one spectrogram of working memory; fused=False runs the
+    step-by-step reference below.  They agree to float32 rounding.
+
+    exact=None takes the percentile exactly for small days and from a
+    histogram (error <= (max - min) / 65536) for large ones; pass True or
+    False to force either (see utils.quantiles).
+
+    Returns (bin_timestamps, bin_activity, band_dict) where band_dict maps
+    "lo-hi" → binned values array, or (None, None, None) if no usable data.
+    """
+    valid = [s for s in spectrograms
+             if s is not None and not np.all(np.isnan(spec_power(s)))]
+    if not valid:
+        return None, None, None
+    if fused:
+        return _activity_fused(valid, percentile, exact)
+
+    combined = _combine_znorm_sum(valid)
+    filtered = _percentile_cutoff(combined, percentile, exact)
+
+    # All-data time series.  Timestamps come from the float64 input: the
+    # float32 combined spectrogram cannot hold epoch seconds exactly.
+    _, activity = _sum_to_timeseries(filtered)
+    times = spec_times(valid[0])[:len(activity)]
+
+    # Per-frequency-band time series
+    raw_bands = {}
+    for lo, hi in FREQ_BANDS:
+        band_spec = _apply_freq_filter(filtered, lo, hi)
+        if band_spec is not None:
+            _, bvals = _sum_to_timeseries(band_spec)
+        else:
+            bvals = np.full(len(activity), np.nan)
+        raw_bands[f"{lo}-{hi}"] = bvals
+
+    # Bin to 10-min intervals
+    bin_times, bin_activity = _bin_timeseries(times, activity)
+    bin_bands = {}
+    for key, bvals in raw_bands.items():
+        _, binned = _bin_timeseries(times, bvals)
+        bin_bands[key] = binned
+
+    return bin_times, bin_activity, bin_bands
+
+
+# Columns per block when streaming over a spectrogram (bounds the temporaries)
+_BLOCK_COLS = 1 << 14
+
+
+def _nan_mean_std(power):
+    """NaN-ignoring mean and std of a 2-D array in one pass over column blocks.
+
+    Per-block float64 count/mean/M2 are merged with Chan's parallel update,
+    so there is no full-size temporary and no sum-of-squares cancellation.
+    """
+    n, mean, m2 = 0, 0.0, 0.0
+    for c0 in range(0, power.shape[1], _BLOCK_COLS):
+        blk = power[:, c0:c0 + _BLOCK_COLS]
+        vals = np.asarray(blk[~np.isnan(blk)], dtype=np.float64)
+        nb = vals.size
+        if not nb:
+            continue
+        mb = vals.mean()
+        d = vals - mb
+        m2b = np.dot(d, d)
+        tot = n + nb
+        delta = mb - mean
+        mean += delta * nb / tot
+        m2 += m2b + delta * delta * n * nb / tot
+        n = tot
+    if not n:
+        return np.nan, np.nan
+    return mean, np.sqrt(m2 / n)
+
+
+def _activity_fused(valid, percentile, exact=None):
+    """Single-pass equivalent of the reference path in run_activity_pipeline.
+
+    Keeps one float32 (n_freq, n_time) accumulator: each channel is
+    z-normalised block by block straight into it, the percentile cutoff is
+    applied in place, and the all-data and band series come from one
+    np.add.reduceat over the elementary frequency segments defined by the
+    sorted band edges (bands share their inclusive edge rows, so each band
+    is the sum of its segments).
+    """
+    min_t = min(spec_power(s).shape[1] for s in valid)
+    freqs = spec_freqs(valid[0])
+    times = spec_times(valid[0])[:min_t]
+    n_freq = freqs.shape[0]
+
+    acc = np.zeros((n_freq, min_t), dtype=np.float32)
+    seen = np.zeros((n_freq, min_t), dtype=bool)
+    for spec in valid:
+        power = spec_power(spec)
+        mu, sigma = _nan_mean_std(power)
+        mu = np.float32(mu)
+        scale = np.float32(sigma) + np.float32(1e-7)
+        for c0 in range(0, min_t, _BLOCK_COLS):
+            c1 = min(min_t, c0 + _BLOCK_COLS)
+            z = power[:, c0:c1].astype(np.float32)
+            z -= mu
+            z /= scale
+            ok = ~np.isnan(z)
+            seen[:, c0:c1] |= ok
+            z[~ok] = 0
+            acc[:, c0:c1] += z
+
+    # Percentile cutoff over the cells that had data, then mask in place
+    threshold = quantiles.nanpercentile(acc, percentile, exact=exact, where=seen)
+    seen &= acc >= threshold
+    acc[~seen] = 0
+
+    # Elementary frequency segments: every band edge row plus the full range
+    edges = [0]
+    band_rows = []
+    for lo, hi in FREQ_BANDS:
+        r0 = int(np.searchsorted(freqs, lo, side='left'))
+        r1 = int(np.searchsorted(freqs, hi, side='right'))
+        band_rows.append((r0, r1))
+        edges += [r0, r1]
+    edges = np.unique(np.clip(edges, 0, n_freq))
+    starts = edges[edges < n_freq]
+    seg_sum = np.empty((starts.size, min_t))
+    seg_cnt = np.empty((starts.size, min_t), dtype=np.int64)
+    for c0 in range(0, min_t, _BLOCK_COLS):   # blocks keep the float64 cast small
+        c1 = min(min_t, c0 + _BLOCK_COLS)
+        seg_sum[:, c0:c1] = np.add.reduceat(acc[:, c0:c1], starts, axis=0, dtype=np.float64)
+        seg_cnt[:, c0:c1] = np.add.reduceat(seen[:, c0:c1], starts, axis=0, dtype=np.int64)
+
+    def _rows_series(r0, r1):
+        if r1 <= r0:
+            return np.full(min_t, np.nan)
+        k0, k1 = np.searchsorted(starts, [r0, r1])
+        vals = seg_sum[k0:k1].sum(axis=0)
+        vals[seg_cnt[k0:k1].sum(axis=0) == 0] = np.nan
+        return vals
+
+    series = [_rows_series(0, n_freq)] + [_rows_series(r0, r1) for r0, r1 in band_rows]
+    bin_times, binned = _bin_timeseries_many(times, np.vstack(series))
+    bin_bands = {f"{lo}-{hi}": binned[i + 1] for i, (lo, hi) in enumerate(FREQ_BANDS)}
+    return bin_times, binned[0], bin_bands
+
+
+def _bin_timeseries_many(timestamps, values, bin_size_min=10, bin_step_min=10):
+    """_bin_timeseries for several series sharing timestamps (rows of values).
+
+    Non-overlapping bins only (size == step), done with one bincount per
+    row instead of a mask per bin.
+    """
+    if len(timestamps) < 2 or bin_size_min != bin_step_min:
+        out = [_bin_timeseries(timestamps, v, bin_size_min, bin_step_min) for v in values]
+        return out[0][0], np.vstack([v for _, v in out])
+
+    bin_size_s = bin_size_min * 60.0
+    t_start, t_end = timestamps[0], timestamps[-1]
+    centres = np.arange(t_start + bin_size_s / 2.0,
+                        t_end   - bin_size_s / 2.0 + bin_size_s,
+                        bin_size_s)
+    n_bins = len(centres)
+    lo = centres - bin_size_s / 2.0
+    edges = np.append(lo, centres[-1] + bin_size_s / 2.0) if n_bins else lo
+    idx = np.searchsorted(edges, timestamps, side='right') - 1
+    in_bin = (idx >= 0) & (idx < n_bins)
+    idx = idx[in_bin]
+
+    out = np.full((values.shape[0], n_bins), np.nan)
+    for r, row in enumerate(values):
+        v = row[in_bin]
+        fin = np.isfinite(v)
+        sums = np.bincount(idx[fin], weights=v[fin], minlength=n_bins)
+        cnts = np.bincount(idx[fin], minlength=n_bins)
+        np.divide(sums, cnts, out=out[r], where=cnts > 0)
+    return centres, out
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Output file helpers
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _spec_path(output_dir, window_start, window_end, channel):
+    s = window_start.strftime('%Y%m%d_%H%M%S')
+    e = window_end.strftime('%Y%m%d_%H%M%S')
+    return os.path.join(output_dir, f"{s}_{e}_ch{channel}.csv")
+
+
+def _activity_path(output_dir, window_start, window_end):
+    s = window_start.strftime('%Y%m%d_%H%M%S')
+    e = window_end.strftime('%Y%m%d_%H%M%S')
+    return os.path.join(output_dir, f"{s}_{e}_activity.csv")
+
+
+def _day_is_complete(output_dir, window_start, window_end, save_specs=True):
+    """True if the expected output files already exist.
+
+    When save_specs is False only the activity CSV is checked (spectrogram
+    files are never written in that mode so their absence is expected).
+    """
+    if not os.path.isfile(_activity_path(output_dir, window_start, window_end)):
+        return False
+    if save_specs:
+        return all(os.path.isfile(_spec_path(output_dir, window_start, window_end, c))
+                   for c in range(1, 7))
+    return True
+
+
+@instrument.timed('write')
+def _save_day(output_dir, window_start, window_end, spectrograms, timestamps, activity, band_dict,
+              save_specs=True):
+    """Write spectrogram CSVs and activity CSV for one window atomically."""
+    os.makedirs(output_dir, exist_ok=True)
+    if save_specs:
+        for c, spec in enumerate(spectrograms, start=1):
+            path = _spec_path(output_dir, window_start, window_end, c)
+            tmp  = path + '.tmp'
+            np.savetxt(tmp, spec, delimiter=',')
+            os.replace(tmp, path)
+    import pandas as pd   # only needed here; kept out of the core's import time
+    act_path = _activity_path(output_dir, window_start, window_end)
+    dts = pd.to_datetime(timestamps, unit='s', utc=True)
+    df  = pd.DataFrame({'timestamp_unix': timestamps,
+                        'datetime_utc':   dts.strftime('%Y-%m-%d %H:%M:%S'),
+                        'all_data':       activity})
+    for key, vals in band_dict.items():
+        lo, hi = key.split('-')
+        df[f"band_{lo}_{hi}Hz"] = vals
+    tmp = act_path + '.tmp'
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, act_path)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Per-window job (top level so it can run in a worker process)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def make_job(day, window_start, window_end, bin_folder, bin_files, output_dir,
+             sampFreq, window, minFreq, maxFreq, percentile,
+             use_dropbox=False, dbx_folder=None, save_specs=True, percentile_exact=True,
+             stream_to_disk=False):
+    """Bundle everything _process_day needs for one window into a plain dict.
+
+    percentile_exact=False takes the activity cutoff from a histogram
+    instead of the exact percentile (run_activity_pipeline's exact=None):
+    about 1 s faster per day, and cells within ~1e-5 of the cutoff can flip.
+
+    stream_to_disk=True builds the window's spectrograms as memory-mapped
+    scratch files in output_dir (process_bin_files out_dir, see _run_day)
+    instead of in RAM; the saved outputs are the same.
+    """
+    return dict(
+        day=day, window_start=window_start, window_end=window_end,
+        bin_folder=bin_folder, bin_files=bin_files, output_dir=output_dir,
+        sampFreq=sampFreq, window=window, minFreq=minFreq, maxFreq=maxFreq,
+        percentile=percentile, percentile_exact=percentile_exact,
+        use_dropbox=use_dropbox, dbx_folder=dbx_folder,
+        save_specs=save_specs, stream_to_disk=stream_to_disk,
+    )
+
+
+def day_windows(start_dt, end_dt, chunk_hrs=0):
+    """List of (label_date, window_start, window_end) covering [start_dt, end_dt].
+
+    chunk_hrs == 0: one window per calendar day, clipped to the range.
+    chunk_hrs >  0: fixed-hour windows labelled by their start date.
+    """
+    windows = []
+    if chunk_hrs == 0:
+        current = start_dt.date()
+        while current <= end_dt.date():
+            day_start = datetime.datetime(current.year, current.month, current.day, 0, 0, 0)
+            day_end   = datetime.datetime(current.year, current.month, current.day, 23, 59, 59)
+            windows.append((current, max(day_start, start_dt), min(day_end, end_dt)))
+            current += datetime.timedelta(days=1)
+    else:
+        cur = start_dt
+        delta = datetime.timedelta(hours=chunk_hrs)
+        while cur < end_dt:
+            chunk_end = min(cur + delta, end_dt)
+            windows.append((cur.date(), cur, chunk_end))
+            cur = chunk_end
+    return windows
+
+
+def _process_day(job, dbx=None, capture=False):
+    """Spectrograms → activity → saved outputs for one window.
+
+    job is a plain dict (picklable); see make_job().  In a worker
+    process the Dropbox client cannot be shared, so when job['use_dropbox']
+    is set and dbx is None a fresh client is created from the saved tokens.
+
+    Returns (day, status, n_points, log) with status one of 'done',
+    'no-data' or 'error'.  With capture=True everything printed is
+    collected into log instead of going to stdout, so the parent can show
+    it in one piece.
+    """
+    day = job['day']
+    buf = io.StringIO()
+    with (contextlib.redirect_stdout(buf) if capture else contextlib.nullcontext()):
+        status, n_points = _run_day(job, dbx)
+    return day, status, n_points, buf.getvalue()
+
+
+def _process_days_rolling(jobs, dbx=None, progress=None, file_sizes=None):
+    """_process_day for consecutive windows, reading each .bin file only once.
+
+    jobs must be in time order and share their processing settings (as
+    built by one batch run).  Files that straddle a window boundary are
+    read, denoised and FFT'd once; the columns belonging to the next window
+    are carried over by process_bin_windows.  Yields (day, status, n_points)
+    per job as each window completes.  progress (utils.progress.Progress)
+    and file_sizes are passed on to process_bin_windows.  It builds the
+    windows in RAM, so stream_to_disk jobs go through _run_day one by one
+    instead (files crossing a boundary are then read for both windows).
+    """
+    if not jobs:
+        return
+    if jobs[0]['stream_to_disk']:
+        for job in jobs:
+            yield (job['day'],) + _run_day(job, dbx, progress, file_sizes)
+        return
+    try:
+        dbx = _ensure_dbx(jobs[0], dbx)
+        j0 = jobs[0]
+        windows = process_bin_windows(
+            j0['bin_folder'] or j0['output_dir'],
+            j0['bin_files'],
+            [(job['window_start'], job['window_end']) for job in jobs],
+            j0['sampFreq'],
+            j0['window'],
+            j0['window'],
+            j0['minFreq'],
+            j0['maxFreq'],
+            dbx=dbx,
+            dbx_folder=j0['dbx_folder'],
+            local_bin_folder=j0['bin_folder'],
+            file_sizes=file_sizes,
+            progress=progress,
+        )
+    except Exception as e:
+        print(f"ERROR setting up rolling processing: {e}")
+        traceback.print_exc(file=sys.stdout)
+        windows = iter(())
+    for i, job in enumerate(jobs):
+        day = job['day']
+        print(f"\n[{day}] Processing bin files…")
+        try:
+            specs = next(windows)
+        except Exception as e:
+            if not isinstance(e, StopIteration):
+                print(f"[{day}] ERROR in process_bin_files: {e}")
+                traceback.print_exc(file=sys.stdout)
+            yield day, 'error', 0
+            # the generator cannot continue after an error; finish window by window
+            for rest in jobs[i + 1:]:
+                yield (rest['day'],) + _run_day(rest, dbx, progress, file_sizes)
+            return
+        yield (day,) + _finish_day(job, specs)
+
+
+def _ensure_dbx(job, dbx):
+    """Dropbox client for job: the one given, or a new one from saved tokens."""
+    if job['use_dropbox'] and dbx is None:
+        dbx = dropbox_helper.get_saved_client()
+        if dbx is None:
+            raise RuntimeError("no saved Dropbox credentials for worker process")
+        dbx = dropbox_helper.scope_to_root_namespace(dbx)
+    return dbx
+
+
+def _scratch_dir(output_dir, window_start, window_end):
+    """Where a stream_to_disk job keeps its memory-mapped spectrograms."""
+    s = window_start.strftime('%Y%m%d_%H%M%S')
+    e = window_end.strftime('%Y%m%d_%H%M%S')
+    return os.path.join(output_dir, f".{s}_{e}_specs")
+
+
+def _run_day(job, dbx, progress=None, file_sizes=None):
+    """process_bin_files + _finish_day for one window.
+
+    With job['stream_to_disk'] the spectrograms are streamed tile by tile
+    into memory-mapped .npy scratch files (process_bin_files out_dir), so
+    the day never has to fit in RAM; the activity pipeline reads them in
+    row blocks, _save_day writes the usual CSVs from them, and the scratch
+    folder is removed afterwards.
+    """
+    day, window_start, window_end = job['day'], job['window_start'], job['window_end']
+    print(f"\n[{day}] Processing bin files…")
+    scratch = None
+    if job['stream_to_disk']:
+        scratch = _scratch_dir(job['output_dir'], window_start, window_end)
+    try:
+        dbx = _ensure_dbx(job, dbx)
+        specs = process_bin_files(
+            job['bin_folder'] or job['output_dir'],
+            job['bin_files'],
+            window_start,
+            window_end,
+            job['sampFreq'],
+            job['window'],
+            job['window'],
+            job['minFreq'],
+            job['maxFreq'],
+            dbx=dbx,
+            dbx_folder=job['dbx_folder'],
+            local_bin_folder=job['bin_folder'],
+            file_sizes=file_sizes,
+            progress=progress,
+            out_dir=scratch,
+        )
+    except Exception as e:
+        print(f"[{day}] ERROR in process_bin_files: {e}")
+        traceback.print_exc(file=sys.stdout)
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+        return 'error', 0
+    try:
+        return _finish_day(job, specs)
+    finally:
+        if scratch:
+            del specs   # release the memmaps before their files go
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _finish_day(job, specs):
+    """Activity pipeline + atomic save for one window's spectrograms."""
+    day, window_start, window_end = job['day'], job['window_start'], job['window_end']
+    print(f"[{day}] Running activity pipeline…")
+    try:
+        times, activity, band_dict = run_activity_pipeline(specs, job['percentile'],
+                                                           exact=True if job['percentile_exact'] else None)
+    except Exception as e:
+        print(f"[{day}] ERROR in pipeline: {e}")
+        traceback.print_exc(file=sys.stdout)
+        return 'error', 0
+
+    if times is None:
+        print(f"[{day}] No valid data — skipping output.")
+        return 'no-data', 0
+
+    _save_day(job['output_dir'], window_start, window_end, specs, times, activity, band_dict,
+              save_specs=job['save_specs'])
+    print(f"[{day}] Done — saved {len(times)} time points.")
+    return 'done', len(times)
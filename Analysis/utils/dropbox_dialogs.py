@@ -0,0 +1,236 @@
+"""Dropbox sign-in and folder-picker dialogs shared by localApp and
+batch_daily_pipeline.
+
+Kept out of localApp so the batch GUI can use them without importing the
+whole visualiser (matplotlib and its canvases).  All Dropbox SDK calls go
+through utils.dropbox_helper, which imports the SDK only when used.
+"""
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (
+    QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QLineEdit, QListWidget, QListWidgetItem,
+)
+
+from utils import dropbox_helper
+
+
+class DropboxAuthDialog(QDialog):
+    """Two-step PKCE OAuth2 dialog for connecting a Dropbox app.
+
+    The user supplies their App key (from dropbox.com/developers/apps) and the
+    dialog walks them through the browser-based authorization code flow.
+    The resulting tokens are persisted to ~/.beespy_dropbox.json so subsequent
+    launches connect automatically.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Connect to Dropbox")
+        self.setMinimumWidth(500)
+        self.dbx = None        # populated on success
+        self._flow = None
+        self._app_key = ""
+
+        layout = QVBoxLayout(self)
+
+        # ── Step 1: App key ──────────────────────────────────────────────────
+        step1 = QLabel(
+            "<b>Step 1.</b>  Create a Dropbox app at "
+            "<a href='https://www.dropbox.com/developers/apps'>"
+            "dropbox.com/developers/apps</a> "
+            "(Scoped access → Full Dropbox → <i>files.content.read</i> permission), "
+            "then paste your <b>App key</b> below.", self)
+        step1.setWordWrap(True)
+        step1.setOpenExternalLinks(True)
+        layout.addWidget(step1)
+
+        self._app_key_input = QLineEdit(self)
+        self._app_key_input.setPlaceholderText("App key  (e.g. abc123xyz456)")
+        saved_key = dropbox_helper.load_config().get("app_key", "")
+        if saved_key:
+            self._app_key_input.setText(saved_key)
+        layout.addWidget(self._app_key_input)
+
+        self._open_btn = QPushButton("Open Dropbox in browser →", self)
+        self._open_btn.clicked.connect(self._open_browser)
+        layout.addWidget(self._open_btn)
+
+        # ── Step 2: Auth code ────────────────────────────────────────────────
+        self._step2_label = QLabel(
+            "<b>Step 2.</b>  After authorizing in the browser, paste the code here:", self)
+        self._step2_label.setWordWrap(True)
+        self._step2_label.hide()
+        layout.addWidget(self._step2_label)
+
+        self._code_input = QLineEdit(self)
+        self._code_input.setPlaceholderText("Authorization code")
+        self._code_input.hide()
+        layout.addWidget(self._code_input)
+
+        btn_row = QHBoxLayout()
+        self._connect_btn = QPushButton("Connect", self)
+        self._connect_btn.clicked.connect(self._finish)
+        self._connect_btn.hide()
+        btn_row.addWidget(self._connect_btn)
+        cancel_btn = QPushButton("Cancel", self)
+        cancel_btn.clicked.connect(self.reject)
+        btn_row.addWidget(cancel_btn)
+        layout.addLayout(btn_row)
+
+        self._status = QLabel("", self)
+        self._status.setWordWrap(True)
+        layout.addWidget(self._status)
+
+    def _open_browser(self):
+        import webbrowser
+        self._app_key = self._app_key_input.text().strip()
+        if not self._app_key:
+            self._status.setText("Please enter your App key first.")
+            return
+        try:
+            self._flow, url = dropbox_helper.start_oauth(self._app_key)
+            webbrowser.open(url)
+            self._step2_label.show()
+            self._code_input.show()
+            self._connect_btn.show()
+            self._status.setText("Browser opened. Authorize, then paste the code above and click Connect.")
+        except Exception as e:
+            self._status.setText(f"Error starting auth: {e}")
+
+    def _finish(self):
+        code = self._code_input.text().strip()
+        if not code:
+            self._status.setText("Please paste the authorization code.")
+            return
+        try:
+            self.dbx = dropbox_helper.finish_oauth(self._flow, code, self._app_key)
+            self.accept()
+        except Exception as e:
+            self._status.setText(f"Connection failed: {e}")
+
+
+class DropboxFolderBrowser(QDialog):
+    """Navigate a Dropbox account tree and select the folder containing .bin files."""
+
+    def __init__(self, dbx, parent=None):
+        super().__init__(parent)
+        self.dbx = dbx
+        self.setWindowTitle("Select Dropbox folder")
+        self.setMinimumSize(540, 480)
+        self.selected_path = None        # Dropbox folder path on accept
+        self.selected_bin_files = []     # list of FileMetadata for .bin files
+        self._current_path = ""
+
+        layout = QVBoxLayout(self)
+
+        # Manual path entry bar
+        path_row = QHBoxLayout()
+        path_row.addWidget(QLabel("Path:", self))
+        self._path_edit = QLineEdit("/", self)
+        self._path_edit.returnPressed.connect(self._go_to_path)
+        path_row.addWidget(self._path_edit)
+        go_btn = QPushButton("Go", self)
+        go_btn.clicked.connect(self._go_to_path)
+        path_row.addWidget(go_btn)
+        layout.addLayout(path_row)
+
+        self._list = QListWidget(self)
+        self._list.itemDoubleClicked.connect(self._on_double_click)
+        layout.addWidget(self._list)
+
+        btn_row = QHBoxLayout()
+        up_btn = QPushButton("↑  Up", self)
+        up_btn.clicked.connect(self._go_up)
+        btn_row.addWidget(up_btn)
+        btn_row.addStretch()
+        self._select_btn = QPushButton("Select this folder", self)
+        self._select_btn.clicked.connect(self._select)
+        btn_row.addWidget(self._select_btn)
+        cancel_btn = QPushButton("Cancel", self)
+        cancel_btn.clicked.connect(self.reject)
+        btn_row.addWidget(cancel_btn)
+        layout.addLayout(btn_row)
+
+        self._status = QLabel("Loading…", self)
+        layout.addWidget(self._status)
+
+        self._load("")
+
+    def _go_to_path(self):
+        text = self._path_edit.text().strip()
+        path = "" if text in ("/", "") else text
+        self._load(path)
+
+    def _load(self, path):
+        self._list.clear()
+        self._status.setText("Loading…")
+        QApplication.processEvents()
+        try:
+            import dropbox as _dbx_mod
+            entries = dropbox_helper.list_folder(self.dbx, path)
+        except Exception as e:
+            self._status.setText(f"Error: {e}")
+            return
+
+        self._current_path = path
+        self._path_edit.setText(path or "/")
+
+        folders = sorted(
+            [e for e in entries if isinstance(e, _dbx_mod.files.FolderMetadata)],
+            key=lambda e: e.name.lower())
+        files = sorted(
+            [e for e in entries if isinstance(e, _dbx_mod.files.FileMetadata)],
+            key=lambda e: e.name.lower())
+
+        # At root, also show shared folders not already in the listing
+        if not path:
+            existing_names = {e.name.lower() for e in folders}
+            shared = dropbox_helper.list_shared_folders(self.dbx)
+            extra = sorted(
+                [s for s in shared if s.name.lower() not in existing_names],
+                key=lambda s: s.name.lower())
+            for s in extra:
+                item = QListWidgetItem(f"📁  {s.name}  (shared)")
+                item.setData(Qt.UserRole, ("folder", s.path_lower))
+                self._list.addItem(item)
+
+        for entry in folders:
+            item = QListWidgetItem(f"📁  {entry.name}")
+            item.setData(Qt.UserRole, ("folder", entry.path_display))
+            self._list.addItem(item)
+        for entry in files:
+            icon = "🔵" if entry.name.endswith(".bin") else "📄"
+            item = QListWidgetItem(f"{icon}  {entry.name}")
+            item.setData(Qt.UserRole, ("file", entry.path_display, entry.size))
+            self._list.addItem(item)
+
+        bin_count = sum(1 for f in files if f.name.endswith(".bin"))
+        self._status.setText(f"{len(folders)} subfolder(s), {bin_count} .bin file(s) in this folder")
+
+    def _on_double_click(self, item):
+        data = item.data(Qt.UserRole)
+        if data[0] == "folder":
+            self._load(data[1])
+
+    def _go_up(self):
+        if self._current_path:
+            parent = self._current_path.rsplit("/", 1)[0]
+            self._load(parent)
+
+    def _select(self):
+        import dropbox as _dbx_mod
+        try:
+            entries = dropbox_helper.list_folder(self.dbx, self._current_path)
+        except Exception as e:
+            self._status.setText(f"Error: {e}")
+            return
+        bin_files = sorted(
+            [e for e in entries
+             if isinstance(e, _dbx_mod.files.FileMetadata) and e.name.endswith(".bin")],
+            key=lambda e: e.name)
+        if not bin_files:
+            self._status.setText("No .bin files found here — please choose another folder.")
+            return
+        self.selected_path = self._current_path
+        self.selected_bin_files = bin_files
+        self.accept()
@@ -0,0 +1,254 @@
+"""Timing spans and counters for the processing pipeline.
+
+    from utils import instrument
+
+    with instrument.span('fft', channel=c):
+        ...
+    with instrument.span('download', file=name) as s:
+        data = fetch()
+        s['bytes'] = len(data)          # fields can be added inside the span
+
+    @instrument.timed('write')
+    def write_chunked_spectrograms(...): ...
+
+    instrument.count('files')
+
+Collection is off until enable() is called (or BEESPY_TRACE is set, see
+below).  While off, span() returns a shared no-op context manager and
+count() returns after one flag check, so instrumented code costs under a
+microsecond per call.
+
+enable(trace_path=None, memory=False, echo=False):
+  trace_path  append every finished span to this file as one JSON line
+              {name, start, dur_s, depth, parent, pid, thread, **fields};
+              disable() adds a final {"counters": ...} line.
+  memory      start tracemalloc and record each span's mem_peak (bytes
+              allocated above the level at span entry).  tracemalloc
+              slows allocation-heavy code noticeably; use it for
+              profiling runs only.
+  echo        print "[name] fields: 0.12s" as each span finishes (the
+              timing lines the GUIs used to print unconditionally).
+
+summary() aggregates calls / total / mean / max time, bytes and peak
+memory per span name, and print_summary() prints that table plus the
+counters.  Setting BEESPY_TRACE before start-up enables collection:
+BEESPY_TRACE=1 echoes the spans to the console, BEESPY_TRACE=<path>
+writes them to that trace file instead (worker processes inherit the
+variable, and each appends whole lines to the same file).
+"""
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import tracemalloc
+
+ENV_VAR = 'BEESPY_TRACE'
+
+_on = False
+_echo = False
+_memory = False
+_own_tracemalloc = False  # tracemalloc was started by enable(), so disable() stops it
+_trace = None           # open JSONL file, or None
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}             # name -> [calls, total_s, max_s, bytes, mem_peak]
+_counters = {}
+
+
+class _NullSpan:
+    """What span() returns while collection is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span(dict):
+    """A running span; the dict holds its fields."""
+
+    def __init__(self, name, fields):
+        super().__init__(fields)
+        self.name = name
+        self.mem0 = None
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1].name if stack else None
+        self.depth = len(stack)
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # fold the peak so far into the enclosing spans before resetting it
+            for outer in stack:
+                outer.peak = max(outer.peak, peak)
+            tracemalloc.reset_peak()
+            self.mem0 = self.peak = current
+        stack.append(self)
+        self.wall = time.time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        dur = time.perf_counter() - self.t0
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        mem_peak = None
+        if self.mem0 is not None and tracemalloc.is_tracing():
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            for outer in stack:
+                outer.peak = max(outer.peak, peak)
+            mem_peak = peak - self.mem0
+        if exc_type is not None:
+            self['error'] = exc_type.__name__
+        _finish(self, dur, mem_peak)
+        return False
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _finish(s, dur, mem_peak):
+    n_bytes = s.get('bytes')
+    with _lock:
+        st = _stats.get(s.name)
+        if st is None:
+            st = _stats[s.name] = [0, 0.0, 0.0, 0, None]
+        st[0] += 1
+        st[1] += dur
+        st[2] = max(st[2], dur)
+        if isinstance(n_bytes, (int, float)):
+            st[3] += n_bytes
+        if mem_peak is not None:
+            st[4] = mem_peak if st[4] is None else max(st[4], mem_peak)
+        if _trace is not None:
+            rec = {'name': s.name, 'start': round(s.wall, 6), 'dur_s': round(dur, 6),
+                   'depth': s.depth, 'parent': s.parent, 'pid': os.getpid(),
+                   'thread': threading.get_ident()}
+            if mem_peak is not None:
+                rec['mem_peak'] = mem_peak
+            rec.update(s)
+            _trace.write(json.dumps(rec, default=str) + '\n')
+    if _echo:
+        fields = ' '.join(f"{k}={v}" for k, v in s.items())
+        print(f"{'  ' * (s.depth + 1)}[{s.name}]{' ' + fields if fields else ''}: {dur:.2f}s", flush=True)
+
+
+def span(name, **fields):
+    """Context manager timing a block as `name`; fields are recorded with it."""
+    if not _on:
+        return _NULL
+    return _Span(name, fields)
+
+
+def timed(name):
+    """Decorator: run every call of the function inside span(name)."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _on:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def count(name, n=1):
+    """Add n to counter `name` (files processed, bytes downloaded, ...)."""
+    if not _on:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def enabled():
+    return _on
+
+
+def enable(trace_path=None, memory=False, echo=False):
+    """Start collecting (resets the summary).  See the module docstring."""
+    global _on, _echo, _memory, _own_tracemalloc, _trace
+    disable()
+    reset()
+    if trace_path:
+        os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+        _trace = open(trace_path, 'a', buffering=1)
+    _memory = bool(memory)
+    if _memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _own_tracemalloc = True
+    _echo = bool(echo)
+    _on = True
+
+
+def disable():
+    """Stop collecting and close the trace file; the summary is kept."""
+    global _on, _memory, _own_tracemalloc, _trace
+    _on = False
+    with _lock:
+        if _trace is not None:
+            _trace.write(json.dumps({'counters': dict(_counters)}) + '\n')
+            _trace.close()
+            _trace = None
+    if _own_tracemalloc and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _own_tracemalloc = _memory = False
+
+
+def reset():
+    """Clear the summary and counters."""
+    with _lock:
+        _stats.clear()
+        _counters.clear()
+
+
+def summary():
+    """{'spans': {name: {calls, total_s, mean_s, max_s, bytes, mem_peak}}, 'counters': {...}}"""
+    with _lock:
+        spans = {name: {'calls': c, 'total_s': t, 'mean_s': t / c if c else 0.0, 'max_s': m,
+                        'bytes': b, 'mem_peak': p}
+                 for name, (c, t, m, b, p) in _stats.items()}
+        return {'spans': spans, 'counters': dict(_counters)}
+
+
+def print_summary(file=None):
+    """Print the summary table (slowest total first) and the counters."""
+    out = file or sys.stdout
+    s = summary()
+    if not s['spans'] and not s['counters']:
+        return
+    print(f"\n{'span':<22} {'calls':>7} {'total s':>9} {'mean s':>9} {'max s':>9} {'MB/s':>8} {'peak MB':>8}",
+          file=out)
+    for name, r in sorted(s['spans'].items(), key=lambda kv: -kv[1]['total_s']):
+        rate = f"{r['bytes'] / 1e6 / r['total_s']:8.1f}" if r['bytes'] and r['total_s'] > 0 else f"{'':>8}"
+        peak = f"{r['mem_peak'] / 1e6:8.1f}" if r['mem_peak'] is not None else f"{'':>8}"
+        print(f"{name:<22} {r['calls']:>7} {r['total_s']:>9.3f} {r['mean_s']:>9.4f} {r['max_s']:>9.3f} "
+              f"{rate} {peak}", file=out)
+    for name, v in sorted(s['counters'].items()):
+        print(f"  {name}: {v}", file=out)
+
+
+_env = os.environ.get(ENV_VAR)
+if _env:
+    if _env.lower() in ('1', 'true', 'yes', 'on'):
+        enable(echo=True)
+    else:
+        enable(trace_path=_env)
@@ -0,0 +1,136 @@
+"""Log levels and a buffered sink for the pipeline's progress output.
+
+The pipeline reports progress with print().  Lines that are written once
+per file (File n of N, data shape, download sizes, per-file checkpoint
+saves) go through detail() instead, so they can be switched off in
+production runs without touching the rest:
+
+    from utils import log
+    log.detail(f"  Data shape: {x.shape}")     # printed only at level 'detail' or lower
+
+Levels, most to least verbose: debug, detail (the default: everything the
+pipeline has always printed), info, warning, error.  At 'info' the per-file
+lines are dropped; at 'warning' only lines containing WARNING/ERROR/FATAL
+(see level_of()) reach a LogBuffer.  set_level() also exports
+BEESPY_LOG_LEVEL, so worker processes started afterwards inherit it.
+
+LogBuffer is a thread-safe stand-in for sys.stdout: write() only appends
+to a bounded deque, so worker threads never wait on the GUI.  Whoever owns
+the display drains it at its own pace (QThelpers.BufferedLogView does so
+on a QTimer); if the producers outrun the bound, the oldest lines are
+dropped and counted.
+"""
+import os
+import threading
+from collections import deque
+
+DEBUG, DETAIL, INFO, WARNING, ERROR = 10, 15, 20, 30, 40
+LEVELS = {'debug': DEBUG, 'detail': DETAIL, 'info': INFO, 'warning': WARNING, 'error': ERROR}
+ENV_VAR = 'BEESPY_LOG_LEVEL'
+
+
+def _parse(name):
+    if isinstance(name, int):
+        return name
+    key = str(name).strip().lower()
+    if key not in LEVELS:
+        raise ValueError(f"log level must be one of {', '.join(LEVELS)}, not {name!r}")
+    return LEVELS[key]
+
+
+_level = _parse(os.environ.get(ENV_VAR) or 'detail')
+
+
+def set_level(name):
+    """Select the level by name ('info', ...) or number."""
+    global _level
+    _level = _parse(name)
+    os.environ[ENV_VAR] = get_level_name()
+
+
+def get_level():
+    return _level
+
+
+def get_level_name():
+    for key, value in LEVELS.items():
+        if value == _level:
+            return key
+    return str(_level)
+
+
+def enabled_for(level):
+    return _level <= _parse(level)
+
+
+def debug(msg):
+    if _level <= DEBUG:
+        print(msg)
+
+
+def detail(msg):
+    """print() a per-file line, unless the level is above 'detail'."""
+    if _level <= DETAIL:
+        print(msg)
+
+
+def level_of(text):
+    """Level of a printed line, judged by the markers the pipeline uses."""
+    if 'ERROR' in text or 'FATAL' in text:
+        return ERROR
+    if 'WARNING' in text:
+        return WARNING
+    return INFO
+
+
+class LogBuffer:
+    """File-like object that queues written lines for a consumer to drain.
+
+    Text is collected per thread until a newline arrives, so print("a", 3)
+    or print(..., end='') fragments become one entry and lines from
+    different threads never interleave; flush() queues the calling thread's
+    unfinished line.  Blank lines are dropped, and entries below the
+    current level are discarded on arrival.
+    """
+
+    def __init__(self, max_lines=20000):
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._partial = threading.local()
+
+    def write(self, msg):
+        text = getattr(self._partial, 'text', '') + msg
+        *lines, self._partial.text = text.split('\n')
+        for line in lines:
+            self._append(line)
+
+    def flush(self):
+        text = getattr(self._partial, 'text', '')
+        self._partial.text = ''
+        self._append(text)
+
+    def _append(self, line):
+        line = line.rstrip()
+        if not line.strip():
+            return
+        if _level > INFO and level_of(line) < _level:
+            return
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(line)
+
+    def drain(self, max_lines=None):
+        """(lines, n_dropped): up to max_lines queued entries, oldest first.
+
+        n_dropped counts entries lost to the bound since the last drain.
+        """
+        with self._lock:
+            n = len(self._lines) if max_lines is None else min(max_lines, len(self._lines))
+            lines = [self._lines.popleft() for _ in range(n)]
+            dropped, self._dropped = self._dropped, 0
+        return lines, dropped
+
+    def __len__(self):
+        return len(self._lines)
@@ -0,0 +1,105 @@
+"""Working precision of the .bin → spectrogram pipeline.
+
+'float64' (the default) is the historical behaviour: the denoiser and the
+aggregation accumulators work in double precision, while the FFT and log
+power of int16 recordings were always single precision (scipy picks
+complex64 for integer input).  'float32' keeps the denoiser's working copy
+and the accumulators in single precision too, so the whole per-file path
+moves half the bytes.  Times, frequencies and the packed output arrays stay
+float64: the header code 99<sampFreq>99<window ms>99 and epoch-second
+timestamps do not fit in a float32.
+
+The setting is read when a _WindowAccumulator is built and by
+_channel_spectra, so change it between runs, not during one:
+
+    precision.set_precision('float32')
+    with precision.using('float32'): ...
+
+set_precision() also exports BEESPY_PRECISION, so worker processes started
+afterwards inherit it; the variable can equally be set before launch.
+compare() measures how far a float32 result is from the float64 one
+(processing.precision_report() runs both and prints the table).
+"""
+import os
+import contextlib
+import numpy as np
+
+ENV_VAR = 'BEESPY_PRECISION'
+_DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+
+def _parse(name):
+    name = str(np.dtype(name)) if not isinstance(name, str) else name.strip().lower()
+    if name not in _DTYPES:
+        raise ValueError(f"precision must be one of {', '.join(_DTYPES)}, not {name!r}")
+    return name
+
+
+_name = _parse(os.environ.get(ENV_VAR) or 'float64')
+
+
+def set_precision(name):
+    """Select 'float32' or 'float64' (a numpy dtype is accepted too)."""
+    global _name
+    _name = _parse(name)
+    os.environ[ENV_VAR] = _name
+
+
+def get_precision():
+    """Name of the current working precision."""
+    return _name
+
+
+def get_dtype():
+    """numpy scalar type of the current working precision."""
+    return _DTYPES[_name]
+
+
+@contextlib.contextmanager
+def using(name):
+    """Temporarily switch the working precision."""
+    previous = _name
+    set_precision(name)
+    try:
+        yield
+    finally:
+        set_precision(previous)
+
+
+def compare(ref, test, packed=True):
+    """Differences between two spectrograms of the same shape.
+
+    packed: the arrays carry the header row/column process_bin_files
+    writes, and only the power block is compared.  Returns a dict:
+      cells         cells finite in both
+      nan_mismatch  cells NaN in one array only
+      max_abs       largest |test - ref|
+      rms           root-mean-square difference
+      max_rel       max_abs / (ref max - ref min)
+      peak_agree    fraction of columns whose peak frequency row is the same
+    """
+    ref = np.asarray(ref, dtype=np.float64)
+    test = np.asarray(test, dtype=np.float64)
+    if ref.shape != test.shape:
+        raise ValueError(f"shape mismatch: {ref.shape} vs {test.shape}")
+    if packed:
+        ref, test = ref[1:, 1:], test[1:, 1:]
+    both = np.isfinite(ref) & np.isfinite(test)
+    diff = np.abs(test - ref)[both]
+    span = float(ref[both].max() - ref[both].min()) if diff.size else 0.0
+    report = {
+        'cells':        int(diff.size),
+        'nan_mismatch': int(np.count_nonzero(np.isnan(ref) != np.isnan(test))),
+        'max_abs':      float(diff.max()) if diff.size else 0.0,
+        'rms':          float(np.sqrt(np.mean(diff ** 2))) if diff.size else 0.0,
+        'max_rel':      float(diff.max() / span) if diff.size and span > 0 else 0.0,
+        'peak_agree':   np.nan,
+    }
+    if ref.ndim == 2:
+        cols = np.flatnonzero(np.isfinite(ref).any(axis=0) & np.isfinite(test).any(axis=0))
+        if cols.size:
+            low = np.finfo(np.float64).min
+            pr = np.argmax(np.where(np.isfinite(ref[:, cols]), ref[:, cols], low), axis=0)
+            pt = np.argmax(np.where(np.isfinite(test[:, cols]), test[:, cols], low), axis=0)
+            report['peak_agree'] = float(np.mean(pr == pt))
+    return report
@@ -0,0 +1,1247 @@
+"""Qt-free core of the .bin → spectrogram processing.
+
+process_bin_files(), process_all_chunks() and their checkpoint helpers live
+here so they can be used from headless scripts (batch_cli.py) and worker
+processes without importing PyQt5 or matplotlib.  localApp re-exports them.
+
+Times are 'local epoch seconds': the wall-clock time written as if it were
+UTC, which is how .bin filenames are interpreted and what the GUI gets from
+QDateTime.toSecsSinceEpoch() + offsetFromUtc().  Every time argument goes
+through _as_epoch(), so callers may pass numbers, np.datetime64, naive
+datetimes / pd.Timestamps, or (from the GUI) QDateTime objects.
+
+The module imports numpy and the numpy/scipy utils modules only — no Qt,
+matplotlib or pandas (benchmarks/import_time.py checks this), so headless
+runs and worker processes start quickly.
+"""
+import os
+import re
+import json
+import time
+import pickle
+import shutil
+import calendar
+import datetime
+import numpy as np
+from utils import utils
+from utils import binaryConvert as bc
+from utils import denoiseSignal as denoise
+from utils import spect
+from utils import precision
+from utils import instrument
+from utils import log
+from utils import dropbox_helper
+from utils.progress import Progress
+
+
+def _as_epoch(t):
+    """Local epoch seconds (float) from a number, datetime64, datetime or QDateTime."""
+    if isinstance(t, (int, float, np.integer, np.floating)):
+        return float(t)
+    if isinstance(t, np.datetime64):
+        return (t - np.datetime64(0, 's')) / np.timedelta64(1, 's')
+    if isinstance(t, datetime.datetime):
+        return calendar.timegm(t.timetuple()) + t.microsecond / 1e6
+    if hasattr(t, 'toSecsSinceEpoch'):   # QDateTime, duck-typed so Qt is never imported
+        return float(t.toSecsSinceEpoch() + t.offsetFromUtc())
+    raise TypeError(f"Cannot interpret {t!r} as a time")
+
+
+def _epoch_to_dt(epoch):
+    """Naive wall-clock datetime for a local epoch value."""
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=float(epoch))
+
+
+def _fmt_epoch(epoch):
+    return _epoch_to_dt(epoch).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _safe_to_delete(path, local_bin_folder):
+    """Return True only if it is safe to delete `path`.
+
+    Never returns True for a .bin file that lives inside the user's locally-
+    selected source folder.  Dropbox-downloaded files have local_bin_folder=None
+    (they are in-memory BytesIO objects anyway, so nothing to delete on disk).
+    """
+    if local_bin_folder is None:
+        return True   # Dropbox mode — no local source to protect
+    real_path   = os.path.realpath(path)
+    real_source = os.path.realpath(local_bin_folder)
+    if real_path.startswith(real_source + os.sep) and real_path.lower().endswith('.bin'):
+        print(f"  [SAFETY] Skipping deletion of local bin file: {path}")
+        return False
+    return True
+
+
+# ── Checkpoint helpers ────────────────────────────────────────────────────────
+
+_CHK_SUBDIR = '_beespy_checkpoint'
+
+
+def _checkpoint_settings_key(start_time, end_time, sampFreq, defaultWindows,
+                              calcWindows, minFreq, maxFreq, agg, source):
+    """Return a dict of settings that uniquely identify a processing run."""
+    return {
+        'start_epoch':    round(_as_epoch(start_time), 1),
+        'end_epoch':      round(_as_epoch(end_time),   1),
+        'sampFreq':       sampFreq,
+        'defaultWindows': round(defaultWindows, 6),
+        'calcWindows':    round(calcWindows, 6),
+        'minFreq':        round(minFreq, 6),
+        'maxFreq':        round(maxFreq, 6),
+        'agg':            agg,
+        'source':         str(source),
+        'precision':      precision.get_precision(),
+    }
+
+
+# Values assumed for key fields missing from checkpoints written before the field existed
+_KEY_DEFAULTS = {'precision': 'float64'}
+
+
+def _checkpoint_meta_matches(meta, key):
+    """Return True when the stored meta matches all fields in key."""
+    return all(meta.get(k, _KEY_DEFAULTS.get(k)) == v for k, v in key.items())
+
+
+@instrument.timed('checkpoint')
+def _write_checkpoint(chk_dir, key, processed_files, accumulators, mode):
+    """Atomically write checkpoint data.  meta.json is written last so it
+    serves as the 'committed' marker — an incomplete write leaves the previous
+    meta.json intact."""
+    os.makedirs(chk_dir, exist_ok=True)
+    for c in range(6):
+        if mode == 'avg':
+            np.save(os.path.join(chk_dir, f'ch{c}_sum.npy'),   accumulators[0][c])
+            np.save(os.path.join(chk_dir, f'ch{c}_count.npy'), accumulators[1][c])
+        elif mode == 'max':
+            np.save(os.path.join(chk_dir, f'ch{c}_max.npy'), accumulators[c])
+        else:  # pct — defaultdict(list) serialised with pickle
+            with open(os.path.join(chk_dir, f'ch{c}_bins.pkl'), 'wb') as f:
+                pickle.dump(dict(accumulators[c]), f)
+    meta = dict(key)
+    meta['processed_files'] = list(processed_files)
+    meta['saved_at'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    tmp = os.path.join(chk_dir, '_meta_tmp.json')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(chk_dir, 'meta.json'))
+    log.detail(f"  [checkpoint] Saved ({len(processed_files)} files processed)")
+
+
+def _load_checkpoint(chk_dir, mode, n_freq, n_time):
+    """Load accumulators from a checkpoint.
+
+    Returns (accumulators, processed_files_set) or (None, None) on failure.
+    """
+    try:
+        if mode == 'avg':
+            accum_sum, accum_count = [], []
+            for c in range(6):
+                accum_sum.append(np.load(os.path.join(chk_dir, f'ch{c}_sum.npy')))
+                # older checkpoints stored uint16 counts
+                accum_count.append(np.load(os.path.join(chk_dir, f'ch{c}_count.npy')).astype(np.uint32, copy=False))
+            accumulators = (accum_sum, accum_count)
+        elif mode == 'max':
+            accumulators = [np.load(os.path.join(chk_dir, f'ch{c}_max.npy')) for c in range(6)]
+        else:  # pct
+            from collections import defaultdict
+            accumulators = []
+            for c in range(6):
+                with open(os.path.join(chk_dir, f'ch{c}_bins.pkl'), 'rb') as f:
+                    d = pickle.load(f)
+                accumulators.append(defaultdict(list, {int(k): v for k, v in d.items()}))
+        with open(os.path.join(chk_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        return accumulators, set(meta.get('processed_files', []))
+    except Exception as _e:
+        print(f"  WARNING: could not load checkpoint ({_e}) — starting fresh")
+        return None, None
+
+
+def _fsync_write(path, write):
+    """Create `path`, fill it with write(f), and fsync it."""
+    with open(path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_journal(chk_dir):
+    """Committed entries of an incremental checkpoint's journal.jsonl.
+
+    A torn last line (crash mid-append) is ignored, as is anything after it.
+    """
+    entries = []
+    try:
+        with open(os.path.join(chk_dir, 'journal.jsonl')) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+    except OSError:
+        pass
+    return entries
+
+
+def _read_checkpoint_meta(chk_dir):
+    """meta.json of a checkpoint, or None if there is none.
+
+    For incremental checkpoints processed_files and saved_at come from the
+    journal, so callers can treat both formats alike.
+    """
+    path = os.path.join(chk_dir, 'meta.json')
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        meta = json.load(f)
+    if meta.get('format') == 'incremental':
+        entries = _read_journal(chk_dir)
+        meta['processed_files'] = sorted({f for e in entries for f in e['files']})
+        if entries:
+            meta['saved_at'] = entries[-1]['saved_at']
+    return meta
+
+
+# pct mode journal record: channel, flat output cell, value (stored as
+# float64; the journal's pct_dtype restores the spectrogram dtype on replay)
+_PCT_RECORD = np.dtype([('c', 'u1'), ('idx', '<i8'), ('v', '<f8')])
+
+
+class _IncrementalCheckpoint:
+    """Append-only checkpoint for one _WindowAccumulator.
+
+    Files in chk_dir:
+      meta.json              settings key, format and grid shape (written once)
+      base_<kind>.npy        (6, n_time, n_freq) time-major accumulators; a run
+                             of output columns is one contiguous byte range
+      slab_<seq>_<kind>.npy  the dirty columns [t0, t1) saved by commit <seq>
+      pct_values.bin         pct mode: appended (channel, cell, value) records
+      journal.jsonl          one line per commit (seq, t0, t1, new files,
+                             pct_bytes, saved_at) — the line is the commit
+
+    commit() writes the slab / new pct values and fsyncs them, appends the
+    journal line, and only then copies the slab into the memory-mapped base
+    arrays in place.  A crash at any point leaves the previous or the new
+    state, and each checkpoint costs only what changed since the last one.
+    """
+
+    _KINDS = {'avg': ('sum', 'count'), 'max': ('max',), 'pct': ()}
+
+    def __init__(self, chk_dir, key, acc, resume=False):
+        self.dir = chk_dir
+        self.acc = acc
+        self.kinds = self._KINDS[acc.mode]
+        self.processed = set()
+        self.seq = 0
+        self.pct_bytes = 0
+        self.pct_dtype = None
+        meta = _read_checkpoint_meta(chk_dir) if resume else None
+        if (meta is not None and meta.get('format') == 'incremental'
+                and _checkpoint_meta_matches(meta, key)):
+            self._resume()
+        else:
+            self._create(key)
+        acc.dirty = None
+        acc.pending = [] if acc.mode == 'pct' else None
+
+    def _path(self, name):
+        return os.path.join(self.dir, name)
+
+    def _live(self, kind):
+        """Per-channel (n_freq, n_time) in-memory arrays for one kind."""
+        accum = self.acc.accumulators
+        return {'sum': lambda: accum[0], 'count': lambda: accum[1], 'max': lambda: accum}[kind]()
+
+    def _shape(self):
+        return (6, self.acc.times.shape[0], self.acc.freqs.shape[0])
+
+    def _create(self, key):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        os.makedirs(self.dir)
+        for kind in self.kinds:
+            # Sparse on disk: only columns covered by a commit are ever read back
+            np.lib.format.open_memmap(self._path(f'base_{kind}.npy'), mode='w+',
+                                      dtype=self._live(kind)[0].dtype, shape=self._shape()).flush()
+        open(self._path('journal.jsonl'), 'w').close()
+        meta = dict(key)
+        meta['format'] = 'incremental'
+        meta['shape'] = list(self._shape())
+        tmp = self._path('_meta_tmp.json')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, self._path('meta.json'))
+
+    def _apply_slab(self, entry):
+        """Copy a committed slab into the base arrays (idempotent) and drop it."""
+        for kind in self.kinds:
+            slab_path = self._path(f"slab_{entry['seq']}_{kind}.npy")
+            if not os.path.isfile(slab_path):
+                continue
+            base = np.lib.format.open_memmap(self._path(f'base_{kind}.npy'), mode='r+')
+            base[:, entry['t0']:entry['t1']] = np.load(slab_path)
+            base.flush()
+            del base
+            os.remove(slab_path)
+
+    def _resume(self):
+        entries = _read_journal(self.dir)
+        for entry in entries:
+            self.processed.update(entry['files'])
+            if entry.get('t1') is not None:
+                self._apply_slab(entry)
+        if entries:
+            self.seq = entries[-1]['seq']
+            self.pct_bytes = entries[-1]['pct_bytes']
+            self.pct_dtype = entries[-1].get('pct_dtype')
+        # Slabs from a commit that never reached the journal
+        for name in os.listdir(self.dir):
+            if name.startswith('slab_') and int(name.split('_')[1]) > self.seq:
+                os.remove(self._path(name))
+
+        # Reload only the columns some commit covered
+        covered = np.zeros(self.acc.times.shape[0], dtype=bool)
+        for entry in entries:
+            if entry.get('t1') is not None:
+                covered[entry['t0']:entry['t1']] = True
+        cols = np.flatnonzero(covered)
+        for kind in self.kinds:
+            base = np.load(self._path(f'base_{kind}.npy'), mmap_mode='r')
+            live = self._live(kind)
+            for c in range(6):
+                live[c][:, cols] = base[c, cols].T
+            del base
+
+        if self.acc.mode == 'pct':
+            path = self._path('pct_values.bin')
+            if os.path.isfile(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(self.pct_bytes)   # drop records never committed
+                recs = np.fromfile(path, dtype=_PCT_RECORD)
+                vals = recs['v'].astype(self.pct_dtype or np.float64)
+                for c, idx, v in zip(recs['c'].tolist(), recs['idx'].tolist(), vals):
+                    self.acc.accumulators[c][idx].append(v)
+        print(f"  [checkpoint] Resumed — {len(self.processed)} file(s) already processed "
+              f"(journal of {self.seq} commit(s))")
+
+    @instrument.timed('checkpoint')
+    def commit(self, new_files):
+        """Persist everything added since the last commit, plus new_files."""
+        acc = self.acc
+        seq = self.seq + 1
+        entry = {'seq': seq, 't0': None, 't1': None, 'files': sorted(new_files)}
+        if acc.dirty is not None and self.kinds:
+            t0, t1 = acc.dirty
+            entry['t0'], entry['t1'] = int(t0), int(t1)
+            for kind in self.kinds:
+                live = self._live(kind)
+                slab = np.stack([live[c][:, t0:t1].T for c in range(6)])
+                _fsync_write(self._path(f'slab_{seq}_{kind}.npy'), lambda f: np.save(f, slab))
+        if acc.pending:
+            recs = np.concatenate([
+                np.rec.fromarrays([np.full(idx.size, c, dtype='u1'), idx, vals], dtype=_PCT_RECORD)
+                for c, idx, vals in acc.pending])
+            with open(self._path('pct_values.bin'), 'ab') as f:
+                recs.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            self.pct_bytes += recs.nbytes
+            self.pct_dtype = str(acc.pending[0][2].dtype)
+        entry['pct_bytes'] = self.pct_bytes
+        entry['pct_dtype'] = self.pct_dtype
+        entry['saved_at'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with open(self._path('journal.jsonl'), 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        # Committed — fold the slab into the base arrays
+        if entry['t1'] is not None:
+            self._apply_slab(entry)
+        self.seq = seq
+        self.processed.update(new_files)
+        acc.dirty = None
+        if acc.pending is not None:
+            acc.pending.clear()
+        cols = '' if entry['t1'] is None else f", columns {entry['t0']}–{entry['t1'] - 1}"
+        log.detail(f"  [checkpoint] Saved ({len(self.processed)} files processed{cols})")
+
+
+_DBX_MAX_RETRIES = 3
+_DBX_RETRY_DELAYS = [10, 30, 60]   # seconds to wait before each retry
+_PCT_MAP = {"75th percentile": 75, "90th percentile": 90, "95th percentile": 95}
+
+
+def _now():
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class _ScatterPlan:
+    """Where one file's spectrogram columns land in an output grid.
+
+    in_rows / in_cols select the input rows and columns that land (in_cols
+    is a slice, or an index array when columns must be regrouped);
+    out_rows are the matching output rows; cols the distinct output
+    columns hit, ascending; starts / counts the run of selected input
+    columns feeding each of them.  Scattering with a plan costs
+    O(rows x file columns), independent of the output grid size.
+    """
+    __slots__ = ('in_rows', 'in_cols', 'out_rows', 'cols', 'starts', 'counts')
+
+    def __init__(self, in_rows, in_cols, out_rows, cols, starts, counts):
+        self.in_rows, self.in_cols, self.out_rows = in_rows, in_cols, out_rows
+        self.cols, self.starts, self.counts = cols, starts, counts
+
+
+class _WindowAccumulator:
+    """Output grid for one time window and the per-channel aggregation state.
+
+    add() scatters one channel's spectrogram columns into the grid;
+    finish() returns the six packed output arrays.  The accumulator layout
+    per agg mode ('avg': ([sum], [count]), 'max': [max], 'pct': [bins]) is the
+    one _write_checkpoint / _load_checkpoint expect; sums and maxima are
+    held in the working precision (utils.precision) current at construction.  dirty (the output
+    column range touched since it was last reset) and pending (pct values
+    added since then) feed _IncrementalCheckpoint; both stay None otherwise.
+    """
+
+    def __init__(self, start_time, end_time, sampFreq, defaultWindows, calcWindows,
+                 minFreq, maxFreq, agg="Average"):
+        self.sampFreq = sampFreq
+        self.defaultWindows = defaultWindows
+        self.pct_level = _PCT_MAP.get(agg, None)
+        self.mode = 'max' if agg == "Maximum" else ('pct' if self.pct_level is not None else 'avg')
+        # per-cell FFT column counts: integer adds wrap silently, and the number
+        # of files overlapping a cell has no fixed bound, so no uint16 here
+        self.count_dtype = np.uint32
+        self.dtype = precision.get_dtype()
+
+        # Calculate the frequency axis using the exact scipy bins (same as dospectrogram produces)
+        nps_out = max(2, int(round(defaultWindows * sampFreq)))
+        fq_full = np.fft.rfftfreq(nps_out, 1.0 / sampFreq)
+        freq_mask = (fq_full >= minFreq) & (fq_full <= maxFreq)
+        self.freqs = fq_full[freq_mask]
+        self.first_freq_idx = int(np.where(freq_mask)[0][0]) if freq_mask.any() else 0
+        self.start_epoch = _as_epoch(start_time)
+        self.end_epoch   = _as_epoch(end_time)
+        self.times = np.arange(self.start_epoch, self.end_epoch + calcWindows, calcWindows)
+        # Output bin edges: each output time is the centre of a calcWindows-wide bin
+        self.t_edges = np.append(self.times, self.end_epoch + 2 * calcWindows) - calcWindows / 2
+
+        self.dirty = None
+        self.pending = None
+        self.accumulators = self._new_state(self.times.shape[0])
+
+    def _new_state(self, n_cols):
+        """Empty per-channel aggregation state for n_cols output columns."""
+        shape = (self.freqs.shape[0], n_cols)
+        if self.mode == 'max':
+            return [np.full(shape, -np.inf, dtype=self.dtype) for _ in range(6)]
+        elif self.mode == 'pct':
+            from collections import defaultdict
+            return [defaultdict(list) for _ in range(6)]
+        else:  # average
+            return ([np.zeros(shape, dtype=self.dtype) for _ in range(6)],
+                    [np.zeros(shape, dtype=self.count_dtype) for _ in range(6)])
+
+    @instrument.timed('scatter_plan')
+    def plan(self, ts, n_rows, f_offset=0):
+        """_ScatterPlan for spectrograms with column times ts and n_rows rows
+        (row r = FFT bin f_offset + r), or None if nothing lands in the grid.
+
+        All channels of a file share ts, so callers build the plan once per
+        file and pass it to add() for every channel.
+        """
+        n_freq_out, n_time_out = self.freqs.shape[0], self.times.shape[0]
+        # Frequency rows: a contiguous run of input rows maps onto output rows
+        r0 = max(0, self.first_freq_idx - f_offset)
+        r1 = min(n_rows, self.first_freq_idx + n_freq_out - f_offset)
+        tsIndicies = np.digitize(ts, self.t_edges) - 1
+        order = np.flatnonzero((tsIndicies >= 0) & (tsIndicies < n_time_out))
+        if r1 <= r0 or not order.size:
+            return None
+        out_cols = tsIndicies[order]
+        if np.any(out_cols[1:] < out_cols[:-1]):
+            sort = np.argsort(out_cols, kind='stable')
+            order, out_cols = order[sort], out_cols[sort]
+        starts = np.flatnonzero(np.r_[True, out_cols[1:] != out_cols[:-1]])
+        counts = np.diff(np.r_[starts, order.size])
+        if order[-1] - order[0] + 1 == order.size:
+            order = slice(int(order[0]), int(order[-1]) + 1)
+        o0 = r0 + f_offset - self.first_freq_idx
+        return _ScatterPlan(slice(r0, r1), order, slice(o0, o0 + r1 - r0),
+                            out_cols[starts], starts, counts)
+
+    @staticmethod
+    def _cols_index(cols):
+        """A slice when cols is one contiguous run (cheaper indexing), else cols."""
+        if cols[-1] - cols[0] + 1 == cols.size:
+            return slice(int(cols[0]), int(cols[-1]) + 1)
+        return cols
+
+    def _scatter(self, state, c, n_cols, rows, cols, starts, counts, block):
+        """Accumulate block into channel c of a state with n_cols columns.
+
+        rows: output row slice; cols: distinct output columns (ascending);
+        block: the input columns, grouped so that run j (starting at
+        starts[j], counts[j] long) all lands in column cols[j].
+        """
+        if self.mode == 'pct':
+            col_of = np.repeat(cols, counts)
+            lin_idx = ((np.arange(rows.start, rows.stop)[:, np.newaxis]) * n_cols
+                       + col_of[np.newaxis, :]).ravel()
+            vals = block.ravel()
+            for idx, v in zip(lin_idx, vals):
+                state[c][idx].append(v)
+            if self.pending is not None and state is self.accumulators:
+                self.pending.append((c, lin_idx, vals))
+            return
+        at = (rows, self._cols_index(cols))
+        if self.mode == 'max':
+            state[c][at] = np.maximum(state[c][at], np.maximum.reduceat(block, starts, axis=1))
+        else:
+            spectrogram_sum, spectrogram_count = state
+            # sum in the accumulator's precision (float64 by default, as
+            # np.bincount(weights=...) did, even for a float32 spectrogram)
+            spectrogram_sum[c][at] += np.add.reduceat(block.astype(self.dtype, copy=False), starts, axis=1)
+            spectrogram_count[c][at] += counts.astype(spectrogram_count[c].dtype)
+
+    @instrument.timed('scatter')
+    def add(self, c, ts, tempSpec, f_offset=0, plan=None):
+        """Scatter spectrogram columns (absolute times ts) into channel c.
+
+        Row r of tempSpec is FFT bin f_offset + r, so callers may pass a
+        frequency-sliced spectrogram.  plan: this file's _ScatterPlan from
+        plan(), built here if not given.
+        """
+        if plan is None:
+            plan = self.plan(ts, tempSpec.shape[0], f_offset)
+            if plan is None:
+                return
+        lo, hi = int(plan.cols[0]), int(plan.cols[-1]) + 1
+        self.dirty = (lo, hi) if self.dirty is None else (min(self.dirty[0], lo), max(self.dirty[1], hi))
+        block = tempSpec[plan.in_rows, plan.in_cols]
+        self._scatter(self.accumulators, c, self.times.shape[0], plan.out_rows,
+                      plan.cols, plan.starts, plan.counts, block)
+
+    def _finish_block(self, state, n_cols, c, out):
+        """Write channel c's aggregated values for a state into out (n_freq, n_cols)."""
+        if self.mode == 'max':
+            data = state[c]
+            out[...] = data
+            out[~np.isfinite(data)] = np.nan
+        elif self.mode == 'pct':
+            flat = out.reshape(-1) if out.flags.c_contiguous else None
+            data = flat if flat is not None else np.empty(out.size)
+            data[:] = np.nan
+            for idx, vals in state[c].items():
+                data[idx] = np.percentile(vals, self.pct_level)
+            if flat is None:
+                out[...] = data.reshape(out.shape)
+        else:
+            cnt = state[1][c]
+            out[...] = np.nan
+            np.divide(state[0][c], cnt, out=out, where=cnt > 0)
+
+    def _header(self, out):
+        out[0, 0] = f"{99}{self.sampFreq}99{int(1000*self.defaultWindows)}{99}"
+        out[0, 1:] = self.times
+        out[1:, 0] = self.freqs
+
+    @instrument.timed('finish')
+    def finish(self):
+        """Build the final output arrays (with header row/column for freqs and times).
+
+        Each channel's accumulators are released once its output is built, so
+        at most one extra channel-sized array is alive at a time.
+        """
+        n_freq_out = self.freqs.shape[0]
+        n_time_out = self.times.shape[0]
+        spectrogram_average_out = []
+        for c in range(6):
+            out = np.empty((n_freq_out + 1, n_time_out + 1))
+            self._header(out)
+            self._finish_block(self.accumulators, n_time_out, c, out[1:, 1:])
+            spectrogram_average_out.append(out)
+            if self.mode == 'avg':
+                self.accumulators[0][c] = self.accumulators[1][c] = None
+            else:
+                self.accumulators[c] = None
+        return spectrogram_average_out
+
+
+class _TiledAccumulator(_WindowAccumulator):
+    """_WindowAccumulator that only holds the time tiles files have touched.
+
+    The output grid is split into tiles of tile_cols columns, allocated on
+    first use.  finalise_before(t) yields (first column, (6, n_freq, width)
+    block) for every tile whose columns can no longer receive data once all
+    remaining files start at or after t, and frees them; finalise_all()
+    does the same for whatever is left.  Tiles come out in column order,
+    untouched tiles as NaN.  Adding to a finalised tile raises RuntimeError.
+    """
+
+    def __init__(self, *args, tile_cols=4096, **kwargs):
+        self.tile_cols = int(tile_cols)
+        super().__init__(*args, **kwargs)
+        self.tiles = {}
+        self.next_tile = 0
+        self.n_tiles = -(-self.times.shape[0] // self.tile_cols)
+
+    def _new_state(self, n_cols):
+        return None   # tiles are allocated on demand
+
+    def _tile_width(self, k):
+        return min(self.tile_cols, self.times.shape[0] - k * self.tile_cols)
+
+    @instrument.timed('scatter')
+    def add(self, c, ts, tempSpec, f_offset=0, plan=None):
+        if plan is None:
+            plan = self.plan(ts, tempSpec.shape[0], f_offset)
+            if plan is None:
+                return
+        block = tempSpec[plan.in_rows, plan.in_cols]
+        tile_of = plan.cols // self.tile_cols
+        # runs are in column order, so each tile is one range of runs
+        bounds = np.flatnonzero(np.r_[True, tile_of[1:] != tile_of[:-1], True])
+        for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            k = int(tile_of[a])
+            if k < self.next_tile:
+                raise RuntimeError(f"output tile {k} was already written "
+                                   f"(files must be processed in start-time order)")
+            if k not in self.tiles:
+                self.tiles[k] = super()._new_state(self._tile_width(k))
+            c0 = plan.starts[a]
+            c1 = plan.starts[b] if b < plan.starts.size else block.shape[1]
+            self._scatter(self.tiles[k], c, self._tile_width(k), plan.out_rows,
+                          plan.cols[a:b] - k * self.tile_cols, plan.starts[a:b] - c0,
+                          plan.counts[a:b], block[:, c0:c1])
+
+    def _finalise(self, upto):
+        while self.next_tile < upto:
+            k = self.next_tile
+            width = self._tile_width(k)
+            block = np.full((6, self.freqs.shape[0], width), np.nan)
+            state = self.tiles.pop(k, None)
+            if state is not None:
+                for c in range(6):
+                    self._finish_block(state, width, c, block[c])
+            self.next_tile += 1
+            yield k * self.tile_cols, block
+
+    def finalise_before(self, t_epoch):
+        """Finalise tiles whose last output bin ends at or before t_epoch."""
+        # right edge of tile k is t_edges[min((k+1)*tile_cols, n_time)]
+        n_time = self.times.shape[0]
+        ends = self.t_edges[np.minimum((np.arange(self.next_tile, self.n_tiles) + 1) * self.tile_cols, n_time)]
+        upto = self.next_tile + int(np.searchsorted(ends, t_epoch, side='right'))
+        return self._finalise(upto)
+
+    def finalise_all(self):
+        return self._finalise(self.n_tiles)
+
+    def finish(self):
+        raise RuntimeError("_TiledAccumulator streams its output; use finalise_before/finalise_all")
+
+
+class _PackedSpecWriter:
+    """Six packed-layout spectrograms on disk (Spectrogram_<c>.npy), filled
+    column block by column block from a _TiledAccumulator.
+
+    The files are memory-mapped .npy arrays with the same layout and header
+    as _WindowAccumulator.finish() output; close() returns them re-opened
+    read-only, so callers can use them like the in-memory result.
+    """
+
+    def __init__(self, out_dir, acc):
+        os.makedirs(out_dir, exist_ok=True)
+        self.paths = [os.path.join(out_dir, f'Spectrogram_{c+1}.npy') for c in range(6)]
+        shape = (acc.freqs.shape[0] + 1, acc.times.shape[0] + 1)
+        self.arrays = []
+        for path in self.paths:
+            mm = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=shape)
+            acc._header(mm)
+            self.arrays.append(mm)
+
+    @instrument.timed('write')
+    def write(self, col0, block):
+        for c, mm in enumerate(self.arrays):
+            mm[1:, 1 + col0:1 + col0 + block.shape[2]] = block[c]
+
+    def close(self):
+        for mm in self.arrays:
+            mm.flush()
+        self.arrays = []
+        return [np.load(path, mmap_mode='r') for path in self.paths]
+
+
+def _file_time_range(folder, file, sampFreq, dbx):
+    """(start, estimated end) of a .bin file in local epoch seconds."""
+    fstart = _as_epoch(utils.extract_start_datetime(file))
+    if dbx is not None:
+        # Dropbox mode: get file size from the API metadata already fetched
+        # (we don't have it here, so use a rough fixed estimate; overlap check
+        # is conservative — worst case we download a file and skip it quickly)
+        fend = fstart + 3600   # 1-hour upper bound
+    else:
+        filepath = os.path.join(folder, file)
+        fend = fstart + round(os.path.getsize(filepath) / (sampFreq * 6 * 2.1333), 0)
+    return fstart, fend
+
+
+def _file_size(folder, file, dbx, file_sizes=None):
+    """Bytes of a .bin file: from file_sizes (e.g. a Dropbox listing), else the
+    local file; 0 when a Dropbox file's size is unknown."""
+    if file_sizes and file in file_sizes:
+        return file_sizes[file]
+    if dbx is None:
+        return os.path.getsize(os.path.join(folder, file))
+    return 0
+
+
+def work_bytes(folder, bin_files, windows, sampFreq, dbx=None, file_sizes=None, once=False):
+    """(bytes, files) that processing windows [(start, end), ...] will read.
+
+    A file is counted for every window it overlaps, as process_bin_files
+    reads it once per call; once=True counts it once (process_bin_windows).
+    Used to size a utils.progress.Progress before a run.
+    """
+    n_bytes = n_files = 0
+    seen = set()
+    for start, end in windows:
+        t0, t1 = _as_epoch(start), _as_epoch(end)
+        for file in bin_files:
+            if once and file in seen:
+                continue
+            fstart, fend = _file_time_range(folder, file, sampFreq, dbx)
+            if check_overlap(t0, t1, fstart, fend):
+                seen.add(file)
+                n_bytes += _file_size(folder, file, dbx, file_sizes)
+                n_files += 1
+    return n_bytes, n_files
+
+
+def _open_bin(folder, file, dbx, dbx_folder, n, N):
+    """Local path or downloaded BytesIO for a .bin file; None if the download failed."""
+    if dbx is None:
+        filepath = os.path.join(folder, file)
+        _fsz = os.path.getsize(filepath)
+        log.detail(f"{_now()} | File {n} of {N} | {file} | {_fsz} bytes | Calculating spectrograms, etc.")
+        return filepath
+    dbx_path = f"{dbx_folder.rstrip('/')}/{file}"
+    log.detail(f"{_now()} | File {n} of {N} | {file} | Downloading from Dropbox…")
+    for _attempt in range(_DBX_MAX_RETRIES):
+        try:
+            with instrument.span('download', file=file) as _s:
+                file_obj = dropbox_helper.download_to_bytes(dbx, dbx_path)
+                _sz = file_obj.seek(0, 2); file_obj.seek(0)
+                _s['bytes'] = _sz
+            instrument.count('bytes_downloaded', _sz)
+            log.detail(f"{_now()} | Downloaded {_sz} bytes from {dbx_path}")
+            return file_obj
+        except Exception as _dl_err:
+            if _attempt < _DBX_MAX_RETRIES - 1:
+                _wait = _DBX_RETRY_DELAYS[_attempt]
+                print(f"  WARNING: download failed ({_dl_err}). "
+                      f"Retrying in {_wait}s… (attempt {_attempt + 1}/{_DBX_MAX_RETRIES})")
+                time.sleep(_wait)
+            else:
+                print(f"  ERROR: download failed after {_DBX_MAX_RETRIES} attempts — skipping {file}")
+    return None
+
+
+def _read_bin(file_obj, file):
+    """Raw (n_samples, 6) int16 data, or None for an empty file."""
+    with instrument.span('read', file=file) as _s:
+        x = bc.beespy_arduino_reader(file_obj)  # accepts both path str and BytesIO
+        _s['bytes'] = x.nbytes
+    instrument.count('files_read')
+    instrument.count('bytes_read', x.nbytes)
+    log.detail(f"  Data shape: {x.shape}")
+    if x.shape[0] == 0:
+        print(f"  WARNING: no data in {file} (file may be an online-only Dropbox placeholder) — skipping")
+        return None
+    return x
+
+
+def _channel_spectra(x, fileStart, sampFreq, defaultWindows):
+    """Denoise and FFT each channel of one file.
+
+    Yields (channel, absolute column times, log-power spectrogram) one
+    channel at a time so only one channel's spectrogram is alive at once.
+    The denoiser works in the working precision (utils.precision).
+    """
+    dtype = precision.get_dtype()
+    # scipy already FFTs int16 input in single precision; only cast for float32
+    fft_dtype = None if dtype is np.float64 else dtype
+    for c in range(x.shape[1]): #for each channel
+        # Denoise
+        with instrument.span('denoise', channel=c):
+            denoised = denoise.umw_denoise(x[:, c], 5, 5, dtype=dtype) # denoise the signal
+        # Get the spectrogram
+        with instrument.span('fft', channel=c):
+            fq, ts, tempSpec = spect.dospectrogram(denoised, sampFreq, window_duration=defaultWindows,
+                                                   window_overlap=0, dtype=fft_dtype)
+        yield c, fileStart + ts, tempSpec
+
+
+# Do the hard work here
+@instrument.timed('process_bin_files')
+def process_bin_files(folder, bin_files, start_time, end_time, sampFreq, defaultWindows, calcWindows, minFreq, maxFreq,
+                      dbx=None, dbx_folder=None, agg="Average",
+                      checkpoint_dir=None, checkpoint_key=None,
+                      resume_files=None, checkpoint_every=10,
+                      local_bin_folder=None, checkpoint_format='incremental',
+                      out_dir=None, tile_cols=4096, file_sizes=None, progress=None):
+    """Process .bin files into spectrograms, aggregated per output time bin.
+
+    agg: "Average", "Maximum", "75th percentile", "90th percentile", "95th percentile"
+    Pass dbx + dbx_folder to read files from Dropbox on-demand (one at a time,
+    no bulk download).  Leave both as None to read from the local filesystem.
+
+    checkpoint_dir / checkpoint_key: when set, the function saves progress to disk
+    every checkpoint_every files so it can be resumed after a crash or lost connection.
+    resume_files: set of filenames already processed on a previous run (skip them).
+    checkpoint_format: 'incremental' (_IncrementalCheckpoint: only what changed
+    is written) or 'full' (_write_checkpoint: every accumulator, every time).
+    Resuming keeps whichever format the existing checkpoint uses.
+
+    out_dir: stream the result to out_dir/Spectrogram_<c>.npy instead of
+    building it in memory.  Only the tile_cols-wide time tiles that files in
+    flight touch are held (_TiledAccumulator); when bin_files are in
+    start-time order, tiles are finalised and written as soon as no later
+    file can reach them.  Returns the six files as read-only memmaps, in
+    the same packed layout as the in-memory result, so every consumer (the
+    activity pipeline, the CSV writers) takes them unchanged; daily_pipeline
+    jobs with stream_to_disk use this and save the usual CSVs.  Not
+    combinable with checkpointing.
+
+    local_bin_folder: when set (local mode), _safe_to_delete() will refuse to delete
+    any .bin file inside this folder, protecting the user's raw data.
+
+    progress: a utils.progress.Progress advanced as each channel of each file
+    is processed (sized from the overlapping files here unless it already
+    has a total); file_sizes: {filename: bytes} from a Dropbox listing, so
+    progress can be byte-based there too.
+    """
+    _print_source_safety(dbx, local_bin_folder)
+    if progress is None:
+        progress = Progress()
+    writer = None
+    stream_early = False
+    if out_dir is not None:
+        if checkpoint_dir:
+            raise ValueError("out_dir streaming cannot be combined with checkpoint_dir")
+        acc = _TiledAccumulator(start_time, end_time, sampFreq, defaultWindows, calcWindows,
+                                minFreq, maxFreq, agg, tile_cols=tile_cols)
+        writer = _PackedSpecWriter(out_dir, acc)
+        # Tiles can be written early only if no file starts before an earlier one
+        starts = [_as_epoch(utils.extract_start_datetime(f)) for f in bin_files]
+        stream_early = all(a <= b for a, b in zip(starts, starts[1:]))
+    else:
+        acc = _WindowAccumulator(start_time, end_time, sampFreq, defaultWindows, calcWindows,
+                                 minFreq, maxFreq, agg)
+
+    # ── Checkpoint resume: load accumulators from previous run if applicable ──
+    _files_already_done = set(resume_files) if resume_files else set()
+    _chk = None
+    if checkpoint_dir and resume_files:
+        _meta = _read_checkpoint_meta(checkpoint_dir)
+        if _meta is not None and _meta.get('format') == 'incremental':
+            checkpoint_format = 'incremental'
+        else:
+            checkpoint_format = 'full'
+            _chk_accum, _chk_done = _load_checkpoint(checkpoint_dir, acc.mode,
+                                                       acc.freqs.shape[0], acc.times.shape[0])
+            if _chk_accum is not None:
+                _files_already_done = _chk_done
+                acc.accumulators = _chk_accum
+                print(f"  [checkpoint] Resumed — {len(_files_already_done)} file(s) already processed")
+    if checkpoint_dir and checkpoint_key and checkpoint_format == 'incremental':
+        _chk = _IncrementalCheckpoint(checkpoint_dir, checkpoint_key, acc, resume=bool(resume_files))
+        _files_already_done = set(_chk.processed)
+    _since_checkpoint = set()
+
+    ## now slot in the data
+    files_failed = []                  # files skipped due to download/processing errors
+
+    ## get the start time and estimated end time of each bin file, and the
+    ## bytes of the ones in the requested range (for progress)
+    ranges = {file: _file_time_range(folder, file, sampFreq, dbx) for file in bin_files}
+    sizes = {file: _file_size(folder, file, dbx, file_sizes) for file, (fstart, fend) in ranges.items()
+             if check_overlap(acc.start_epoch, acc.end_epoch, fstart, fend)}
+    if not progress.sized:
+        progress.expect(sum(sizes.values()), len(sizes))
+    for file in _files_already_done.intersection(sizes):
+        progress.done(sizes[file], skipped=True)
+
+    N = len(bin_files)
+    print(f"MODE: {'Dropbox' if dbx is not None else 'local'} | {N} file(s) | "
+          f"range {_fmt_epoch(acc.start_epoch)} → {_fmt_epoch(acc.end_epoch)}")
+    n = 0
+    for file in bin_files:
+        n = n+1
+        # Skip files already processed in a previous run
+        if file in _files_already_done:
+            continue
+        fstart, fend = ranges[file]
+
+        ##if the time is in the requested range then make the spectrogram from the data
+        if file in sizes:
+            if stream_early:
+                for col0, block in acc.finalise_before(fstart):
+                    writer.write(col0, block)
+            file_obj = _open_bin(folder, file, dbx, dbx_folder, n, N)
+            if file_obj is None:
+                files_failed.append(file)
+                progress.done(sizes[file])
+                continue
+
+            # ── Process the file (guard against corrupt/partial data) ──────────
+            columns = 0
+            try:
+                x = _read_bin(file_obj, file)
+                if x is None:
+                    progress.done(sizes[file])
+                    continue
+                plan = False   # shared by all channels; None = nothing lands in range
+                for c, ts, tempSpec in _channel_spectra(x, fstart, sampFreq, defaultWindows):
+                    if plan is False:
+                        plan = acc.plan(ts, tempSpec.shape[0])
+                        columns = int(plan.counts.sum()) if plan is not None else 0
+                    if plan is not None:
+                        acc.add(c, ts, tempSpec, plan=plan)
+                    progress.advance(sizes[file] / x.shape[1])
+            except Exception as _proc_err:
+                print(f"  ERROR: failed to process {file} ({_proc_err}) — skipping, accumulated data preserved")
+                files_failed.append(file)
+            progress.done(sizes[file], columns=columns)
+            # Track and checkpoint only for overlapping files (non-overlapping files
+            # are trivially cheap to re-check on resume, so no need to record them)
+            _files_already_done.add(file)
+            _since_checkpoint.add(file)
+            if checkpoint_dir and checkpoint_key and len(_files_already_done) % checkpoint_every == 0:
+                if _chk is not None:
+                    _chk.commit(_since_checkpoint)
+                else:
+                    _write_checkpoint(checkpoint_dir, checkpoint_key, _files_already_done, acc.accumulators, acc.mode)
+                _since_checkpoint = set()
+            print(f"{_now()} | Done.")
+
+    _report_failed(files_failed)
+
+    # ── Delete checkpoint on successful completion ─────────────────────────────
+    if checkpoint_dir and os.path.isdir(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        print("  [checkpoint] Deleted after successful completion")
+
+    if writer is not None:
+        for col0, block in acc.finalise_all():
+            writer.write(col0, block)
+        return writer.close()
+    return acc.finish()
+
+
+def process_bin_windows(folder, bin_files, windows, sampFreq, defaultWindows, calcWindows,
+                        minFreq, maxFreq, dbx=None, dbx_folder=None, agg="Average",
+                        local_bin_folder=None, file_sizes=None, progress=None):
+    """Rolling multi-window version of process_bin_files for sequential backfills.
+
+    windows: iterable of (start, end) in time order (any _as_epoch type);
+    each window must start at or after the previous one's end (gaps are
+    fine), otherwise ValueError.  Yields one process_bin_files-style result
+    per window, reading, denoising and FFT-ing every .bin file at most
+    once.  Columns of a file that may still belong to a later window (at or
+    after the current end minus half an output bin) are kept in a small
+    carry-over buffer, sliced to the output frequency rows; everything else
+    is dropped as soon as the window is finished.
+
+    With local files the output is identical to calling process_bin_files
+    per window.  In Dropbox mode a file's end is estimated as start + 3600 s
+    (_file_time_range), so near a window boundary the two can differ: a
+    file read for one window contributes its carried-over columns to the
+    next even where the estimate would have skipped it there.
+    progress / file_sizes: as for process_bin_files, with every file
+    counted once across all windows.
+    """
+    _print_source_safety(dbx, local_bin_folder)
+    windows = list(windows)
+    bounds = [(_as_epoch(s), _as_epoch(e)) for s, e in windows]
+    for (_, prev_end), (start, _) in zip(bounds, bounds[1:]):
+        if start < prev_end:
+            raise ValueError("process_bin_windows needs windows in time order that do not overlap; "
+                             "use process_bin_files for each window instead")
+    if progress is None:
+        progress = Progress()
+    if not progress.sized:
+        progress.expect(*work_bytes(folder, bin_files, windows, sampFreq, dbx, file_sizes, once=True))
+    N = len(bin_files)
+    ranges = {}       # file -> (fstart, fend), cached across windows
+    consumed = set()  # files already read (or failed) — never read again
+    carry = {}        # file -> [(channel, ts, spec rows, f_offset)] for later windows
+    for start, end in windows:
+        acc = _WindowAccumulator(start, end, sampFreq, defaultWindows, calcWindows,
+                                 minFreq, maxFreq, agg)
+        f_lo = acc.first_freq_idx
+        f_hi = f_lo + acc.freqs.shape[0]
+        keep_from = acc.end_epoch - calcWindows / 2
+        files_failed = []
+        print(f"MODE: {'Dropbox' if dbx is not None else 'local'} | {N} file(s) | "
+              f"range {_fmt_epoch(acc.start_epoch)} → {_fmt_epoch(acc.end_epoch)} (rolling)")
+
+        n = 0
+        for file in bin_files:   # file order kept so sums round exactly as in process_bin_files
+            n = n+1
+            if file in carry:
+                # Columns carried over from an earlier window
+                kept = []
+                plan = False
+                for c, ts, rows, f_off in carry.pop(file):
+                    if plan is False:
+                        plan = acc.plan(ts, rows.shape[0], f_off)
+                    if plan is not None:
+                        acc.add(c, ts, rows, plan=plan)
+                    sel = ts >= keep_from
+                    if sel.any():
+                        kept.append((c, ts[sel], rows[:, sel], f_off))
+                if kept:
+                    carry[file] = kept
+                continue
+            if file in consumed:
+                continue
+            if file not in ranges:
+                ranges[file] = _file_time_range(folder, file, sampFreq, dbx)
+            fstart, fend = ranges[file]
+            if not check_overlap(acc.start_epoch, acc.end_epoch, fstart, fend):
+                continue
+            consumed.add(file)
+            size = _file_size(folder, file, dbx, file_sizes)
+            file_obj = _open_bin(folder, file, dbx, dbx_folder, n, N)
+            if file_obj is None:
+                files_failed.append(file)
+                progress.done(size)
+                continue
+            columns = 0
+            try:
+                x = _read_bin(file_obj, file)
+                if x is None:
+                    progress.done(size)
+                    continue
+                kept = []
+                plan = False
+                for c, ts, tempSpec in _channel_spectra(x, fstart, sampFreq, defaultWindows):
+                    if plan is False:
+                        plan = acc.plan(ts, tempSpec.shape[0])
+                        columns = int(plan.counts.sum()) if plan is not None else 0
+                    if plan is not None:
+                        acc.add(c, ts, tempSpec, plan=plan)
+                    sel = ts >= keep_from
+                    if sel.any():
+                        kept.append((c, ts[sel], tempSpec[f_lo:f_hi, sel], f_lo))
+                    progress.advance(size / x.shape[1])
+                if kept:
+                    carry[file] = kept
+            except Exception as _proc_err:
+                print(f"  ERROR: failed to process {file} ({_proc_err}) — skipping, accumulated data preserved")
+                files_failed.append(file)
+            progress.done(size, columns=columns)
+            print(f"{_now()} | Done.")
+
+        _report_failed(files_failed)
+        yield acc.finish()
+
+
+def precision_report(folder, bin_files, start_time, end_time, sampFreq, defaultWindows, calcWindows,
+                     minFreq, maxFreq, dbx=None, dbx_folder=None, agg="Average"):
+    """Run process_bin_files in float64 and in float32 and compare the outputs.
+
+    Meant for a short, representative range (a few files): both runs are
+    held in memory.  Prints one line per channel and returns
+    (rows, seconds) where rows are precision.compare() dicts (with a
+    'channel' key) and seconds maps each precision to its run time.
+    """
+    results, seconds = {}, {}
+    for name in ('float64', 'float32'):
+        with precision.using(name):
+            t0 = time.perf_counter()
+            results[name] = process_bin_files(folder, bin_files, start_time, end_time, sampFreq,
+                                              defaultWindows, calcWindows, minFreq, maxFreq,
+                                              dbx=dbx, dbx_folder=dbx_folder, agg=agg)
+            seconds[name] = time.perf_counter() - t0
+    rows = []
+    print(f"\nfloat32 vs float64 ({agg}): {seconds['float64']:.1f} s → {seconds['float32']:.1f} s")
+    print(f"  {'ch':>2} {'cells':>10} {'max abs':>10} {'rms':>10} {'max rel':>10} {'peak agree':>10} {'NaN diff':>8}")
+    for c, (ref, test) in enumerate(zip(results['float64'], results['float32'])):
+        r = precision.compare(ref, test)
+        r['channel'] = c + 1
+        rows.append(r)
+        print(f"  {c + 1:>2} {r['cells']:>10} {r['max_abs']:>10.2e} {r['rms']:>10.2e} "
+              f"{r['max_rel']:>10.2e} {r['peak_agree']:>10.4f} {r['nan_mismatch']:>8}")
+    return rows, seconds
+
+
+def _print_source_safety(dbx, local_bin_folder):
+    # Safety check: confirm we will not accidentally delete files from the local source
+    if local_bin_folder is not None:
+        print(f"  [SAFETY] Local bin folder protected from deletion: {local_bin_folder}")
+    elif dbx is None:
+        # Local mode but no protection path set — warn so this is auditable
+        print("  [WARNING] Local mode but local_bin_folder not set — bin files unprotected")
+
+
+def _report_failed(files_failed):
+    instrument.count('files_failed', len(files_failed))
+    if files_failed:
+        print(f"\nWARNING: {len(files_failed)} file(s) could not be processed and were skipped:")
+        for _f in files_failed:
+            print(f"  - {_f}")
+        print("Results shown are based on the remaining files only.\n")
+
+
+def check_overlap(start, end, fstart, fend):
+    """True if [start, end] and [fstart, fend] overlap (any time type _as_epoch accepts)."""
+    return _as_epoch(start) <= _as_epoch(fend) and _as_epoch(fstart) <= _as_epoch(end)
+
+
+# ── Chunked spectrogram helpers ───────────────────────────────────────────────
+
+_CHUNK_FILENAME_RE = re.compile(
+    r'^(\d{8}_\d{6})_(\d{8}_\d{6})_ch(\d+)\.csv$'
+)
+
+
+def _chunk_csv_path(folder, chunk_start_dt, chunk_end_dt, channel):
+    """Return the path for a single channel's chunked CSV.
+
+    e.g. /out/20260101_000000_20260101_235959_ch1.csv
+    """
+    s = chunk_start_dt.strftime('%Y%m%d_%H%M%S')
+    e = chunk_end_dt.strftime('%Y%m%d_%H%M%S')
+    return os.path.join(folder, f'{s}_{e}_ch{channel}.csv')
+
+
+def _chunk_is_complete(folder, chunk_start_dt, chunk_end_dt):
+    """Return True if all 6 channel CSV files exist for this chunk."""
+    return all(
+        os.path.isfile(_chunk_csv_path(folder, chunk_start_dt, chunk_end_dt, c))
+        for c in range(1, 7)
+    )
+
+
+@instrument.timed('write')
+def write_chunked_spectrograms(folder, spectrograms, chunk_start_dt, chunk_end_dt):
+    """Atomically write 6 channel CSVs for a single time chunk."""
+    for c, spec in enumerate(spectrograms, start=1):
+        path = _chunk_csv_path(folder, chunk_start_dt, chunk_end_dt, c)
+        tmp = path + '.tmp'
+        np.savetxt(tmp, spec, delimiter=',')
+        os.replace(tmp, path)
+
+
+_CHUNKED_META_FILE = '_beespy_chunked_meta.json'
+
+
+def process_all_chunks(folder, bin_files, start_time, end_time,
+                       chunk_hours, sampFreq, defaultWindows, calcWindows,
+                       minFreq, maxFreq, dbx, dbx_folder, agg,
+                       local_bin_folder=None, file_sizes=None, progress=None):
+    """Process a date range in fixed-size chunks, saving date-stamped CSVs.
+
+    Each completed chunk is written as 6 CSV files named:
+        YYYYMMDD_HHMMSS_YYYYMMDD_HHMMSS_ch1.csv … ch6.csv
+
+    If all 6 CSVs already exist for a chunk, that chunk is skipped (acts as
+    the chunk-level checkpoint).  Within each chunk, the existing per-file
+    checkpoint system is used.
+
+    start_time / end_time: local epoch seconds or anything _as_epoch accepts.
+    progress / file_sizes: as for process_bin_files; the progress is sized
+    up front from every chunk still to do.
+    Returns a list of (chunk_start_dt, chunk_end_dt) covering the full range.
+    """
+    start_epoch = _as_epoch(start_time)
+    end_epoch   = _as_epoch(end_time)
+    start_dt = _epoch_to_dt(start_epoch)
+    end_dt   = _epoch_to_dt(end_epoch)
+
+    delta = datetime.timedelta(hours=chunk_hours)
+    chunk_list = []
+    current = start_dt
+    while current < end_dt:
+        chunk_end = min(current + delta, end_dt)
+        chunk_list.append((current, chunk_end))
+        current = chunk_end
+
+    n_chunks = len(chunk_list)
+    print(f"Chunked mode: {n_chunks} chunk(s) of {chunk_hours}h each")
+    if progress is None:
+        progress = Progress()
+    if not progress.sized:
+        todo = [c for c in chunk_list if not _chunk_is_complete(folder, *c)]
+        progress.expect(*work_bytes(folder, bin_files, todo, sampFreq, dbx, file_sizes))
+
+    # Write a meta file so _continue_session can detect an in-progress chunked run
+    chunked_meta_path = os.path.join(folder, _CHUNKED_META_FILE)
+    chunked_meta = {
+        'chunk_hours':    chunk_hours,
+        'start_epoch':    start_epoch,
+        'end_epoch':      end_epoch,
+        'sampFreq':       sampFreq,
+        'defaultWindows': defaultWindows,
+        'calcWindows':    calcWindows,
+        'minFreq':        minFreq,
+        'maxFreq':        maxFreq,
+        'agg':            agg,
+        'source':         str(dbx_folder or folder),
+    }
+    with open(chunked_meta_path, 'w') as _f:
+        json.dump(chunked_meta, _f, indent=2)
+
+    for i, (chunk_start, chunk_end) in enumerate(chunk_list, start=1):
+        if _chunk_is_complete(folder, chunk_start, chunk_end):
+            print(f"  Chunk {i}/{n_chunks} [{chunk_start} → {chunk_end}]: already complete — skipping")
+            continue
+
+        print(f"  Chunk {i}/{n_chunks} [{chunk_start} → {chunk_end}]: processing…")
+
+        chk_dir = os.path.join(
+            folder,
+            _CHK_SUBDIR,
+            f'chunk_{chunk_start.strftime("%Y%m%d_%H%M%S")}')
+        chk_key = _checkpoint_settings_key(
+            chunk_start, chunk_end,
+            sampFreq, defaultWindows, calcWindows, minFreq, maxFreq, agg,
+            dbx_folder or folder)
+
+        # Check for a within-chunk checkpoint to resume
+        resume_files = None
+        if os.path.isfile(os.path.join(chk_dir, 'meta.json')):
+            try:
+                _meta = _read_checkpoint_meta(chk_dir)
+                if _checkpoint_meta_matches(_meta, chk_key):
+                    resume_files = set(_meta.get('processed_files', []))
+                    print(f"    [checkpoint] Resuming chunk ({len(resume_files)} file(s) already done)")
+                else:
+                    shutil.rmtree(chk_dir, ignore_errors=True)
+            except Exception:
+                shutil.rmtree(chk_dir, ignore_errors=True)
+
+        specs = process_bin_files(
+            folder, bin_files,
+            chunk_start, chunk_end,
+            sampFreq, defaultWindows, calcWindows, minFreq, maxFreq,
+            dbx=dbx, dbx_folder=dbx_folder, agg=agg,
+            checkpoint_dir=chk_dir, checkpoint_key=chk_key,
+            resume_files=resume_files,
+            local_bin_folder=local_bin_folder,
+            file_sizes=file_sizes, progress=progress)
+
+        write_chunked_spectrograms(folder, specs, chunk_start, chunk_end)
+        print(f"  Chunk {i}/{n_chunks}: written.")
+
+    # All chunks complete — remove the meta file
+    if os.path.isfile(chunked_meta_path):
+        os.remove(chunked_meta_path)
+        print("  [chunked checkpoint] All chunks complete — meta file removed")
+
+    return chunk_list
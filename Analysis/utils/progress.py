@@ -0,0 +1,165 @@
+"""Byte-based progress, throughput and ETA for the .bin processing.
+
+Files vary a lot in size, so "file n of N" says little about how far a run
+is.  A Progress counts the .bin bytes processed against the total bytes of
+the files that overlap the requested range, which are known before any
+file is opened (os.path.getsize, or the sizes in a Dropbox folder listing):
+
+    prog = Progress(callback=lambda p: print(p.format()), interval=5)
+    prog.expect(total_bytes, n_files)
+    prog.advance(nbytes)                    # part of the current file (per channel)
+    prog.done(file_bytes, columns=n)        # file finished; tops up its bytes
+
+processing.work_bytes() sizes a run up front.  process_bin_files() sizes a
+Progress that has no total yet from its own files, so one call needs no
+setup; callers spanning several calls (chunks, daily windows) size it
+first.  Files skipped on resume are passed as done(..., skipped=True): they
+count towards the fraction but not the throughput.
+
+The ETA divides the bytes left by an exponentially smoothed rate, updated
+every `interval` seconds, so one slow download does not swing it wildly.
+When no byte sizes are known (total_bytes 0) file counts are used instead.
+callback(progress) is called at most once per `interval` seconds, and once
+more when the last expected file is done.
+"""
+import time
+import datetime
+
+
+def _fmt_seconds(s):
+    return str(datetime.timedelta(seconds=int(round(s))))
+
+
+class Progress:
+    def __init__(self, callback=None, interval=1.0, smoothing=0.3, clock=time.monotonic):
+        self.callback = callback
+        self.interval = interval
+        self.smoothing = smoothing
+        self._clock = clock
+        self.total_bytes = 0
+        self.total_files = 0
+        self._bytes_complete = 0         # bytes of finished files
+        self.files_done = 0
+        self.columns = 0
+        self.skipped_bytes = 0.0
+        self.skipped_files = 0
+        self._partial = 0.0              # bytes advanced for the file in hand
+        self._t0 = clock()
+        self._last_report = None
+        self._sample = (self._t0, 0.0)   # (time, processed bytes) of the last rate sample
+        self._rate = None                # smoothed bytes (or files) per second
+
+    @property
+    def bytes_done(self):
+        return self._bytes_complete + self._partial
+
+    @property
+    def sized(self):
+        return self.total_files > 0
+
+    def expect(self, nbytes, files=1):
+        """Add nbytes in `files` files to the total."""
+        self.total_bytes += int(nbytes)
+        self.total_files += int(files)
+
+    def advance(self, nbytes=0, columns=0):
+        """Count part of the current file (bytes decoded so far, columns produced)."""
+        self._partial += nbytes
+        self.columns += int(columns)
+        self._maybe_report()
+
+    def done(self, nbytes, files=1, columns=0, skipped=False):
+        """Finish `files` file(s) of nbytes in total; bytes already advance()d are not counted twice."""
+        self._partial = 0.0
+        self._bytes_complete += int(nbytes)
+        self.files_done += int(files)
+        self.columns += int(columns)
+        if skipped:
+            self.skipped_bytes += nbytes
+            self.skipped_files += int(files)
+        self._maybe_report(force=self.files_done >= self.total_files)
+
+    # ── derived figures ──────────────────────────────────────────────────────
+
+    def _by_bytes(self):
+        return self.total_bytes > 0
+
+    def _processed(self):
+        """Work done in this run (bytes, or files without sizes), skipped work excluded."""
+        if self._by_bytes():
+            return self.bytes_done - self.skipped_bytes
+        return self.files_done - self.skipped_files
+
+    def fraction(self):
+        if self._by_bytes():
+            return min(1.0, self.bytes_done / self.total_bytes)
+        return min(1.0, self.files_done / self.total_files) if self.total_files else 0.0
+
+    def elapsed(self):
+        return self._clock() - self._t0
+
+    def mb_per_s(self):
+        t = self.elapsed()
+        return (self.bytes_done - self.skipped_bytes) / 1e6 / t if t > 0 else 0.0
+
+    def files_per_s(self):
+        t = self.elapsed()
+        return (self.files_done - self.skipped_files) / t if t > 0 else 0.0
+
+    def _update_rate(self, now):
+        t_prev, w_prev = self._sample
+        if now - t_prev <= 0:
+            return
+        rate = (self._processed() - w_prev) / (now - t_prev)
+        self._rate = rate if self._rate is None else (self.smoothing * rate
+                                                       + (1 - self.smoothing) * self._rate)
+        self._sample = (now, self._processed())
+
+    def eta(self):
+        """Seconds left at the smoothed rate, or None before there is a rate."""
+        if self._by_bytes():
+            left = self.total_bytes - self.bytes_done
+        else:
+            left = self.total_files - self.files_done
+        if left <= 0:
+            return 0.0
+        rate = self._rate
+        if not rate:
+            t = self.elapsed()
+            rate = self._processed() / t if t > 0 else 0.0
+        return left / rate if rate > 0 else None
+
+    def snapshot(self):
+        return {
+            'fraction':    self.fraction(),
+            'bytes_done':  int(self.bytes_done),
+            'total_bytes': self.total_bytes,
+            'files_done':  self.files_done,
+            'total_files': self.total_files,
+            'columns':     self.columns,
+            'elapsed_s':   self.elapsed(),
+            'mb_per_s':    self.mb_per_s(),
+            'files_per_s': self.files_per_s(),
+            'eta_s':       self.eta(),
+        }
+
+    def format(self):
+        """One-line summary, e.g. '42% | 120.3/286.0 MB | 3/7 files | 2.4 MB/s, 0.05 files/s | ETA 0:01:10'."""
+        parts = [f"{100 * self.fraction():.0f}%"]
+        if self._by_bytes():
+            parts.append(f"{self.bytes_done / 1e6:.1f}/{self.total_bytes / 1e6:.1f} MB")
+        parts.append(f"{self.files_done}/{self.total_files} files")
+        parts.append(f"{self.mb_per_s():.1f} MB/s, {self.files_per_s():.2f} files/s")
+        eta = self.eta()
+        parts.append(f"ETA {_fmt_seconds(eta)}" if eta is not None else "ETA --")
+        return ' | '.join(parts)
+
+    def _maybe_report(self, force=False):
+        now = self._clock()
+        if now - self._sample[0] >= self.interval:
+            self._update_rate(now)
+        if self.callback is None:
+            return
+        if force or self._last_report is None or now - self._last_report >= self.interval:
+            self._last_report = now
+            self.callback(self)
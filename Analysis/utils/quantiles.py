@@ -0,0 +1,142 @@
+"""Percentile thresholds for large spectrograms without re-sorting them.
+
+QuantileEngine scans a dataset once and then answers any number of
+percentile queries cheaply:
+
+  exact=True   keeps a sorted copy of the non-NaN values (in the input
+               dtype, so a float32 spectrogram costs 4 bytes per value);
+               queries are O(1) and match np.nanpercentile (linear
+               interpolation) exactly.
+  exact=False  keeps only a fine histogram (2**16 bins by default) built in
+               row blocks, so there is no full-size copy; queries are
+               O(log bins).  The answer is within error_bound of
+               np.nanpercentile, where
+
+                   error_bound = (max - min) / bins
+
+               i.e. one bin width.  Non-finite values are ignored.
+
+nanpercentile() is the one-shot helper used by the pipelines; it picks the
+exact path for small inputs and the histogram otherwise.
+"""
+import numpy as np
+
+DEFAULT_BINS = 1 << 16
+# Below this many values an exact percentile is as cheap as the histogram
+EXACT_MAX = 1 << 21
+_BLOCK = 1 << 20   # values per block when scanning
+
+
+def _row_blocks(values, where=None):
+    """Yield flattened blocks of values (optionally masked), ~_BLOCK values each."""
+    a = np.asarray(values)
+    w = None if where is None else np.broadcast_to(where, a.shape)
+    if a.ndim < 2:
+        a = a.reshape(1, -1)
+        w = None if w is None else w.reshape(1, -1)
+    a = a.reshape(a.shape[0], -1)
+    w = None if w is None else w.reshape(a.shape)
+    step = max(1, _BLOCK // max(1, a.shape[1]))
+    for r0 in range(0, a.shape[0], step):
+        blk = a[r0:r0 + step]
+        yield blk.ravel() if w is None else blk[w[r0:r0 + step]]
+
+
+class QuantileEngine:
+    """Precomputed percentile lookups for one dataset (NaNs ignored).
+
+    values: array of any shape; where: optional boolean mask of the same
+    shape selecting the cells to include.  The data must not change after
+    the engine is built.
+    """
+
+    def __init__(self, values, exact=False, bins=DEFAULT_BINS, where=None):
+        self.exact = bool(exact)
+        self.bins = int(bins)
+        if self.exact:
+            parts = [b[~np.isnan(b)] for b in _row_blocks(values, where)]
+            self._sorted = np.sort(np.concatenate(parts)) if parts else np.empty(0)
+            self.n = self._sorted.size
+            self.min = self._sorted[0] if self.n else np.nan
+            self.max = self._sorted[-1] if self.n else np.nan
+            return
+
+        lo, hi, n = np.inf, -np.inf, 0
+        for b in _row_blocks(values, where):
+            b = b[np.isfinite(b)]
+            if b.size:
+                lo = min(lo, b.min())
+                hi = max(hi, b.max())
+                n += b.size
+        self.n = n
+        self.min = float(lo) if n else np.nan
+        self.max = float(hi) if n else np.nan
+        counts = np.zeros(self.bins, dtype=np.int64)
+        if n and hi > lo:
+            scale = self.bins / (hi - lo)
+            for b in _row_blocks(values, where):
+                idx = (b[np.isfinite(b)] - lo) * scale
+                idx = idx.astype(np.intp)
+                np.minimum(idx, self.bins - 1, out=idx)
+                counts += np.bincount(idx, minlength=self.bins)
+        elif n:
+            counts[0] = n
+        self._counts = counts
+        self._cdf = np.cumsum(counts)
+        self._width = (hi - lo) / self.bins if n else np.nan
+
+    @property
+    def error_bound(self):
+        """Largest possible |percentile() - np.nanpercentile()| for this data."""
+        return 0.0 if self.exact else self._width
+
+    def _value_at_rank(self, j):
+        """Value (or histogram estimate) of the j-th smallest element, j integer array."""
+        if self.exact:
+            return self._sorted[j].astype(np.float64)
+        k = np.searchsorted(self._cdf, j, side='right')
+        below = np.where(k > 0, self._cdf[np.maximum(k - 1, 0)], 0)
+        # spread each bin's elements evenly across it
+        est = self.min + (k + (j - below + 0.5) / self._counts[k]) * self._width
+        est = np.where(j == 0, self.min, est)
+        est = np.where(j == self.n - 1, self.max, est)
+        return np.clip(est, self.min, self.max)
+
+    def percentile(self, q):
+        """q-th percentile(s), q in [0, 100] (scalar or array), like np.nanpercentile."""
+        q = np.asarray(q, dtype=np.float64)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)[()]
+        rank = np.clip(q, 0, 100) / 100.0 * (self.n - 1)
+        j0 = np.floor(rank).astype(np.int64)
+        j1 = np.minimum(j0 + 1, self.n - 1)
+        v0 = self._value_at_rank(j0)
+        v1 = self._value_at_rank(j1)
+        return (v0 + (rank - j0) * (v1 - v0))[()]
+
+    def fraction_below(self, threshold):
+        """Fraction of values < threshold (exact, or to one bin for the histogram)."""
+        if self.n == 0:
+            return np.nan
+        if self.exact:
+            return np.searchsorted(self._sorted, threshold, side='left') / self.n
+        if not self._width:
+            # every value equals min: all of them are below any larger threshold
+            return 1.0 if threshold > self.min else 0.0
+        k = int(np.clip((threshold - self.min) / self._width, 0, self.bins))
+        return (self._cdf[k - 1] if k > 0 else 0) / self.n
+
+
+def nanpercentile(values, q, exact=None, where=None):
+    """np.nanpercentile replacement for large arrays.
+
+    exact=None chooses exact for inputs up to EXACT_MAX values and the
+    histogram engine (error ≤ one bin width, see QuantileEngine) above that.
+    """
+    if exact is None:
+        exact = np.size(values) <= EXACT_MAX
+    if exact:
+        if where is None:
+            return np.nanpercentile(values, q)
+        return np.nanpercentile(np.asarray(values)[where], q, overwrite_input=True)
+    return QuantileEngine(values, exact=exact, where=where).percentile(q)
@@ -0,0 +1,161 @@
+"""Batch periodograms and actograms for many activity series at once.
+
+Each function takes one timestamp vector (epoch seconds) shared by a 2-D
+array of series, values[s, i] (hives x bands, channels x bands, ...), with
+NaN where a series has no data.  Everything that depends only on the time
+axis - the frequency grid, the periodogram's extirpolation table / chirp-z
+setup, and the actogram's day and bin indices - is computed once per call.
+
+circadian_prototyping's compute_lomb_scargle and build_actogram are the
+single-series views of these.  The detrending helpers at the bottom work on
+one series or on the rows of a 2-D array.
+"""
+import numpy as np
+
+from utils.periodogram import lomb_scargle_many
+
+# Period range searched (slightly wider than the 15–30 h that is returned,
+# to avoid edge artefacts)
+PERIOD_SEARCH_HOURS = (10.0, 36.0)
+PERIOD_DISPLAY_HOURS = (15.0, 30.0)
+
+
+def batch_lomb_scargle(timestamps, values, n_freqs=3000, method='auto'):
+    """Lomb-Scargle periodograms of every row of values over 15–30 h.
+
+    Returns (periods_hours, power, peak_periods, peak_powers) with power of
+    shape (n_series, n_periods).  Rows with fewer than 4 finite values get
+    NaN power and NaN peaks.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_series = values.shape[0]
+
+    finite = np.isfinite(values)
+    usable = finite.sum(axis=1) >= 4
+    # keep only the time points some series has data at
+    cols = finite.any(axis=0)
+    t = (timestamps[cols] - timestamps[cols][0]) / 3600.0 if cols.any() else timestamps[:0]
+    y = values[:, cols]
+    n_finite = np.maximum(finite.sum(axis=1, keepdims=True), 1)
+    y = y - np.where(finite[:, cols], y, 0.0).sum(axis=1, keepdims=True) / n_finite
+
+    freqs = np.linspace(1.0 / PERIOD_SEARCH_HOURS[1], 1.0 / PERIOD_SEARCH_HOURS[0], n_freqs)
+    periods = 1.0 / freqs
+    keep = (periods >= PERIOD_DISPLAY_HOURS[0]) & (periods <= PERIOD_DISPLAY_HOURS[1])
+    periods = periods[keep]
+
+    power = np.full((n_series, periods.size), np.nan)
+    if usable.any() and periods.size:
+        power[usable] = lomb_scargle_many(t, y[usable].T, freqs, method)[keep].T
+
+    peak_periods = np.full(n_series, np.nan)
+    peak_powers = np.full(n_series, np.nan)
+    if periods.size:
+        rows = np.flatnonzero(usable)
+        peak_idx = np.argmax(power[rows], axis=1)
+        peak_periods[rows] = periods[peak_idx]
+        peak_powers[rows] = power[rows, peak_idx]
+    return periods, power, peak_periods, peak_powers
+
+
+def batch_actograms(timestamps, values, period_hours=24.0):
+    """Double-plotted actogram grids for every row of values.
+
+    Returns (grids, day_labels, period_hours) where grids has shape
+    (n_series, n_days, 2*n_bins); see build_actogram for the layout.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_series = values.shape[0]
+
+    # number of time steps per period
+    diffs   = np.diff(timestamps)
+    dt_step = float(np.median(diffs[diffs > 0])) if len(diffs) > 0 else 3600.0
+    n_bins  = max(1, round(period_hours * 3600.0 / dt_step))
+
+    # which period-length window each sample falls in, and the bin within it
+    elapsed_h = (timestamps - float(timestamps[0])) / 3600.0
+    day_idx   = np.floor(elapsed_h / period_hours).astype(int)
+    n_days    = int(day_idx.max()) + 1 if len(day_idx) else 1
+    frac_in_period = (elapsed_h % period_hours) / period_hours
+    bin_idx = np.floor(frac_in_period * n_bins).astype(int).clip(0, n_bins - 1)
+
+    # one flat cell index per (series, day, bin); bincount fills all grids
+    cell = day_idx * n_bins + bin_idx
+    finite = np.isfinite(values)
+    flat = (np.arange(n_series)[:, None] * (n_days * n_bins) + cell)[finite]
+    size = n_series * n_days * n_bins
+    grid_sum = np.bincount(flat, weights=values[finite], minlength=size)
+    counts   = np.bincount(flat, minlength=size)
+
+    with np.errstate(invalid='ignore'):
+        single = np.where(counts > 0, grid_sum / counts, np.nan)
+    single = single.reshape(n_series, n_days, n_bins)
+
+    # Double-plot: repeat each row side by side
+    grids = np.concatenate([single, single], axis=2)
+
+    # Day labels from the start timestamp of each row
+    import pandas as pd
+    day_starts = pd.to_datetime(float(timestamps[0]) + np.arange(n_days) * period_hours * 3600,
+                                unit='s', utc=True)
+    day_labels = [d.strftime('%d %b') for d in day_starts]
+
+    return grids, day_labels, period_hours
+
+
+# ── Detrending ────────────────────────────────────────────────────────────────
+
+def day_index(timestamps, utc_offset_s=0):
+    """0-based calendar-day number of each timestamp.
+
+    Days are counted from integer division of (epoch seconds + utc_offset_s)
+    by 86400, so utc_offset_s moves the midnight boundary; the default 0
+    splits at midnight of the timestamps' own clock.
+    """
+    days = np.floor_divide(np.asarray(timestamps, dtype=np.float64) + utc_offset_s, 86400.0)
+    return (days - days.min()).astype(np.intp) if days.size else days.astype(np.intp)
+
+
+def subtract_group_means(values, groups):
+    """values minus the NaN-ignoring mean of its group (last axis).
+
+    groups holds a small non-negative integer per sample; all rows of a 2-D
+    values array share it.  One bincount per row gives the sums and counts.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows = np.atleast_2d(values)
+    n_groups = int(groups.max()) + 1 if groups.size else 0
+    out = np.empty_like(rows)
+    for r, v in enumerate(rows):
+        finite = np.isfinite(v)
+        sums = np.bincount(groups[finite], weights=v[finite], minlength=n_groups)
+        counts = np.bincount(groups[finite], minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        out[r] = v - means[groups]
+    return out.reshape(values.shape)
+
+
+def rolling_time_mean(timestamps, values, window_s=86400.0):
+    """Centred NaN-ignoring mean over [t - window_s/2, t + window_s/2).
+
+    The window is in seconds, so gaps and uneven sampling are handled; the
+    sums come from cumulative sums and two searchsorted calls.
+    """
+    t = np.asarray(timestamps, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    lo = np.searchsorted(t, t - window_s / 2.0, side='left')
+    hi = np.searchsorted(t, t + window_s / 2.0, side='left')
+    rows = np.atleast_2d(values)
+    out = np.empty_like(rows)
+    for r, v in enumerate(rows):
+        finite = np.isfinite(v)
+        # centre before summing so the cumulative sums stay well conditioned
+        centre = v[finite].mean() if finite.any() else 0.0
+        csum = np.concatenate([[0.0], np.cumsum(np.where(finite, v - centre, 0.0))])
+        ccnt = np.concatenate([[0], np.cumsum(finite)])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[r] = (csum[hi] - csum[lo]) / (ccnt[hi] - ccnt[lo]) + centre
+    return out.reshape(values.shape)
@@ -1,7 +1,14 @@
-from scipy.signal import spectrogram
 import numpy as np
 
-def dospectrogram(signal, rate, window_duration=0.2, window_overlap=0):
+# scipy.signal (~0.8 s to import) and matplotlib load on first use, so importing
+# this module is cheap for the GUIs and worker processes.
+
+def dospectrogram(signal, rate, window_duration=0.2, window_overlap=0, dtype=None):
+  # dtype: working precision of the FFT and log power (None: the input's own;
+  # integer input is computed in single precision, as scipy picks complex64
+  # for it); see utils.precision
+  if dtype is not None:
+      signal = np.asarray(signal).astype(dtype, copy=False)
   nps = max(2, int(round(window_duration * rate)))
   nol = int(round(window_overlap * rate))
   if nol >= nps:
@@ -10,6 +17,7 @@ def dospectrogram(signal, rate, window_duration=0.2, window_overlap=0):
       # Signal shorter than one window — return empty arrays so the caller skips this file
       fq = np.linspace(0, rate / 2, nps // 2 + 1)
       return fq, np.array([]), np.zeros((len(fq), 0))
+  from scipy.signal import spectrogram
   fq, times, S = spectrogram(x=signal, fs=rate, window="hamming", nperseg=nps, noverlap=nol, detrend="linear")
   if S.size == 0:
       return fq, times, S
@@ -41,6 +49,7 @@ def plot_spectrograms16(data, sample_rate=2000, window_duration=0.2,
     max_samples : int, optional
         Maximum number of samples to process (None = use all)
     """
+    import matplotlib.pyplot as plt
     n_samples, n_channels = data.shape
     
     # Limit samples if specified
@@ -0,0 +1,51 @@
+"""Worker processes for the GUIs that do not re-import the GUI.
+
+With the 'spawn' start method (the safe one once Qt and worker threads are
+running, and the only one on Windows) every child first re-runs the
+parent's __main__ script as __mp_main__, and only then unpickles its task.
+For batch_daily_pipeline.py that meant PyQt5 and the whole window module in
+every worker, although the work (daily_pipeline._process_day) is Qt-free.
+The forkserver method does not avoid it: its children are prepared the
+same way.
+
+SpawnPool is a spawn-context ProcessPoolExecutor whose workers are started
+while sys.modules['__main__'] is a bare stand-in module, so the preparation
+data sent to them names no main script and they import only what their
+tasks need.  Task functions must therefore live in an importable module
+(utils.*), not in the script itself.
+"""
+import sys
+import types
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+_main_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _bare_main():
+    """Hide the running script from multiprocessing while children start."""
+    with _main_lock:
+        main = sys.modules['__main__']
+        sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main
+
+
+class SpawnPool(ProcessPoolExecutor):
+    """ProcessPoolExecutor (spawn) whose workers skip the parent's __main__.
+
+    Spawn-context pools start their workers from submit(), so that is
+    where the stand-in __main__ is installed.
+    """
+
+    def __init__(self, max_workers=None):
+        super().__init__(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def submit(self, fn, /, *args, **kwargs):
+        with _bare_main():
+            return super().submit(fn, *args, **kwargs)
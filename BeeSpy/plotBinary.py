@@ -1,9 +1,15 @@
+import os
+import sys
+
+# The readers and DSP live in Analysis/utils, shared with the Analysis apps
+# (BeeSpy used to carry its own, much slower, copy).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Analysis'))
+
 from utils import binaryConvert as bc
 from utils import denoiseSignal as denoise
 from utils import spect
+from utils.utils import extract_start_time
 import numpy as np
-import os
-import re
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -19,7 +25,7 @@ def convertToSpec(folderIN, files, folderOUT, saveRaw=False, saveSpec=True):
         x = bc.beespy_arduino_reader(filepath)
         # Denoise and spectrogram each channel, save spec in the processed folder
         for c in range(x.shape[1]):
-            if(folderOUT != None & saveRaw):
+            if folderOUT is not None and saveRaw:
                 ##save the raw data
                 file_path = os.path.join(folderOUT, f"{os.path.basename(filepath)}_{str(c)}_raw.csv")
                 np.savetxt(file_path, x[:,c], delimiter=",")
@@ -33,23 +39,11 @@ def convertToSpec(folderIN, files, folderOUT, saveRaw=False, saveSpec=True):
             expanded_spec[1:, 1:] = spec
             # Save spec in the processed folder
             #file_path = os.path.join(app.config['PROCESSED_FOLDER'], f"{os.path.basename(filepath)}_{str(c)}_spec.csv")
-            if(folderOUT != None & saveSpec):
+            if folderOUT is not None and saveSpec:
                 file_path = os.path.join(folderOUT, f"{os.path.basename(filepath)}_{str(c)}_spec.csv")
                 np.savetxt(file_path, expanded_spec, delimiter=",")
 
 
-# Function to extract start time from filename
-def extract_start_time(filename):
-    # Regex to extract date and time components from the filename
-    pattern = r'(\d{4})_(\d{2})_(\d{2})_(\d{2})_(\d{2})_(\d{2})(?:\.bin_\d+_spec\.csv)?'
-    match = re.search(pattern, filename)
-    
-    if match:
-        year, month, day, hour, minute, second = map(int, match.groups())
-        return pd.Timestamp(year, month, day, hour, minute, second)
-    else:
-        raise ValueError(f"Filename format not recognized: {filename}")
-
 # Load and stitch CSV files
 def stitch_files(file_list):
     combined_df = None
@@ -1,15 +1,91 @@
+import os
 import sys
 import numpy as np
 import pandas as pd
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QPushButton, QLabel, QSlider, QSpinBox, 
-                             QFileDialog, QMessageBox)
+                             QFileDialog, QMessageBox, QCheckBox)
 from PyQt5.QtCore import Qt, pyqtSignal
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from matplotlib.colors import ListedColormap
 
+# Share the percentile engine with the Analysis pipelines
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Analysis'))
+from utils.quantiles import QuantileEngine, EXACT_MAX
+
+# Max time columns / frequency rows drawn in the images (downsampled for speed);
+# thresholds and power sums always use the full data
+MAX_DISPLAY_COLS = 1500
+MAX_DISPLAY_ROWS = 512
+
+
+def _count_le_sorted_cols(sorted_cols, threshold):
+    """Per column of a column-sorted array, the number of values <= threshold.
+
+    A binary search run on all columns at once (NaNs sort last and never
+    count), so the cost is O(n_cols * log n_rows).
+    """
+    n_rows, n_cols = sorted_cols.shape
+    cols = np.arange(n_cols)
+    lo = np.zeros(n_cols, dtype=np.intp)
+    hi = np.full(n_cols, n_rows, dtype=np.intp)
+    while True:
+        active = lo < hi
+        if not active.any():
+            return lo
+        mid = (lo + hi) // 2
+        le = np.zeros(n_cols, dtype=bool)
+        le[active] = sorted_cols[mid[active], cols[active]] <= threshold
+        lo = np.where(active & le, mid + 1, lo)
+        hi = np.where(active & ~le, mid, hi)
+
+def _is_packed_csv(path):
+    """True if the CSV uses the packed layout the Analysis apps write
+    (spec[0, 1:] = times, spec[1:, 0] = freqs, first cell numeric),
+    False for a labelled pandas CSV (header row, frequency index column)."""
+    with open(path) as f:
+        first = f.readline().split(',', 1)[0].strip()
+    try:
+        float(first)
+        return True
+    except ValueError:
+        return False
+
+
+def load_spectrogram(path, freq_range=None):
+    """Load a spectrogram as (times, freqs, values).
+
+    Accepts the packed layout, either as a CSV or as a .npy export of the
+    same array (memory-mapped, so only the rows that get used are read),
+    and falls back to a labelled CSV (pd.read_csv(index_col=0)).
+    freq_range=(lo, hi) keeps only the rows with lo <= freq <= hi; for
+    .npy files the other rows are never read from disk.
+    """
+    if path.lower().endswith('.npy'):
+        spec = np.load(path, mmap_mode='r')
+        times = np.array(spec[0, 1:], dtype=np.float64)
+        freqs = np.array(spec[1:, 0], dtype=np.float64)
+        values = spec[1:, 1:]
+    elif _is_packed_csv(path):
+        spec = pd.read_csv(path, header=None, dtype=np.float64,
+                           engine='c', low_memory=False).values
+        times, freqs, values = spec[0, 1:], spec[1:, 0], spec[1:, 1:]
+    else:
+        df = pd.read_csv(path, index_col=0)
+        times = df.columns.astype(float).values
+        freqs = df.index.astype(float).values
+        values = df.values
+    
+    if freq_range is not None:
+        # Frequencies are ascending, so the range is one contiguous row slice
+        r0 = int(np.searchsorted(freqs, freq_range[0], side='left'))
+        r1 = int(np.searchsorted(freqs, freq_range[1], side='right'))
+        freqs, values = freqs[r0:r1], values[r0:r1]
+    return times, freqs, values
+
+
 class SpectrogramCanvas(FigureCanvas):
     """Custom matplotlib canvas for PyQt5"""
     def __init__(self, parent=None, width=12, height=8, dpi=100):
@@ -40,6 +116,9 @@ class SpectrogramCanvas(FigureCanvas):
         # Store colorbars and plot lines
         self.cbar1 = None
         self.cbar2 = None
+        self.im2 = None
+        self.line2 = None
+        self.ax3_twin = None
 
 class SpectrogramViewer(QMainWindow):
     def __init__(self):
@@ -51,7 +130,16 @@ class SpectrogramViewer(QMainWindow):
         self.times = None
         self.freqs = None
         self.values = None
-        self.transformed_data = None
+        self.quantiles = None
+        self.threshold = 0.0
+        self.transformed_data = None   # downsampled display copy
+        # Per-column sorted values and cumulative sums over the frequency
+        # range, rebuilt only when the range changes
+        self._sum_range = None
+        self._col_sorted = None
+        self._col_cumsum = None
+        self._original_power = None
+        self._background = None
         self.cutoff = 80.0
         self.min_freq = 0.0
         self.max_freq = 100.0
@@ -69,10 +157,16 @@ class SpectrogramViewer(QMainWindow):
         
         # File selection
         file_layout = QHBoxLayout()
-        self.load_button = QPushButton("Load CSV File")
+        self.load_button = QPushButton("Load Spectrogram")
         self.load_button.clicked.connect(self.load_file)
         file_layout.addWidget(self.load_button)
         
+        self.range_only_checkbox = QCheckBox("Load Min-Max range only")
+        self.range_only_checkbox.setToolTip(
+            "Read only the frequency rows inside the current range "
+            "(fastest with .npy files)")
+        file_layout.addWidget(self.range_only_checkbox)
+        
         self.file_label = QLabel("No file loaded")
         file_layout.addWidget(self.file_label)
         file_layout.addStretch()
@@ -132,28 +226,29 @@ class SpectrogramViewer(QMainWindow):
         
         # Plot canvas
         self.canvas = SpectrogramCanvas(self)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
         layout.addWidget(self.canvas)
     
     def load_file(self):
-        """Load and parse CSV file"""
+        """Load a spectrogram (.npy or CSV, packed or labelled layout)"""
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
-            "Select CSV file", 
+            "Select spectrogram", 
             "", 
-            "CSV files (*.csv);;All files (*.*)"
+            "Spectrograms (*.npy *.csv);;NumPy files (*.npy);;CSV files (*.csv);;All files (*.*)"
         )
         
         if not file_path:
             return
         
         try:
-            # Load CSV with pandas for robust parsing
-            df = pd.read_csv(file_path, index_col=0)
-            
-            # Extract data
-            self.times = df.columns.astype(float).values
-            self.freqs = df.index.astype(float).values
-            self.values = df.values
+            freq_range = None
+            if self.range_only_checkbox.isChecked():
+                freq_range = (self.min_freq_spinbox.value(), self.max_freq_spinbox.value())
+            self.times, self.freqs, self.values = load_spectrogram(file_path, freq_range)
+            if self.values.size == 0:
+                raise ValueError("no frequency rows in the selected range")
+            self._prepare_data()
             
             # Update file label
             import os
@@ -179,15 +274,43 @@ class SpectrogramViewer(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load file:\n{str(e)}")
     
+    def _prepare_data(self):
+        """Precompute everything the cutoff slider needs for a newly loaded file"""
+        # Sorted once here so every slider move is a lookup, not a sort
+        self.quantiles = QuantileEngine(self.values,
+                                        exact=self.values.size <= EXACT_MAX)
+        col_step = max(1, self.values.shape[1] // MAX_DISPLAY_COLS)
+        row_step = max(1, self.values.shape[0] // MAX_DISPLAY_ROWS)
+        self._display_values = self.values[::row_step, ::col_step]
+        self._display_times = self.times[::col_step]
+        self._col_step = col_step
+        self._sum_range = None
+        self.canvas.im2 = None
+        self.canvas.line2 = None
+    
+    def _prepare_power_sums(self):
+        """Sort each column of the in-range rows and take cumulative sums.
+
+        The power sum of column j above a threshold is then
+        cumsum[-1, j] - cumsum[k_j, j], with k_j the number of values <= threshold.
+        """
+        freq_mask = self.get_frequency_mask()
+        self._sum_range = (self.min_freq, self.max_freq)
+        if freq_mask is None or not freq_mask.any():
+            self._col_sorted = self._col_cumsum = self._original_power = None
+            return
+        in_range = self.values[freq_mask, :]
+        self._original_power = np.sum(in_range, axis=0)
+        self._col_sorted = np.sort(in_range, axis=0)
+        cumsum = np.zeros((in_range.shape[0] + 1, in_range.shape[1]))
+        np.cumsum(np.nan_to_num(self._col_sorted), axis=0, out=cumsum[1:])
+        self._col_cumsum = cumsum
+    
     def get_quantile_threshold(self, cutoff_percent):
         """Calculate the quantile threshold"""
-        if self.values is None:
+        if self.quantiles is None:
             return 0.0
-        
-        flat_values = self.values.flatten()
-        ##remove nans
-        flat_values = flat_values[~np.isnan(flat_values)]
-        return np.percentile(flat_values, cutoff_percent)
+        return self.quantiles.percentile(cutoff_percent)
     
     def on_cutoff_change(self, value):
         """Handle slider changes"""
@@ -241,18 +364,20 @@ class SpectrogramViewer(QMainWindow):
     
     def calculate_power_sums(self):
         """Calculate power sums within frequency range for original and transformed data"""
-        if self.values is None or self.transformed_data is None:
+        if self.values is None:
             return None, None
         
-        freq_mask = self.get_frequency_mask()
-        if freq_mask is None or not freq_mask.any():
+        if self._sum_range != (self.min_freq, self.max_freq):
+            self._prepare_power_sums()
+        if self._col_cumsum is None:
             return None, None
         
-        # Sum power within frequency range for each time point
-        original_power = np.sum(self.values[freq_mask, :], axis=0)
-        transformed_power = np.sum(self.transformed_data[freq_mask, :], axis=0)
+        # Sum of the values above the threshold for each time point
+        k = _count_le_sorted_cols(self._col_sorted, self.threshold)
+        cols = np.arange(self._col_cumsum.shape[1])
+        transformed_power = self._col_cumsum[-1] - self._col_cumsum[k, cols]
         
-        return original_power, transformed_power
+        return self._original_power, transformed_power
     
     def update_transformed_data(self):
         """Update transformed data and redraw"""
@@ -260,18 +385,58 @@ class SpectrogramViewer(QMainWindow):
             return
         
         threshold = self.get_quantile_threshold(self.cutoff)
+        self.threshold = threshold
         
         # Update threshold display
         self.threshold_label.setText(f"Threshold: {threshold:.3f}")
         
         # Create transformed data (set values below threshold to 0)
-        self.transformed_data = np.where(self.values > threshold, self.values, 0)
+        self.transformed_data = np.where(self._display_values > threshold,
+                                         self._display_values, 0)
         
-        # Redraw transformed plot
-        self.draw_transformed_plot()
+        if self.canvas.im2 is None or self.canvas.line2 is None:
+            self.draw_transformed_plot()
+            self.draw_power_comparison()
+            return
         
-        # Draw power comparison plot
-        self.draw_power_comparison()
+        # Update the existing artists in place and blit them
+        self.canvas.im2.set_data(self.transformed_data)
+        self.canvas.im2.set_clim(np.nanmin(self.transformed_data),
+                                 np.nanmax(self.transformed_data))
+        _, transformed_power = self.calculate_power_sums()
+        if transformed_power is not None:
+            transformed_power = transformed_power[::self._col_step]
+            self.canvas.line2.set_ydata(transformed_power)
+            self._set_twin_ylim(transformed_power)
+        self._blit()
+    
+    def _set_twin_ylim(self, transformed_power):
+        """Fit the transformed power axis to the data (its ticks are hidden)"""
+        lo, hi = np.nanmin(transformed_power), np.nanmax(transformed_power)
+        if not np.isfinite(lo) or not np.isfinite(hi):
+            return
+        pad = 0.05 * (hi - lo) if hi > lo else 0.5
+        self.canvas.ax3_twin.set_ylim(lo - pad, hi + pad)
+    
+    def _on_draw(self, event):
+        """After a full redraw, keep a background without the animated artists"""
+        canvas = self.canvas
+        self._background = canvas.copy_from_bbox(canvas.fig.bbox)
+        for artist in (canvas.im2, canvas.line2):
+            if artist is not None:
+                canvas.fig.draw_artist(artist)
+    
+    def _blit(self):
+        """Redraw only the transformed image and power line"""
+        canvas = self.canvas
+        if self._background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        for artist in (canvas.im2, canvas.line2):
+            if artist is not None:
+                canvas.fig.draw_artist(artist)
+        canvas.blit(canvas.fig.bbox)
     
     def draw_original_plot(self):
         """Draw the original data plot"""
@@ -293,7 +458,7 @@ class SpectrogramViewer(QMainWindow):
         self.canvas.ax1.set_ylabel('Frequency')
         
         im1 = self.canvas.ax1.imshow(
-            self.values,
+            self._display_values,
             aspect='auto',
             origin='lower',
             extent=[self.times[0], self.times[-1], self.freqs[0], self.freqs[-1]],
@@ -334,8 +499,10 @@ class SpectrogramViewer(QMainWindow):
             origin='lower',
             extent=[self.times[0], self.times[-1], self.freqs[0], self.freqs[-1]],
             cmap='viridis',
-            interpolation='nearest'
+            interpolation='nearest',
+            animated=True
         )
+        self.canvas.im2 = im2
         
         # Set consistent x-axis limits
         self.canvas.ax2.set_xlim(self.times[0], self.times[-1])
@@ -353,6 +520,9 @@ class SpectrogramViewer(QMainWindow):
             return
         
         # Completely remove and recreate the third subplot to clear twinx
+        if self.canvas.ax3_twin is not None:
+            self.canvas.ax3_twin.remove()
+            self.canvas.ax3_twin = None
         self.canvas.ax3.remove()
         self.canvas.ax3 = self.canvas.fig.add_subplot(313)
         
@@ -362,7 +532,9 @@ class SpectrogramViewer(QMainWindow):
         # Plot original data on left y-axis
         # Remove existing ticks
         self.canvas.ax3.set_yticks([])
-        line1 = self.canvas.ax3.plot(self.times, original_power, 'b-', linewidth=2, label='Original Data', alpha=0.7)
+        original_power = original_power[::self._col_step]
+        transformed_power = transformed_power[::self._col_step]
+        line1 = self.canvas.ax3.plot(self._display_times, original_power, 'b-', linewidth=2, label='Original Data', alpha=0.7)
         self.canvas.ax3.set_ylabel('Original Power Sum', color='b')
         self.canvas.ax3.tick_params(axis='y', labelcolor='b')
         
@@ -370,7 +542,11 @@ class SpectrogramViewer(QMainWindow):
         ax3_twin = self.canvas.ax3.twinx()
         # Remove existing ticks
         ax3_twin.set_yticks([])
-        line2 = ax3_twin.plot(self.times, transformed_power, 'r-', linewidth=2, label='Transformed Data', alpha=0.7)
+        line2 = ax3_twin.plot(self._display_times, transformed_power, 'r-', linewidth=2, label='Transformed Data', alpha=0.7,
+                              animated=True)
+        self.canvas.ax3_twin = ax3_twin
+        self.canvas.line2 = line2[0]
+        self._set_twin_ylim(transformed_power)
         ax3_twin.set_ylabel('Transformed Power Sum', color='r')
         ax3_twin.tick_params(axis='y', labelcolor='r')
         